@@ -0,0 +1,54 @@
+"""Add scheduled-sync tracking columns to strava_connections
+
+scripts/strava_sync.py (app.strava_sync) syncs every stale connection on a
+schedule. It needs, per connection: the incremental `after` cursor
+(sync_cursor, the newest activity start a completed sync saw), the outcome of
+the last attempt (status, error, duration, activities imported), and a
+failure count + next_sync_at so a broken connection backs off instead of
+being retried every run. Guarded so it's safe where the columns exist.
+
+Revision ID: a2b3c4d5e6f7
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a2b3c4d5e6f7"
+down_revision: Union[str, None] = "f1a2b3c4d5e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    sa.Column("sync_cursor", sa.BigInteger(), nullable=True),
+    sa.Column("last_sync_attempt_at", sa.DateTime(), nullable=True),
+    sa.Column("last_sync_status", sa.String(), nullable=True),
+    sa.Column("last_sync_error", sa.Text(), nullable=True),
+    sa.Column("last_sync_duration_ms", sa.Integer(), nullable=True),
+    sa.Column("last_sync_imported", sa.Integer(), nullable=True),
+    sa.Column("sync_failures", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("next_sync_at", sa.DateTime(), nullable=True),
+]
+
+
+def _existing() -> set:
+    from sqlalchemy import inspect
+    return {c["name"] for c in inspect(op.get_bind()).get_columns("strava_connections")}
+
+
+def upgrade() -> None:
+    existing = _existing()
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column("strava_connections", column)
+
+
+def downgrade() -> None:
+    existing = _existing()
+    for column in reversed(COLUMNS):
+        if column.name in existing:
+            op.drop_column("strava_connections", column.name)
@@ -0,0 +1,61 @@
+"""Add habit_streaks: the per-habit streak summary cache
+
+Derived data (habit_logic's streak summary) so log_habit reads and updates a
+habit's streak in O(1) instead of re-reading its whole log history. Reads
+never write the cache: a habit without a row has its summary computed from
+its logs until its next log writes one. To build rows for every existing
+habit, run once after upgrading:
+
+    python scripts/verify_streak_cache.py --fix
+
+(verify_streak_cache() diffs rows against a full recompute and creates the
+missing ones.) Also created by create_all() on startup;
+guarded so it's safe where the bootstrap already ran.
+
+Revision ID: b7c8d9e0f1a2
+Revises: a6b7c8d9e0f1
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b7c8d9e0f1a2"
+down_revision: Union[str, None] = "a6b7c8d9e0f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+    if "habit_streaks" in set(inspect(op.get_bind()).get_table_names()):
+        return
+    op.create_table(
+        "habit_streaks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("habit_id", sa.Integer(),
+                  sa.ForeignKey("habits.id", ondelete="CASCADE"), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(),
+                  sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("cadence_key", sa.String(), nullable=False),
+        sa.Column("last_date", sa.Date(), nullable=True),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("week_anchor", sa.Date(), nullable=True),
+        sa.Column("week_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("run_end", sa.Date(), nullable=True),
+        sa.Column("run_length", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("prior_best", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("best", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_habit_streaks_id", "habit_streaks", ["id"])
+    op.create_index("ix_habit_streaks_user_id", "habit_streaks", ["user_id"])
+
+
+def downgrade() -> None:
+    from sqlalchemy import inspect
+    if "habit_streaks" in set(inspect(op.get_bind()).get_table_names()):
+        op.drop_table("habit_streaks")
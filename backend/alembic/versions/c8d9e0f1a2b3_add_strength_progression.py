@@ -0,0 +1,60 @@
+"""Add strength_progression: per-(user, exercise, day) strength summary
+
+Derived from workout_sets so the strength-progression view reads one row per
+trained day instead of replaying every session. log_workout_session keeps it
+current. Existing history is not copied here; run once after upgrading:
+
+    python scripts/rebuild_strength_progression.py
+
+Until then a user without rows has their progression computed from the sets
+on each read (reads never write the table). Also created by create_all() on
+startup; guarded so it's safe where the bootstrap already ran.
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c8d9e0f1a2b3"
+down_revision: Union[str, None] = "b7c8d9e0f1a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+    if "strength_progression" in set(inspect(op.get_bind()).get_table_names()):
+        return
+    op.create_table(
+        "strength_progression",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(),
+                  sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("exercise_id", sa.Integer(),
+                  sa.ForeignKey("exercises.exercise_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("session_date", sa.Date(), nullable=False),
+        sa.Column("top_weight", sa.Float(), nullable=False),
+        sa.Column("top_reps", sa.Integer(), nullable=False),
+        sa.Column("e1rm", sa.Float(), nullable=False),
+        sa.Column("volume", sa.Float(), nullable=False),
+        sa.Column("prior_best_weight", sa.Float(), nullable=True),
+        sa.Column("prior_best_e1rm", sa.Float(), nullable=True),
+        sa.Column("pr_weight", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("pr_e1rm", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "exercise_id", "session_date"),
+    )
+    op.create_index("ix_strength_progression_id", "strength_progression", ["id"])
+    op.create_index("ix_strength_progression_user_id", "strength_progression", ["user_id"])
+
+
+def downgrade() -> None:
+    from sqlalchemy import inspect
+    if "strength_progression" in set(inspect(op.get_bind()).get_table_names()):
+        op.drop_table("strength_progression")
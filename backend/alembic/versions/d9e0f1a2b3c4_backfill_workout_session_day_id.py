@@ -0,0 +1,57 @@
+"""Index the logger's last-session lookup; backfill legacy workout_sessions.day_id
+
+get_session_context now reads the last session of a (user, program) straight
+off ix_workout_sessions_user_program_date and trusts its stored day_id. The
+day of sessions logged before day_id existed is inferred here, in batches of
+SESSION_DAY_BACKFILL_BATCH, by workout_crud.backfill_session_days (one
+grouped overlap query and one bulk UPDATE per batch). The batches run inside
+this migration's transaction, so an upgrade either lands all of it or none.
+
+Offline (--sql) upgrades can't run the backfill; run
+scripts/backfill_session_days.py after applying the SQL. The script is also
+the way to re-run or resume it by hand.
+
+Revision ID: d9e0f1a2b3c4
+Revises: c8d9e0f1a2b3
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "d9e0f1a2b3c4"
+down_revision: Union[str, None] = "c8d9e0f1a2b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_workout_sessions_user_program_date"
+
+
+def _has_index() -> bool:
+    return INDEX_NAME in {i["name"] for i in inspect(op.get_bind()).get_indexes("workout_sessions")}
+
+
+def _backfill_session_days() -> None:
+    from sqlalchemy.orm import Session
+    from app.crud import workout_crud
+
+    # Bound to the migration's connection, whose transaction is already open:
+    # the per-batch commits don't commit it, alembic does at the end.
+    with Session(bind=op.get_bind()) as db:
+        workout_crud.backfill_session_days(db)
+
+
+def upgrade() -> None:
+    if not _has_index():
+        op.create_index(INDEX_NAME, "workout_sessions", ["user_id", "program_id", "session_date", "session_id"])
+    if not op.get_context().as_sql:   # offline: scripts/backfill_session_days.py afterwards
+        _backfill_session_days()
+
+
+def downgrade() -> None:
+    # The inferred day_ids stay: they are correct data, and day_id predates this revision.
+    if _has_index():
+        op.drop_index(INDEX_NAME, table_name="workout_sessions")
@@ -0,0 +1,68 @@
+"""Composite indexes for the workout and habit hot paths
+
+Until now these tables only had primary keys and a few single-column indexes,
+so each of these lookups filtered one column through an index and then
+checked the rest row by row:
+
+- workout_sessions (user_id, session_date, session_id): session history
+  pages and the newest session per user/exercise.
+- session_exercises (exercise_id, session_id) and (session_id): last
+  performance and strength progression by exercise, and the
+  sessions-to-exercises join.
+- workout_sets (session_exercise_id, set_number): sets of an exercise, in
+  order.
+- habit_logs (user_id, date, attribute) INCLUDE (attribute_xp): the daily
+  attribute-XP cap in _attribute_xp_earned_on, answered from the index alone
+  on Postgres.
+- player_xp_events (user_id, source, source_key): the pay-once check in
+  _player_xp_event_exists.
+
+On Postgres the indexes are built CONCURRENTLY, so writes are not blocked
+while they build. Each one is skipped if it already exists, e.g. when
+create_all() built it on startup. tests/test_crud/test_query_plans.py checks
+that the queries use these indexes.
+
+Revision ID: e0f1a2b3c4d5
+Revises: d9e0f1a2b3c4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision: str = "e0f1a2b3c4d5"
+down_revision: Union[str, None] = "d9e0f1a2b3c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, postgres INCLUDE columns)
+INDEXES = [
+    ("ix_workout_sessions_user_date", "workout_sessions", ["user_id", "session_date", "session_id"], None),
+    ("ix_session_exercises_exercise_session", "session_exercises", ["exercise_id", "session_id"], None),
+    ("ix_session_exercises_session_id", "session_exercises", ["session_id"], None),
+    ("ix_workout_sets_session_exercise_set", "workout_sets", ["session_exercise_id", "set_number"], None),
+    ("ix_habit_logs_user_date_attribute", "habit_logs", ["user_id", "date", "attribute"], ["attribute_xp"]),
+    ("ix_player_xp_events_user_source_key", "player_xp_events", ["user_id", "source", "source_key"], None),
+]
+
+
+def _existing(table: str) -> set:
+    return {i["name"] for i in inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            if name not in _existing(table):
+                op.create_index(name, table, columns, postgresql_concurrently=True,
+                                postgresql_include=include or [])
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            if name in _existing(table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""Add strava_import_jobs: durable queue for webhook-announced activities
+
+The Strava webhook now only records (athlete_id, activity_id) here and acks;
+app.strava_jobs workers do the fetch + import with retries and backoff.
+Unique per activity so redelivered events dedupe. Also created by
+create_all() on startup; guarded so it's safe where the bootstrap already
+ran. env.py re-enables RLS on the new table after this runs.
+
+Revision ID: f1a2b3c4d5e6
+Revises: e0f1a2b3c4d5
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f1a2b3c4d5e6"
+down_revision: Union[str, None] = "e0f1a2b3c4d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+    if "strava_import_jobs" in set(inspect(op.get_bind()).get_table_names()):
+        return
+    op.create_table(
+        "strava_import_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("athlete_id", sa.BigInteger(), nullable=False),
+        sa.Column("activity_id", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("activity_id", name="uq_strava_import_job_activity"),
+    )
+    op.create_index("ix_strava_import_jobs_id", "strava_import_jobs", ["id"])
+    op.create_index("ix_strava_import_jobs_athlete_id", "strava_import_jobs", ["athlete_id"])
+    op.create_index("ix_strava_import_jobs_status_due", "strava_import_jobs", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    from sqlalchemy import inspect
+    if "strava_import_jobs" in set(inspect(op.get_bind()).get_table_names()):
+        op.drop_table("strava_import_jobs")
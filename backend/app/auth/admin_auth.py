@@ -4,7 +4,7 @@ Admin authentication and authorization utilities
 from functools import wraps
 from fastapi import HTTPException, Depends, status
 from sqlalchemy.orm import Session
-from ..auth import auth_utils
+from ..auth import auth_utils, user_cache
 from ..models.user_model import User, UserRole
 from ..crud.user_crud import get_user
 
@@ -33,7 +33,7 @@ def require_admin_or_moderator(current_user: User = Depends(auth_utils.get_curre
     return current_user
 
 
-async def make_user_admin(user_id: int, db: Session):
+def make_user_admin(user_id: int, db: Session):
     """
     Utility function to grant admin role to a user
     """
@@ -43,11 +43,12 @@ async def make_user_admin(user_id: int, db: Session):
     
     user.role = UserRole.ADMIN
     db.commit()
+    user_cache.invalidate_user(user_id)
     db.refresh(user)
     return user
 
 
-async def revoke_admin_role(user_id: int, db: Session):
+def revoke_admin_role(user_id: int, db: Session):
     """
     Utility function to revoke admin role from a user
     """
@@ -57,5 +58,6 @@ async def revoke_admin_role(user_id: int, db: Session):
     
     user.role = UserRole.USER
     db.commit()
+    user_cache.invalidate_user(user_id)
     db.refresh(user)
     return user
\ No newline at end of file
@@ -7,6 +7,7 @@ from ..crud import user_crud
 from ..models import user_model
 from ..dependencies import get_db
 from ..utils.time import utc_now
+from . import user_cache
 from datetime import timedelta
 import httpx
 
@@ -68,7 +69,11 @@ def validate_registration_token(token: str):
     except JWTError:
         return None
 
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> user_model.User:
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> user_model.User:
+    cached = user_cache.lookup(db, token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -92,6 +97,7 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(o
     user = db.query(user_model.User).filter(user_model.User.id == user_id).first()
     if user is None:
         raise credentials_exception
+    user_cache.store(token, payload.get("exp"), user)
     return user
 
 async def fetch_google_user_info(token: str):
@@ -101,7 +107,7 @@ async def fetch_google_user_info(token: str):
     user_info = response.json()
     return user_info
 
-async def handle_user_authentication(user_info: dict, db: Session):
+def handle_user_authentication(user_info: dict, db: Session):
     email = user_info.get("email")
     if not email:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing email in user information")
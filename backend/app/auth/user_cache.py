@@ -0,0 +1,122 @@
+"""
+Short-lived cache behind get_current_user: a verified access token maps to a
+column snapshot of its user, so a repeat request skips both jwt.decode and the
+users SELECT.
+
+Keyed by the token's signature segment; an entry also holds the full token and
+is only served for an exact match, and never past the token's own exp. A hit
+is rebuilt as an instance attached to the caller's session (merge, load=False)
+so relationships lazy-load and writes flush as usual.
+
+player_xp is deliberately left out of the snapshot: it is read-modify-written
+by every XP award, and a snapshot that is stale by a few seconds (another
+worker awarded XP) would silently drop that award. It loads on first access.
+
+Paths that change a user row call invalidate_user(); the TTL bounds how long
+other worker processes, which keep their own cache, can serve an old row.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..models.user_model import User
+
+USER_CACHE_TTL_SECONDS = 30
+USER_CACHE_MAX_ENTRIES = 4096
+UNCACHED_COLUMNS = frozenset({"player_xp"})
+
+
+class _Entry(NamedTuple):
+    token: str
+    user_id: int
+    snapshot: dict
+    expires_at: float
+
+
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+_signatures_by_user: Dict[int, Set[str]] = {}
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def _signature(token: str) -> str:
+    return token.rsplit(".", 1)[-1]
+
+
+def lookup(db: Session, token: str) -> Optional[User]:
+    """The cached user for this exact token, attached to db, or None."""
+    signature = _signature(token)
+    with _lock:
+        entry = _entries.get(signature)
+        if entry is None or entry.token != token or entry.expires_at <= time.time():
+            _counters["misses"] += 1
+            if entry is not None and entry.token == token:
+                _drop(signature)
+            return None
+        _entries.move_to_end(signature)
+        _counters["hits"] += 1
+        snapshot = copy.deepcopy(entry.snapshot)   # JSON columns must not be shared between requests
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def store(token: str, token_exp: Optional[float], user: User) -> None:
+    """Remember a freshly verified token -> user, until min(TTL, token exp)."""
+    loaded = inspect(user).dict
+    snapshot = {column.key: copy.deepcopy(loaded[column.key])
+                for column in User.__table__.columns
+                if column.key in loaded and column.key not in UNCACHED_COLUMNS}
+    expires_at = time.time() + USER_CACHE_TTL_SECONDS
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+    signature = _signature(token)
+    with _lock:
+        _entries[signature] = _Entry(token, user.id, snapshot, expires_at)
+        _entries.move_to_end(signature)
+        _signatures_by_user.setdefault(user.id, set()).add(signature)
+        while len(_entries) > USER_CACHE_MAX_ENTRIES:
+            _drop(next(iter(_entries)))
+            _counters["evictions"] += 1
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget every cached token for a user. Call after changing or deleting the row."""
+    with _lock:
+        signatures = _signatures_by_user.pop(user_id, set())
+        for signature in signatures:
+            _entries.pop(signature, None)
+        _counters["invalidations"] += len(signatures)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _signatures_by_user.clear()
+        for key in _counters:
+            _counters[key] = 0
+
+
+def stats() -> dict:
+    with _lock:
+        lookups = _counters["hits"] + _counters["misses"]
+        return {
+            **_counters,
+            "entries": len(_entries),
+            "hit_rate": round(_counters["hits"] / lookups, 4) if lookups else None,
+        }
+
+
+def _drop(signature: str) -> None:
+    entry = _entries.pop(signature, None)
+    if entry is not None:
+        signatures = _signatures_by_user.get(entry.user_id)
+        if signatures is not None:
+            signatures.discard(signature)
+            if not signatures:
+                del _signatures_by_user[entry.user_id]
@@ -12,6 +12,18 @@ class Config:
     REDIRECT_URI = os.getenv("REDIRECT_URI")
     SECRET_KEY = os.getenv("SECRET_KEY")
 
+    # Route handlers are sync and run on AnyIO's worker threadpool, capped at
+    # REQUEST_THREADS (the Strava import workers come out of the same number).
+    # The threads alone don't bound DB connections: get_db and get_current_user
+    # run on earlier threadpool hops, and a request's Session keeps the
+    # connection it checked out while the request waits for a thread to run
+    # its handler. So database.py sizes the pool DB_POOL_HEADROOM connections
+    # above REQUEST_THREADS for requests parked between hops. Beyond that a
+    # checkout waits (up to pool_timeout), so keep the headroom above the
+    # request concurrency you expect past the thread cap.
+    REQUEST_THREADS = int(os.getenv("REQUEST_THREADS", "15"))
+    DB_POOL_HEADROOM = int(os.getenv("DB_POOL_HEADROOM", "10"))
+
     # Strava import (optional feature; endpoints report unavailable if unset).
     # STRAVA_REDIRECT_URI is the backend's own /strava/callback (registered as an
     # Authorization Callback Domain in the Strava API app).
@@ -19,6 +31,10 @@ class Config:
     STRAVA_CLIENT_SECRET = os.getenv("STRAVA_CLIENT_SECRET")
     STRAVA_REDIRECT_URI = os.getenv("STRAVA_REDIRECT_URI")
     STRAVA_WEBHOOK_VERIFY_TOKEN = os.getenv("STRAVA_WEBHOOK_VERIFY_TOKEN", "mev2-strava")
+    # Threads importing webhook-queued activities inside the API process (see
+    # strava_jobs). They hold DB connections too, so they come out of
+    # REQUEST_THREADS. 0 = run scripts/strava_worker.py separately instead.
+    STRAVA_WORKERS = int(os.getenv("STRAVA_WORKERS", "2"))
 
     @classmethod
     def strava_configured(cls) -> bool:
@@ -8,6 +8,8 @@ from ..models.challenge_model import Challenge, UserChallenge
 from ..models.user_model import User, UserRole
 from ..models.skill_model import Skill
 from ..models.habit_model import PlayerXPEvent, DayCompletion
+from . import habit_crud
+from ..auth import user_cache
 
 
 def get_all_challenges(db: Session, include_inactive: bool = True) -> List[Challenge]:
@@ -51,6 +53,7 @@ def set_user_role(db: Session, user_id: int, role: UserRole) -> User:
     
     user.role = role
     db.commit()
+    user_cache.invalidate_user(user_id)
     db.refresh(user)
     return user
 
@@ -79,6 +82,7 @@ def reset_user_progress(db: Session, user_id: int) -> dict:
     db.query(DayCompletion).filter(DayCompletion.user_id == user_id).delete(synchronize_session=False)
 
     db.commit()
+    habit_crud.invalidate_user_cache(user_id)
     return {"skills_reset": len(skills), "player_xp": 0}
 
 
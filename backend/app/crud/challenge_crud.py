@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from datetime import timedelta
 from typing import List, Optional
@@ -19,13 +19,19 @@ def get_challenge_by_id(db: Session, challenge_id: int) -> Optional[Challenge]:
     """
     return db.query(Challenge).filter(Challenge.id == challenge_id).first()
 
+def _invalidate_read_cache(user_id: int):
+    """Today shows the active challenge (and its XP), so challenge writes drop the cached read."""
+    from . import habit_crud
+    habit_crud.invalidate_user_cache(user_id)
+
 def check_and_fail_expired_challenges(db: Session, user_id: int = None):
     """
     Check for challenges that should be failed due to missed days
     If user_id is provided, check only that user's challenges
     Otherwise, check all active challenges
     """
-    query = db.query(UserChallenge).filter(
+    # Users ride along so each one's local date resolves without a query.
+    query = db.query(UserChallenge).options(joinedload(UserChallenge.user)).filter(
         and_(
             UserChallenge.is_active == True,
             UserChallenge.is_completed == False,
@@ -37,9 +43,10 @@ def check_and_fail_expired_challenges(db: Session, user_id: int = None):
         query = query.filter(UserChallenge.user_id == user_id)
     
     active_challenges = query.all()
-    
+    failed_user_ids = set()
+
     for user_challenge in active_challenges:
-        today = get_user_today(db, user_challenge.user_id)
+        today = get_user_today(db, user_challenge.user)
 
         # Check if challenge period is over
         if today > user_challenge.end_date:
@@ -47,6 +54,7 @@ def check_and_fail_expired_challenges(db: Session, user_id: int = None):
             user_challenge.is_active = False
             if not user_challenge.failed_date:
                 user_challenge.failed_date = today
+            failed_user_ids.add(user_challenge.user_id)
             continue
 
         # Calculate expected days completed by now
@@ -62,8 +70,11 @@ def check_and_fail_expired_challenges(db: Session, user_id: int = None):
             if not user_challenge.failed_date:
                 from datetime import timedelta
                 user_challenge.failed_date = today - timedelta(days=1)
+            failed_user_ids.add(user_challenge.user_id)
 
     db.commit()
+    for failed_user_id in failed_user_ids:
+        _invalidate_read_cache(failed_user_id)
 
 def get_user_active_challenge(db: Session, user_id: int) -> Optional[UserChallenge]:
     """
@@ -152,6 +163,7 @@ def join_challenge(db: Session, user_id: int, challenge_id: int) -> UserChalleng
     
     db.add(user_challenge)
     db.commit()
+    _invalidate_read_cache(user_id)
     db.refresh(user_challenge)
     return user_challenge
 
@@ -167,6 +179,7 @@ def quit_challenge(db: Session, user_id: int) -> Optional[UserChallenge]:
     user_challenge.quit_date = get_user_today(db, user_id)
     
     db.commit()
+    _invalidate_read_cache(user_id)
     db.refresh(user_challenge)
     return user_challenge
 
@@ -216,6 +229,7 @@ def mark_day_complete(db: Session, user_id: int, activity_data: dict = None) ->
     check_challenge_completion(db, user_challenge)
     
     db.commit()
+    _invalidate_read_cache(user_id)
     db.refresh(progress)
     return progress
 
@@ -362,6 +376,7 @@ def restore_challenge_from_grace_period(db: Session, user_id: int, user_challeng
     # The streak is already stored, we just un-fail the challenge
 
     db.commit()
+    _invalidate_read_cache(user_id)
     db.refresh(user_challenge)
 
     return user_challenge
\ No newline at end of file
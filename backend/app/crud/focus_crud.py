@@ -18,6 +18,7 @@ from ..models.habit_model import Habit, HabitLog
 from ..models.user_model import User
 from ..schemas import focus_schema, habit_schema
 from ..utils.time import get_user_today, utc_now
+from ..auth import user_cache
 from . import habit_crud
 
 logger = logging.getLogger(__name__)
@@ -160,6 +161,7 @@ def _bridge_minutes_to_habit(db: Session, user: User, category: FocusCategory,
     if existing:
         existing.duration_minutes = round((existing.duration_minutes or 0) + minutes_added, 2)
         db.commit()
+        habit_crud.invalidate_user_cache(user.id)
         return {
             "already_logged": True,
             "habit_id": habit.id,
@@ -193,6 +195,7 @@ def _unbridge_minutes(db: Session, user: User, category: FocusCategory,
         HabitLog.habit_id == category.linked_habit_id, HabitLog.date == log_date).first()
     if log and log.duration_minutes:
         log.duration_minutes = max(0, round(log.duration_minutes - minutes_removed, 2))
+        habit_crud.invalidate_user_cache(user.id)
 
 
 # ---------------------------------------------------------------------------
@@ -256,7 +259,7 @@ def start_session(db: Session, user: User, category_id: int) -> dict:
     session = FocusSession(
         user_id=user.id,
         category_id=category.id,
-        date=get_user_today(db, user.id),
+        date=get_user_today(db, user),
         started_at=_naive_utc_now(),
         source="timer",
     )
@@ -370,7 +373,7 @@ def create_manual_session(db: Session, user: User,
     if not category or category.status != "active":
         raise ValueError("Focus category not found")
 
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     log_date = payload.date or user_today
     if log_date > user_today:
         raise ValueError("Cannot log focus time for future dates")
@@ -494,7 +497,7 @@ def _category_out(db: Session, category: FocusCategory) -> dict:
 def get_state(db: Session, user: User) -> dict:
     """The light payload: Today strip, Stats landing card, focus tool shell,
     and the DetailSheet's already-focused-today warning."""
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     week_start = user_today - timedelta(days=user_today.weekday())  # Monday
     categories = get_categories(db, user.id)
 
@@ -528,7 +531,7 @@ def get_state(db: Session, user: User) -> dict:
 
 def get_summary(db: Session, user: User, days: int = 105) -> dict:
     """The Clicks page payload: heatmap window, weekly rollups, recent days."""
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     start = user_today - timedelta(days=days - 1)
     categories = get_categories(db, user.id, include_archived=True)
 
@@ -586,7 +589,7 @@ def get_summary(db: Session, user: User, days: int = 105) -> dict:
 # ---------------------------------------------------------------------------
 
 def upsert_day_note(db: Session, user: User, payload: focus_schema.FocusDayNoteUpsert) -> dict:
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     if payload.date > user_today:
         raise ValueError("Cannot add notes for future dates")
 
@@ -612,6 +615,7 @@ def update_settings(db: Session, user: User, payload: focus_schema.FocusSettings
     if payload.ritual is not None:
         user.focus_ritual = [item.strip() for item in payload.ritual if item.strip()][:20]
     db.commit()
+    user_cache.invalidate_user(user.id)
     return {
         "daily_target_clicks": user.click_daily_target,
         "weekly_target_clicks": round(user.click_daily_target * 7, 2),
@@ -4,18 +4,21 @@ two-track XP payouts, 48h backfill window, challenge auto-progress.
 """
 import logging
 from datetime import datetime, date, timedelta
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
 
-from ..models.habit_model import Bucket, HabitTemplate, Habit, HabitLog, DayCompletion, PlayerXPEvent
+from ..models.habit_model import (
+    Bucket, HabitTemplate, Habit, HabitLog, HabitStreak, DayCompletion, PlayerXPEvent,
+)
 from ..models.user_model import User
 from ..models.skill_model import Skill
 from ..models import activity_model
 from ..schemas import habit_schema
 from ..utils.time import get_user_today, utc_now
-from .. import xp_engine, habit_logic
+from .. import xp_engine, habit_logic, response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -59,15 +62,36 @@ def get_user_habit(db: Session, user_id: int, habit_id: int) -> Optional[Habit]:
     )
 
 
+def get_bucket_habits_logged_on(db: Session, user_id: int, bucket_key: str,
+                                on_date: date) -> List[tuple]:
+    """The user's active standard habits in a bucket, each paired with whether
+    it has a log on on_date: one query (habits LEFT JOIN that day's logs)."""
+    rows = (
+        db.query(Habit, HabitLog.id)
+        .join(Bucket, Habit.bucket_id == Bucket.id)
+        .outerjoin(HabitLog, (HabitLog.habit_id == Habit.id) & (HabitLog.date == on_date))
+        .options(contains_eager(Habit.bucket))
+        .filter(Habit.user_id == user_id, Habit.status == "active",
+                Habit.habit_type == "standard", Bucket.key == bucket_key)
+        .order_by(Habit.sort_order, Habit.id)
+        .all()
+    )
+    return [(habit, log_id is not None) for habit, log_id in rows]
+
+
+def _slot_payload(player_level: int, used: int) -> dict:
+    total = xp_engine.slots_for_level(player_level)
+    return {"total": total, "used": used, "available": max(0, total - used)}
+
+
 def slot_state(db: Session, user: User) -> dict:
     level = xp_engine.player_level_from_xp(user.player_xp)["level"]
-    total = xp_engine.slots_for_level(level)
     used = (
         db.query(func.count(Habit.id))
         .filter(Habit.user_id == user.id, Habit.status == "active", Habit.habit_type == "standard")
         .scalar()
     ) or 0
-    return {"total": total, "used": used, "available": max(0, total - used)}
+    return _slot_payload(level, used)
 
 
 def _validate_cadence(cadence_type: str, times_per_week, weekdays):
@@ -147,6 +171,7 @@ def create_habit(db: Session, user: User, data: habit_schema.HabitCreate) -> Hab
     )
     db.add(habit)
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(habit)
     return habit
 
@@ -193,9 +218,10 @@ def update_habit(db: Session, user: User, habit_id: int, data: habit_schema.Habi
     cadence_after = (habit.cadence_type, habit.times_per_week, tuple(habit.weekdays or ()))
     if cadence_after != cadence_before and habit.status == "active":
         db.flush()
-        recompute_day_completion(db, user, get_user_today(db, user.id))
+        recompute_day_completion(db, user, get_user_today(db, user))
 
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(habit)
     return habit
 
@@ -208,6 +234,7 @@ def reorder_habits(db: Session, user: User, ordered_ids: List[int]) -> List[Habi
         if habit:
             habit.sort_order = idx
     db.commit()
+    invalidate_user_cache(user.id)
     return get_user_habits(db, user.id, include_archived=True)
 
 
@@ -219,6 +246,7 @@ def archive_habit(db: Session, user: User, habit_id: int) -> Habit:
     habit.status = "archived"
     habit.archived_at = utc_now()
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(habit)
     return habit
 
@@ -234,6 +262,7 @@ def restore_habit(db: Session, user: User, habit_id: int) -> Habit:
     habit.status = "active"
     habit.archived_at = None
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(habit)
     return habit
 
@@ -318,54 +347,80 @@ def recompute_day_completion(db: Session, user: User, target_date: date) -> dict
     delta against what was already paid. Used on every log, edit, undo and
     backfill — upgrades pay the difference, downgrades claw it back.
     """
-    habits = get_user_habits(db, user.id, include_archived=False)
-    scheduled = _scheduled_habits_on(habits, target_date)
-    scheduled_ids = [h.id for h in scheduled]
+    return recompute_day_completions(db, user, [target_date])[target_date]
 
-    completed = 0
-    if scheduled_ids:
-        completed = db.query(func.count(HabitLog.id)).filter(
+
+def recompute_day_completions(db: Session, user: User, dates: Iterable[date]) -> Dict[date, dict]:
+    """
+    recompute_day_completion for many dates at once (imports, multi-day
+    backfills): one habit load, one log query, one DayCompletion read, and the
+    player-XP deltas settled as a single batch of ledger rows. Returns each
+    date's result keyed by date.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+
+    habits = get_user_habits(db, user.id, include_archived=False)
+    habit_ids = [h.id for h in habits]
+    logged = set()
+    if habit_ids:
+        logged = set(db.query(HabitLog.date, HabitLog.habit_id).filter(
             HabitLog.user_id == user.id,
-            HabitLog.date == target_date,
-            HabitLog.habit_id.in_(scheduled_ids),
-        ).scalar() or 0
-
-    status = xp_engine.day_status(len(scheduled), completed)
-    target_xp = xp_engine.day_target_player_xp(len(scheduled), completed)
-
-    row = db.query(DayCompletion).filter(
-        DayCompletion.user_id == user.id, DayCompletion.date == target_date
-    ).first()
-    previous_status = row.status if row else "none"
-    paid = row.player_xp if row else 0
-
-    if not row:
-        row = DayCompletion(user_id=user.id, date=target_date)
-        db.add(row)
-
-    row.scheduled_count = len(scheduled)
-    row.completed_count = completed
-    row.status = status
-
-    delta = target_xp - paid
-    if delta != 0:
-        _award_player_xp(db, user, delta,
-                         source="day_complete" if target_xp >= paid else "day_complete_reversal",
-                         source_key=str(target_date),
-                         meta={"status": status, "scheduled": len(scheduled), "completed": completed})
-        row.player_xp = target_xp
+            HabitLog.date.in_(dates),
+            HabitLog.habit_id.in_(habit_ids),
+        ).all())
 
-    return {
-        "date": str(target_date),
-        "scheduled": len(scheduled),
-        "completed": completed,
-        "status": status,
-        "previous_status": previous_status,
-        "became_complete": status == "complete" and previous_status != "complete",
-        "became_partial": status == "partial" and previous_status == "none",
-        "bonus_paid": max(0, delta),
+    rows = {
+        row.date: row for row in db.query(DayCompletion).filter(
+            DayCompletion.user_id == user.id, DayCompletion.date.in_(dates)).all()
     }
 
+    results = {}
+    new_rows = []
+    events = []
+    for target_date in dates:
+        scheduled = _scheduled_habits_on(habits, target_date)
+        completed = sum(1 for h in scheduled if (target_date, h.id) in logged)
+
+        status = xp_engine.day_status(len(scheduled), completed)
+        target_xp = xp_engine.day_target_player_xp(len(scheduled), completed)
+
+        row = rows.get(target_date)
+        previous_status = row.status if row else "none"
+        paid = row.player_xp if row else 0
+        if not row:
+            row = DayCompletion(user_id=user.id, date=target_date, player_xp=0)
+            new_rows.append(row)
+
+        row.scheduled_count = len(scheduled)
+        row.completed_count = completed
+        row.status = status
+
+        delta = target_xp - paid
+        if delta != 0:
+            user.player_xp = max(0, (user.player_xp or 0) + delta)
+            events.append(PlayerXPEvent(
+                user_id=user.id, amount=delta,
+                source="day_complete" if target_xp >= paid else "day_complete_reversal",
+                source_key=str(target_date),
+                meta={"status": status, "scheduled": len(scheduled), "completed": completed}))
+            row.player_xp = target_xp
+
+        results[target_date] = {
+            "date": str(target_date),
+            "scheduled": len(scheduled),
+            "completed": completed,
+            "status": status,
+            "previous_status": previous_status,
+            "became_complete": status == "complete" and previous_status != "complete",
+            "became_partial": status == "partial" and previous_status == "none",
+            "bonus_paid": max(0, delta),
+        }
+
+    db.add_all(new_rows + events)
+    return results
+
 
 def _day_streak(db: Session, user_id: int, today: date) -> int:
     rows = db.query(DayCompletion.date).filter(
@@ -390,6 +445,125 @@ def _habit_log_dates(db: Session, habit_id: int) -> set:
     return {r.date for r in rows}
 
 
+# ---------------------------------------------------------------------------
+# Streak cache (habit_logic's streak summary, persisted per habit)
+# ---------------------------------------------------------------------------
+
+_SUMMARY_FIELDS = ("last_date", "total", "week_anchor", "week_count",
+                   "run_end", "run_length", "prior_best", "best")
+
+
+def _cadence_args(habit: Habit) -> tuple:
+    return habit.cadence_type, habit.weekdays, habit.times_per_week
+
+
+def _full_streak_summary(db: Session, habit: Habit) -> dict:
+    return habit_logic.streak_summary(*_cadence_args(habit), _habit_log_dates(db, habit.id))
+
+
+def _store_streak_summary(db: Session, habit: Habit, summary: dict,
+                          row: Optional[HabitStreak] = None) -> dict:
+    """Write a habit's cache row. A habit with no row yet gets an upsert on
+    habit_id, so two first writes racing (two logs at once) both land instead
+    of one failing on the unique constraint."""
+    values = {"cadence_key": habit_logic.cadence_key(*_cadence_args(habit)),
+              **{field: summary[field] for field in _SUMMARY_FIELDS}}
+    if row is not None:
+        for field, value in values.items():
+            setattr(row, field, value)
+        return summary
+    values["updated_at"] = utc_now()
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    db.execute(insert(HabitStreak)
+               .values(habit_id=habit.id, user_id=habit.user_id, **values)
+               .on_conflict_do_update(index_elements=["habit_id"], set_=values))
+    return summary
+
+
+def _streak_row(db: Session, habit: Habit) -> Optional[HabitStreak]:
+    return db.query(HabitStreak).filter(HabitStreak.habit_id == habit.id).first()
+
+
+def _cached_summary(habit: Habit, row: Optional[HabitStreak]) -> Optional[dict]:
+    """The row's summary, or None when missing or built under another cadence."""
+    if row is None or row.cadence_key != habit_logic.cadence_key(*_cadence_args(habit)):
+        return None
+    return {field: getattr(row, field) for field in _SUMMARY_FIELDS}
+
+
+def get_streak_summaries(db: Session, habits: List[Habit]) -> Dict[int, dict]:
+    """Streak summaries for many habits: one cache read, plus one batched date
+    fetch for whichever habits have no current row. Read-only: missing rows
+    are computed, not stored (the next log writes them; for existing data,
+    scripts/verify_streak_cache.py --fix builds them all)."""
+    if not habits:
+        return {}
+    rows = {row.habit_id: row for row in db.query(HabitStreak).filter(
+        HabitStreak.habit_id.in_([h.id for h in habits])).all()}
+    summaries = {}
+    stale = []
+    for habit in habits:
+        cached = _cached_summary(habit, rows.get(habit.id))
+        if cached is not None:
+            summaries[habit.id] = cached
+        else:
+            stale.append(habit)
+    if stale:
+        dates_by_habit = _log_dates_by_habit(db, [h.id for h in stale])
+        for habit in stale:
+            summaries[habit.id] = habit_logic.streak_summary(*_cadence_args(habit), dates_by_habit[habit.id])
+    return summaries
+
+
+def _streak_after_log(db: Session, habit: Habit, log_date: date) -> dict:
+    """Fold a just-flushed log into the cache; full rebuild only when O(1) can't apply."""
+    row = _streak_row(db, habit)
+    cached = _cached_summary(habit, row)
+    if cached is not None:
+        updated = habit_logic.summary_after_log(cached, *_cadence_args(habit), log_date)
+        if updated is not None:
+            return _store_streak_summary(db, habit, updated, row)
+    return _store_streak_summary(db, habit, _full_streak_summary(db, habit), row)
+
+
+def _streak_after_unlog(db: Session, habit: Habit, log_date: date) -> dict:
+    """Remove a just-deleted log from the cache (same fallback rule as _streak_after_log)."""
+    row = _streak_row(db, habit)
+    cached = _cached_summary(habit, row)
+    if cached is not None:
+        previous_date = db.query(func.max(HabitLog.date)).filter(HabitLog.habit_id == habit.id).scalar()
+        updated = habit_logic.summary_after_unlog(cached, *_cadence_args(habit), log_date, previous_date)
+        if updated is not None:
+            return _store_streak_summary(db, habit, updated, row)
+    return _store_streak_summary(db, habit, _full_streak_summary(db, habit), row)
+
+
+def verify_streak_cache(db: Session, user_id: Optional[int] = None, fix: bool = False) -> List[dict]:
+    """
+    Diff every habit's cached streak summary against a full recompute from the
+    logs. Returns one entry per mismatching habit (cached=None: no row yet);
+    fix=True rewrites or creates those rows, which is also how the cache is
+    built for habits that predate it.
+    """
+    query = db.query(Habit, HabitStreak).outerjoin(HabitStreak, HabitStreak.habit_id == Habit.id)
+    if user_id is not None:
+        query = query.filter(Habit.user_id == user_id)
+
+    mismatches = []
+    for habit, row in query.all():
+        expected = _full_streak_summary(db, habit)
+        cached = {field: getattr(row, field) for field in _SUMMARY_FIELDS} if row else None
+        stale_cadence = row is not None and row.cadence_key != habit_logic.cadence_key(*_cadence_args(habit))
+        if cached != expected and not stale_cadence:
+            mismatches.append({"habit_id": habit.id, "user_id": habit.user_id,
+                               "cached": cached, "expected": expected})
+            if fix:
+                _store_streak_summary(db, habit, expected, row)
+    if fix and mismatches:
+        db.commit()
+    return mismatches
+
+
 def _sync_weight_tracking(db: Session, user: User, log: HabitLog, habit: Habit):
     """Weigh-in values feed the existing weight trend/goal charts."""
     if habit.measurement_kind != "weight" or log.value is None:
@@ -449,7 +623,9 @@ def _auto_progress_challenge(db: Session, user: User, habit: Habit, log_date: da
 
 def log_habit(db: Session, user: User, habit_id: int, payload: habit_schema.HabitLogCreate,
               allow_archived: bool = False, enforce_window: bool = True,
-              source: str = "manual", external_ref: Optional[str] = None) -> dict:
+              source: str = "manual", external_ref: Optional[str] = None,
+              settle_day: bool = True, habit: Optional[Habit] = None,
+              user_today: Optional[date] = None) -> dict:
     """
     The core action of the app. Creates the day's log, pays both XP tracks,
     updates streaks/day-state/challenge, and returns everything the feedback
@@ -462,12 +638,21 @@ def log_habit(db: Session, user: User, habit_id: int, payload: habit_schema.Habi
     enforce_window=False lets a trusted importer (Strava) backfill a run older
     than the 48h manual window; future dates are still rejected. source /
     external_ref stamp provenance and make the import idempotent.
+
+    settle_day=False leaves the date's DayCompletion to the caller — batch
+    importers log many dates and settle them once with
+    recompute_day_completions(); the payload's "day" is then None.
+
+    Callers that already hold the user's habit (bucket loaded) and local today
+    can pass them as habit / user_today to skip re-reading them.
     """
-    habit = get_user_habit(db, user.id, habit_id)
+    if habit is None or habit.id != habit_id or habit.user_id != user.id:
+        habit = get_user_habit(db, user.id, habit_id)
     if not habit or (habit.status != "active" and not allow_archived):
         raise ValueError("Habit not found")
 
-    user_today = get_user_today(db, user.id)
+    if user_today is None:
+        user_today = get_user_today(db, user)
     log_date = payload.date or user_today
     if enforce_window:
         _validate_log_date(user_today, log_date)
@@ -505,18 +690,19 @@ def log_habit(db: Session, user: User, habit_id: int, payload: habit_schema.Habi
     db.add(log)
     db.flush()
 
+    # One O(1) streak-cache update serves both the multiplier and milestones.
+    summary = _streak_after_log(db, habit, log_date)
+    streak = habit_logic.summary_current_streak(summary, habit.cadence_type, habit.weekdays, user_today)
+
     # --- Attribute XP track ---
     xp_breakdown = None
     attribute_state = None
     if attribute:
-        dates = _habit_log_dates(db, habit.id)
-        streak_now = habit_logic.current_streak(
-            habit.cadence_type, habit.weekdays, habit.times_per_week, dates, user_today)
         earned_today = _attribute_xp_earned_on(db, user.id, attribute, log_date)
         xp_breakdown = xp_engine.attribute_xp(
             base_xp=bucket.base_xp,
             detail_kind=bucket.detail_kind,
-            streak=streak_now,
+            streak=streak,
             attribute_xp_earned_today=earned_today,
             duration_minutes=payload.duration_minutes,
             distance=payload.distance,
@@ -535,9 +721,6 @@ def log_habit(db: Session, user: User, habit_id: int, payload: habit_schema.Habi
         _sync_weight_tracking(db, user, log, habit)
 
     # Streak milestones pay player XP once per habit per milestone.
-    dates = _habit_log_dates(db, habit.id)
-    streak = habit_logic.current_streak(
-        habit.cadence_type, habit.weekdays, habit.times_per_week, dates, user_today)
     milestone_hit = None
     milestone_bonus = xp_engine.streak_milestone_bonus(streak)
     if milestone_bonus:
@@ -548,12 +731,13 @@ def log_habit(db: Session, user: User, habit_id: int, payload: habit_schema.Habi
             milestone_hit = {"streak": streak, "bonus": milestone_bonus}
 
     # --- Day-complete state (the dopamine anchor) ---
-    day = recompute_day_completion(db, user, log_date)
+    day = recompute_day_completion(db, user, log_date) if settle_day else None
 
     # --- Challenge auto-progress (connects the islands) ---
     challenge = _auto_progress_challenge(db, user, habit, log_date, user_today)
 
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(user)
 
     player_after = xp_engine.player_level_from_xp(user.player_xp)
@@ -565,19 +749,132 @@ def log_habit(db: Session, user: User, habit_id: int, payload: habit_schema.Habi
         "xp": xp_breakdown,
         "attribute_state": attribute_state,
         "streak": {"current": streak, "milestone": milestone_hit},
-        "day": {**day, "day_streak": _day_streak(db, user.id, user_today)},
+        "day": {**day, "day_streak": _day_streak(db, user.id, user_today)} if day else None,
         "player": {**player_after, "leveled_up": player_after["level"] > player_before["level"]},
         "challenge": challenge,
     }
 
 
+def log_habit_batch(db: Session, user: User, habit: Habit,
+                    payloads: List[habit_schema.HabitLogCreate],
+                    source: str = "manual", external_refs: Optional[List[Optional[str]]] = None,
+                    user_today: Optional[date] = None) -> List[HabitLog]:
+    """
+    log_habit for a trusted importer's batch of new dates on one standard
+    habit, settled set-based: one read each for the streak cache, the day's
+    attribute XP already earned, the skill and the milestone ledger, then the
+    logs inserted together. Pays exactly what logging the dates one at a time,
+    oldest first, would: each log's streak multiplier and milestone come from
+    the streak with every earlier log of the batch folded in.
+
+    The dates must be distinct, not yet logged for the habit, and not in the
+    future; backfills past the 48h window are allowed. DayCompletion, the
+    commit and challenge progress are left to the caller
+    (recompute_day_completions, then progress_challenge_after_batch).
+    Returns the new logs, oldest first, flushed so they carry ids.
+    """
+    if not payloads:
+        return []
+    if habit.habit_type != "standard":
+        raise ValueError("Only standard habits can be logged in a batch")
+    if user_today is None:
+        user_today = get_user_today(db, user)
+    refs = external_refs or [None] * len(payloads)
+    entries = sorted(zip(payloads, refs), key=lambda entry: entry[0].date)
+    dates = [payload.date for payload, _ in entries]
+    if len(set(dates)) != len(dates) or None in dates:
+        raise ValueError("Each batch entry needs its own date")
+    if dates[-1] > user_today:
+        raise ValueError("Cannot log habits for future dates")
+
+    bucket = habit.bucket
+    attribute = bucket.attribute
+    cadence = _cadence_args(habit)
+    earned = dict(db.query(HabitLog.date, func.coalesce(func.sum(HabitLog.attribute_xp), 0)).filter(
+        HabitLog.user_id == user.id,
+        HabitLog.attribute == attribute,
+        HabitLog.date.in_(dates),
+    ).group_by(HabitLog.date).all())
+
+    # Streaks as each log lands: fold into the cached summary, rebuilding from
+    # the full date set only where a fold can't apply (as _streak_after_log does).
+    row = _streak_row(db, habit)
+    summary = _cached_summary(habit, row)
+    logged = None
+    streaks = []
+    for d in dates:
+        updated = habit_logic.summary_after_log(summary, *cadence, d) if summary is not None else None
+        if updated is None:
+            if logged is None:
+                logged = _habit_log_dates(db, habit.id)
+            updated = habit_logic.streak_summary(*cadence, logged | {x for x in dates if x <= d})
+        summary = updated
+        streaks.append(habit_logic.summary_current_streak(summary, habit.cadence_type, habit.weekdays, user_today))
+    _store_streak_summary(db, habit, summary, row)
+
+    milestone_keys = {streak: f"habit:{habit.id}:milestone:{streak}"
+                      for streak in streaks if xp_engine.streak_milestone_bonus(streak)}
+    paid_keys = {key for (key,) in db.query(PlayerXPEvent.source_key).filter(
+        PlayerXPEvent.user_id == user.id,
+        PlayerXPEvent.source == "streak_milestone",
+        PlayerXPEvent.source_key.in_(list(milestone_keys.values())),
+    ).all()} if milestone_keys else set()
+
+    logs = []
+    attribute_total = 0
+    for (payload, ref), streak in zip(entries, streaks):
+        xp = xp_engine.attribute_xp(
+            base_xp=bucket.base_xp,
+            detail_kind=bucket.detail_kind,
+            streak=streak,
+            attribute_xp_earned_today=int(earned.get(payload.date) or 0),
+            duration_minutes=payload.duration_minutes,
+            distance=payload.distance,
+            quantity=payload.quantity,
+            volume=payload.value if bucket.detail_kind == "volume" else None,
+        )
+        attribute_total += xp["total"]
+        logs.append(HabitLog(
+            habit_id=habit.id, user_id=user.id, date=payload.date,
+            value=payload.value, duration_minutes=payload.duration_minutes,
+            distance=payload.distance, quantity=payload.quantity, note=payload.note,
+            attribute=attribute, attribute_xp=xp["total"],
+            source=source, external_ref=ref, is_backfill=payload.date != user_today,
+        ))
+        key = milestone_keys.get(streak)
+        if key and key not in paid_keys:
+            paid_keys.add(key)
+            _award_player_xp(db, user, xp_engine.streak_milestone_bonus(streak), source="streak_milestone",
+                             source_key=key, meta={"habit": habit.name, "streak": streak})
+
+    db.add_all(logs)
+    db.flush()
+    # Level-ups carry over the same whether the XP lands at once or log by log.
+    _award_attribute_xp(db, user.id, attribute, attribute_total)
+    return logs
+
+
+def progress_challenge_after_batch(db: Session, user: User, habit: Habit, log_dates: Iterable[date],
+                                   user_today: date) -> Optional[dict]:
+    """
+    Challenge auto-progress for a log_habit_batch, once the caller has committed
+    it (the challenge check commits on its own). As with log_habit, only a log
+    for today counts.
+    """
+    if user_today not in set(log_dates):
+        return None
+    challenge = _auto_progress_challenge(db, user, habit, user_today, user_today)
+    db.commit()
+    return challenge
+
+
 def update_log(db: Session, user: User, habit_id: int, log_date: date,
                payload: habit_schema.HabitLogUpdate) -> dict:
     """48h edit window: editing adds data, never XP."""
     habit = get_user_habit(db, user.id, habit_id)
     if not habit:
         raise ValueError("Habit not found")
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     _validate_log_date(user_today, log_date)
 
     log = db.query(HabitLog).filter(HabitLog.habit_id == habit.id, HabitLog.date == log_date).first()
@@ -598,6 +895,7 @@ def update_log(db: Session, user: User, habit_id: int, log_date: date,
             entry.weight = payload.value
 
     db.commit()
+    invalidate_user_cache(user.id)
     return {"log": _log_dict(log), "habit_id": habit.id}
 
 
@@ -606,7 +904,7 @@ def delete_log(db: Session, user: User, habit_id: int, log_date: date) -> dict:
     habit = get_user_habit(db, user.id, habit_id)
     if not habit:
         raise ValueError("Habit not found")
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     _validate_log_date(user_today, log_date)
 
     log = db.query(HabitLog).filter(HabitLog.habit_id == habit.id, HabitLog.date == log_date).first()
@@ -627,9 +925,11 @@ def delete_log(db: Session, user: User, habit_id: int, log_date: date) -> dict:
 
     db.delete(log)
     db.flush()
+    _streak_after_unlog(db, habit, log_date)
 
     day = recompute_day_completion(db, user, log_date)
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(user)
 
     return {
@@ -662,25 +962,48 @@ def _log_dict(log: HabitLog) -> dict:
     }
 
 
-def _habit_today_dict(db: Session, habit: Habit, user_today: date) -> dict:
-    dates = _habit_log_dates(db, habit.id)
-    today_log = None
-    if user_today in dates:
-        row = db.query(HabitLog).filter(
-            HabitLog.habit_id == habit.id, HabitLog.date == user_today).first()
-        today_log = _log_dict(row) if row else None
-
-    last_value = None
-    if habit.habit_type == "measurement":
-        prev = (
-            db.query(HabitLog.value)
-            .filter(HabitLog.habit_id == habit.id,
+def _today_log_maps(db: Session, habits: List[Habit], user_today: date) -> tuple:
+    """
+    Everything the per-habit Today cards read from the logs, fetched set-based
+    so the view costs a fixed handful of queries however many slots are in use:
+    full-history log dates, today's log rows, and each measurement habit's last
+    value before today.
+    """
+    habit_ids = [h.id for h in habits]
+    dates_by_habit = _log_dates_by_habit(db, habit_ids)
+    today_logs = {}
+    last_values = {}
+    if not habit_ids:
+        return dates_by_habit, today_logs, last_values
+
+    for row in db.query(HabitLog).filter(
+            HabitLog.habit_id.in_(habit_ids), HabitLog.date == user_today).all():
+        today_logs[row.habit_id] = row
+
+    measurement_ids = [h.id for h in habits if h.habit_type == "measurement"]
+    if measurement_ids:
+        latest = (
+            db.query(HabitLog.habit_id, func.max(HabitLog.date).label("latest_date"))
+            .filter(HabitLog.habit_id.in_(measurement_ids),
                     HabitLog.date < user_today,
                     HabitLog.value.isnot(None))
-            .order_by(HabitLog.date.desc())
-            .first()
+            .group_by(HabitLog.habit_id)
+            .subquery()
+        )
+        rows = (
+            db.query(HabitLog.habit_id, HabitLog.value)
+            .join(latest, (HabitLog.habit_id == latest.c.habit_id)
+                  & (HabitLog.date == latest.c.latest_date))
+            .all()
         )
-        last_value = prev[0] if prev else None
+        last_values = {habit_id: value for habit_id, value in rows}
+
+    return dates_by_habit, today_logs, last_values
+
+
+def _habit_today_dict(habit: Habit, user_today: date, dates: set,
+                      today_row: Optional[HabitLog], last_value: Optional[float]) -> dict:
+    today_log = _log_dict(today_row) if today_row else None
 
     bucket = habit.bucket
     return {
@@ -716,13 +1039,15 @@ def _habit_today_dict(db: Session, habit: Habit, user_today: date) -> dict:
 
 def get_today(db: Session, user: User) -> dict:
     """Everything the Today view needs in one call. One screen, loads instantly."""
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     habits = get_user_habits(db, user.id, include_archived=False)
+    dates_by_habit, today_logs, last_values = _today_log_maps(db, habits, user_today)
 
     today_habits = []
     weekly_habits = []
     for habit in habits:
-        info = _habit_today_dict(db, habit, user_today)
+        info = _habit_today_dict(habit, user_today, dates_by_habit[habit.id],
+                                 today_logs.get(habit.id), last_values.get(habit.id))
         if habit.cadence_type == habit_logic.CADENCE_WEEKLY:
             weekly_habits.append(info)
         else:
@@ -734,7 +1059,8 @@ def get_today(db: Session, user: User) -> dict:
     status = xp_engine.day_status(len(scheduled), len(completed))
 
     player = xp_engine.player_level_from_xp(user.player_xp)
-    slots = slot_state(db, user)
+    # Slot usage falls out of the habits already loaded — no extra count query.
+    slots = _slot_payload(player["level"], sum(1 for h in habits if h.habit_type == "standard"))
 
     # Active challenge strip
     challenge_payload = None
@@ -780,7 +1106,7 @@ def get_today(db: Session, user: User) -> dict:
 
 def get_heatmap(db: Session, user: User, days: int = 182, habit_id: Optional[int] = None) -> dict:
     """Per-day completion counts for the streak heatmap (the ripples replacement)."""
-    user_today = get_user_today(db, user.id)
+    user_today = get_user_today(db, user)
     start = user_today - timedelta(days=days - 1)
 
     log_query = db.query(HabitLog.date, func.count(HabitLog.id)).filter(
@@ -810,10 +1136,39 @@ def get_heatmap(db: Session, user: User, days: int = 182, habit_id: Optional[int
     return {"start": str(start), "end": str(user_today), "days": days_out}
 
 
-def get_heatmap_by_habit(db: Session, user: User, days: int = 126) -> dict:
+HEATMAP_ENCODINGS = ("days", "bits", "rle")
+
+
+def _encode_grid(logged: List[bool], encoding: str) -> str:
+    """
+    Compact per-habit grids, oldest day first:
+      bits  one char per day, '1' = logged ("0010110...")
+      rle   comma-separated run lengths alternating unlogged/logged, always
+            starting with an unlogged run (which may be 0): "5,3,118"
+    """
+    if encoding == "bits":
+        return "".join("1" if hit else "0" for hit in logged)
+    runs, current, length = [], False, 0
+    for hit in logged:
+        if hit != current:
+            runs.append(length)
+            current, length = hit, 0
+        length += 1
+    runs.append(length)
+    return ",".join(str(n) for n in runs)
+
+
+def get_heatmap_by_habit(db: Session, user: User, days: int = 126, encoding: str = "days") -> dict:
     """Every habit's grid + streak in one call — feeds the iOS home-screen
-    widget's per-habit cards (fetched native-only, so the web never pays)."""
-    user_today = get_user_today(db, user.id)
+    widget's per-habit cards (fetched native-only, so the web never pays).
+
+    A fixed number of queries: the windowed log fetch for the grids, and the
+    streak cache (habit_streaks) for streaks, so full history is never read.
+    encoding='bits' | 'rle' swaps each habit's list of day dicts for a string
+    grid (see _encode_grid)."""
+    if encoding not in HEATMAP_ENCODINGS:
+        raise ValueError(f"Unknown heatmap encoding '{encoding}'")
+    user_today = get_user_today(db, user)
     start = user_today - timedelta(days=days - 1)
     habits = get_user_habits(db, user.id, include_archived=False)
 
@@ -823,59 +1178,126 @@ def get_heatmap_by_habit(db: Session, user: User, days: int = 126) -> dict:
     counts_by_habit = {}
     for habit_id, log_date, n in rows:
         counts_by_habit.setdefault(habit_id, {})[log_date] = int(n)
+    summaries = get_streak_summaries(db, habits)
+    window = [start + timedelta(days=i) for i in range(days)]
 
     out = []
     for habit in habits:
         counts = counts_by_habit.get(habit.id, {})
-        dates = _habit_log_dates(db, habit.id)  # full history, for streaks
-        days_out = []
-        cursor = start
-        while cursor <= user_today:
-            n = counts.get(cursor, 0)
-            days_out.append({
-                "date": str(cursor),
-                "count": n,
-                "status": "complete" if n else "none",
-            })
-            cursor += timedelta(days=1)
-        out.append({
+        summary = summaries[habit.id]
+        entry = {
             "id": habit.id,
             "name": habit.name,
             "icon": habit.icon or (habit.bucket.icon if habit.bucket else None),
             "cadence_type": habit.cadence_type,
             "times_per_week": habit.times_per_week,
-            "current_streak": habit_logic.current_streak(
-                habit.cadence_type, habit.weekdays, habit.times_per_week, dates, user_today),
-            "completed_today": user_today in dates,
-            "week_count": habit_logic.week_count(dates, user_today),
-            "days": days_out,
-        })
-    return {"start": str(start), "end": str(user_today), "habits": out}
+            "current_streak": habit_logic.summary_current_streak(
+                summary, habit.cadence_type, habit.weekdays, user_today),
+            "completed_today": summary["last_date"] == user_today,
+            "week_count": habit_logic.summary_week_count(summary, user_today),
+        }
+        if encoding == "days":
+            entry["days"] = [
+                {"date": str(d), "count": counts.get(d, 0),
+                 "status": "complete" if counts.get(d) else "none"}
+                for d in window
+            ]
+        else:
+            entry["grid"] = _encode_grid([bool(counts.get(d)) for d in window], encoding)
+        out.append(entry)
+    result = {"start": str(start), "end": str(user_today), "habits": out}
+    if encoding != "days":
+        result["encoding"] = encoding
+    return result
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a user's cached read responses. Call after any write that changes
+    what Today, the heatmaps or the stats overview show."""
+    response_cache.responses.invalidate_user(user_id)
+
+
+def _log_dates_by_habit(db: Session, habit_ids: List[int]) -> Dict[int, set]:
+    """Full-history log dates for many habits in one query, partitioned by habit."""
+    dates_by_habit = {hid: set() for hid in habit_ids}
+    if habit_ids:
+        for habit_id, log_date in db.query(HabitLog.habit_id, HabitLog.date).filter(
+                HabitLog.habit_id.in_(habit_ids)).all():
+            dates_by_habit[habit_id].add(log_date)
+    return dates_by_habit
+
+
+def _rows_by_habit(rows) -> Dict[int, list]:
+    grouped = {}
+    for habit_id, *rest in rows:
+        grouped.setdefault(habit_id, []).append(tuple(rest))
+    return grouped
 
 
 def get_stats_overview(db: Session, user: User) -> dict:
-    """Numbers a user can look at and FEEL progress (or its absence)."""
-    user_today = get_user_today(db, user.id)
-    habits = get_user_habits(db, user.id, include_archived=False)
+    """
+    Numbers a user can look at and FEEL progress (or its absence).
 
-    completions = db.query(DayCompletion).filter(DayCompletion.user_id == user.id).all()
-    complete_dates = {c.date for c in completions if c.status == "complete"}
+    A fixed number of queries: one aggregate per table instead of a query set
+    per habit. Measurement and pace histories are part of the payload, so
+    their rows are fetched once for all habits and the derived numbers
+    computed from them in the same pass.
+    """
+    user_today = get_user_today(db, user)
+    habits = get_user_habits(db, user.id, include_archived=False)
+    habit_ids = [h.id for h in habits]
     thirty_ago = user_today - timedelta(days=29)
-    days_with_schedule_30d = [c for c in completions if c.date >= thirty_ago and c.scheduled_count > 0]
-    complete_30d = [c for c in days_with_schedule_30d if c.status == "complete"]
 
-    distinct_log_days = db.query(func.count(func.distinct(HabitLog.date))).filter(
-        HabitLog.user_id == user.id).scalar() or 0
-    total_logs = db.query(func.count(HabitLog.id)).filter(HabitLog.user_id == user.id).scalar() or 0
+    complete_dates = {r.date for r in db.query(DayCompletion.date).filter(
+        DayCompletion.user_id == user.id, DayCompletion.status == "complete").all()}
+    scheduled_30d, complete_30d = db.query(
+        func.count(DayCompletion.id),
+        func.coalesce(func.sum(case((DayCompletion.status == "complete", 1), else_=0)), 0),
+    ).filter(
+        DayCompletion.user_id == user.id,
+        DayCompletion.date >= thirty_ago,
+        DayCompletion.scheduled_count > 0,
+    ).one()
+
+    distinct_log_days, total_logs = db.query(
+        func.count(func.distinct(HabitLog.date)), func.count(HabitLog.id)
+    ).filter(HabitLog.user_id == user.id).one()
+
+    aggregates = {}
+    if habit_ids:
+        aggregates = {
+            habit_id: (duration, distance, quantity)
+            for habit_id, duration, distance, quantity in db.query(
+                HabitLog.habit_id,
+                func.coalesce(func.sum(HabitLog.duration_minutes), 0),
+                func.coalesce(func.sum(HabitLog.distance), 0),
+                func.coalesce(func.sum(HabitLog.quantity), 0),
+            ).filter(HabitLog.habit_id.in_(habit_ids)).group_by(HabitLog.habit_id).all()
+        }
+    dates_by_habit = _log_dates_by_habit(db, habit_ids)
+
+    measurement_ids = [h.id for h in habits if h.habit_type == "measurement"]
+    values_by_habit = {}
+    if measurement_ids:
+        values_by_habit = _rows_by_habit(
+            db.query(HabitLog.habit_id, HabitLog.date, HabitLog.value).filter(
+                HabitLog.habit_id.in_(measurement_ids), HabitLog.value.isnot(None)
+            ).order_by(HabitLog.habit_id, HabitLog.date).all())
+
+    distance_ids = [h.id for h in habits if h.bucket and h.bucket.detail_kind == "distance_duration"]
+    runs_by_habit = {}
+    if distance_ids:
+        runs_by_habit = _rows_by_habit(
+            db.query(HabitLog.habit_id, HabitLog.date, HabitLog.distance, HabitLog.duration_minutes).filter(
+                HabitLog.habit_id.in_(distance_ids),
+                HabitLog.distance.isnot(None), HabitLog.distance > 0,
+                HabitLog.duration_minutes.isnot(None), HabitLog.duration_minutes > 0,
+            ).order_by(HabitLog.habit_id, HabitLog.date).all())
 
     habit_stats = []
     for habit in habits:
-        dates = _habit_log_dates(db, habit.id)
-        aggregates = db.query(
-            func.coalesce(func.sum(HabitLog.duration_minutes), 0),
-            func.coalesce(func.sum(HabitLog.distance), 0),
-            func.coalesce(func.sum(HabitLog.quantity), 0),
-        ).filter(HabitLog.habit_id == habit.id).first()
+        dates = dates_by_habit[habit.id]
+        totals = aggregates.get(habit.id, (0, 0, 0))
 
         entry = {
             "id": habit.id,
@@ -895,61 +1317,51 @@ def get_stats_overview(db: Session, user: User) -> dict:
                 habit.cadence_type, habit.weekdays, habit.times_per_week, dates),
             "total_completions": len(dates),
             "completions_30d": sum(1 for d in dates if d >= thirty_ago),
-            "total_duration_minutes": int(aggregates[0]),
-            "total_distance": float(aggregates[1]),
-            "total_quantity": int(aggregates[2]),
+            "total_duration_minutes": int(totals[0]),
+            "total_distance": float(totals[1]),
+            "total_quantity": int(totals[2]),
         }
 
-        if habit.habit_type == "measurement":
-            values = db.query(HabitLog.date, HabitLog.value).filter(
-                HabitLog.habit_id == habit.id, HabitLog.value.isnot(None)
-            ).order_by(HabitLog.date).all()
-            if values:
-                last7 = [v for d, v in values if d >= user_today - timedelta(days=6)]
-                month_ago_vals = [v for d, v in values if d <= user_today - timedelta(days=30)]
-                latest_val = values[-1][1]
-                goal = habit.target_value
-                entry["measurement"] = {
-                    "latest": latest_val,
-                    "latest_date": str(values[-1][0]),
-                    "avg_7d": round(sum(last7) / len(last7), 1) if last7 else None,
-                    "delta_30d": round(latest_val - month_ago_vals[-1], 1) if month_ago_vals else None,
-                    "goal": goal,
-                    "to_goal": round(latest_val - goal, 1) if goal is not None else None,
-                    "history": [{"date": str(d), "value": v} for d, v in values],
-                }
-
-        if habit.bucket and habit.bucket.detail_kind == "distance_duration":
-            runs = db.query(HabitLog.date, HabitLog.distance, HabitLog.duration_minutes).filter(
-                HabitLog.habit_id == habit.id,
-                HabitLog.distance.isnot(None), HabitLog.distance > 0,
-                HabitLog.duration_minutes.isnot(None), HabitLog.duration_minutes > 0,
-            ).order_by(HabitLog.date).all()
-            if runs:
-                entry["pace"] = {
-                    "best_pace_min_per_mile": round(min(dur / dist for _, dist, dur in runs), 2),
-                    "latest_pace_min_per_mile": round(runs[-1][2] / runs[-1][1], 2),
-                    "history": [
-                        {"date": str(d), "distance": dist, "duration": dur,
-                         "pace": round(dur / dist, 2)}
-                        for d, dist, dur in runs
-                    ],
-                }
+        values = values_by_habit.get(habit.id) if habit.habit_type == "measurement" else None
+        if values:
+            last7 = [v for d, v in values if d >= user_today - timedelta(days=6)]
+            month_ago_vals = [v for d, v in values if d <= user_today - timedelta(days=30)]
+            latest_val = values[-1][1]
+            goal = habit.target_value
+            entry["measurement"] = {
+                "latest": latest_val,
+                "latest_date": str(values[-1][0]),
+                "avg_7d": round(sum(last7) / len(last7), 1) if last7 else None,
+                "delta_30d": round(latest_val - month_ago_vals[-1], 1) if month_ago_vals else None,
+                "goal": goal,
+                "to_goal": round(latest_val - goal, 1) if goal is not None else None,
+                "history": [{"date": str(d), "value": v} for d, v in values],
+            }
+
+        runs = runs_by_habit.get(habit.id)
+        if runs:
+            entry["pace"] = {
+                "best_pace_min_per_mile": round(min(dur / dist for _, dist, dur in runs), 2),
+                "latest_pace_min_per_mile": round(runs[-1][2] / runs[-1][1], 2),
+                "history": [
+                    {"date": str(d), "distance": dist, "duration": dur,
+                     "pace": round(dur / dist, 2)}
+                    for d, dist, dur in runs
+                ],
+            }
 
         habit_stats.append(entry)
 
-    player = xp_engine.player_level_from_xp(user.player_xp)
     return {
-        "player": player,
+        "player": xp_engine.player_level_from_xp(user.player_xp),
         "consistency": {
             "day_streak": habit_logic.day_streak(complete_dates, user_today),
             "best_day_streak": habit_logic.best_daily_streak(complete_dates),
-            "total_days_logged": int(distinct_log_days),
-            "total_logs": int(total_logs),
+            "total_days_logged": int(distinct_log_days or 0),
+            "total_logs": int(total_logs or 0),
             "complete_days": len(complete_dates),
             "day_complete_rate_30d": (
-                round(len(complete_30d) / len(days_with_schedule_30d), 2)
-                if days_with_schedule_30d else None
+                round(int(complete_30d) / scheduled_30d, 2) if scheduled_30d else None
             ),
         },
         "habits": habit_stats,
@@ -19,6 +19,7 @@ from datetime import datetime
 from typing import List, Optional
 
 import jwt
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from ..config import Config
@@ -27,7 +28,7 @@ from ..models.habit_model import Habit, HabitLog
 from ..models.user_model import User
 from ..schemas import habit_schema
 from ..utils.time import utc_now, get_user_today
-from .. import strava_client
+from .. import strava_client, strava_tokens
 from . import habit_crud
 
 logger = logging.getLogger(__name__)
@@ -35,6 +36,7 @@ logger = logging.getLogger(__name__)
 METERS_PER_MILE = 1609.34
 STATE_TTL_SECONDS = 600          # the connect handshake is a few seconds; 10 min is plenty
 DEFAULT_LOOKBACK_DAYS = 30       # first sync (no prior sync time) pulls the last month
+CURSOR_OVERLAP_SECONDS = 86400   # re-ask for a day before the cursor (late uploads); dedup handles it
 
 
 # ---------------------------------------------------------------------------
@@ -105,19 +107,21 @@ def upsert_connection(db: Session, user_id: int, token_response: dict) -> Strava
     conn.scope = token_response.get("scope") or conn.scope
     db.commit()
     db.refresh(conn)
+    strava_tokens.forget(conn.id)
     return conn
 
 
 def ensure_fresh_token(db: Session, conn: StravaConnection) -> str:
-    """Return a valid access token, refreshing + persisting if it's near expiry."""
-    if strava_client.needs_refresh(conn.expires_at):
-        refreshed = strava_client.refresh_tokens(conn.refresh_token)
-        conn.access_token = refreshed["access_token"]
-        conn.refresh_token = refreshed["refresh_token"]
-        conn.expires_at = refreshed["expires_at"]
-        db.commit()
-        db.refresh(conn)
-    return conn.access_token
+    """Return a valid access token, refreshing + persisting if it's near expiry
+    (cached, and refreshed once however many callers race; see strava_tokens)."""
+    return strava_tokens.access_token(db, conn)
+
+
+def _forget_rejected_token(conn_id: int, exc: strava_client.StravaError) -> None:
+    """A 401 means the cached token was revoked or replaced elsewhere; the next
+    call re-reads the connection row."""
+    if exc.status_code == 401:
+        strava_tokens.forget(conn_id)
 
 
 def update_settings(db: Session, user_id: int, target_habit_id: Optional[int] = None,
@@ -145,6 +149,7 @@ def disconnect(db: Session, user_id: int) -> None:
     try:
         strava_client.deauthorize(conn.access_token)
     finally:
+        strava_tokens.forget(conn.id)
         db.delete(conn)
         db.commit()
 
@@ -170,11 +175,8 @@ def _local_date(activity: dict):
         return datetime.strptime(raw[:10], "%Y-%m-%d").date()
 
 
-def import_activities(db: Session, user: User, activities: List[dict]) -> dict:
-    """
-    Map a batch of Strava activities onto the target habit. Pure DB work — the
-    caller fetches `activities`, so this is unit-testable without HTTP.
-    """
+def _import_target(db: Session, user: User):
+    """The user's connection and the habit their activities log to, or ValueError."""
     conn = get_connection(db, user.id)
     if not conn:
         raise ValueError("Strava is not connected")
@@ -184,26 +186,45 @@ def import_activities(db: Session, user: User, activities: List[dict]) -> dict:
     habit = habit_crud.get_user_habit(db, user.id, conn.target_habit_id)
     if not habit or habit.status != "active":
         raise ValueError("Your Strava target habit is missing — pick another")
+    return conn, habit
+
 
-    user_today = get_user_today(db, user.id)
-    already = {
+def _imported_ids(db: Session, user_id: int) -> set:
+    return {
         row.activity_id for row in
         db.query(StravaActivityImport.activity_id)
-        .filter(StravaActivityImport.user_id == user.id).all()
+        .filter(StravaActivityImport.user_id == user_id).all()
     }
 
-    imported = 0
-    skipped_duplicate = 0
-    days = set()
-    total_xp = 0
 
-    # Oldest first so a day's first run creates the log and later ones accumulate.
+def _import_chunk(db: Session, user: User, conn: StravaConnection, habit: Habit,
+                  activities: List[dict], already: set, totals: dict) -> None:
+    """
+    Import one batch and commit it; adds to `totals` and marks ids in `already`.
+    Set-based: map every activity to its local day, find the days the habit
+    already has a log for in one query, create the rest in one
+    log_habit_batch (same XP as logging them one by one), and write the
+    ledger rows in one insert.
+    """
+    # Imports for one user (a sync, queued webhooks) write the same logs and
+    # streak row; take them in turn.
+    db.query(StravaConnection.id).filter(StravaConnection.id == conn.id).with_for_update().scalar()
+    # `already` was read before the lock; another import may have landed some
+    # of these since (a webhook during a sync's walk). Re-check under the lock.
+    ids = [a["id"] for a in activities if a.get("id") is not None and a["id"] not in already]
+    if ids:
+        already.update(row.activity_id for row in db.query(StravaActivityImport.activity_id).filter(
+            StravaActivityImport.user_id == user.id, StravaActivityImport.activity_id.in_(ids)))
+    user_today = get_user_today(db, user)
+
+    # 1. Map: the activities that import, oldest first, each on its local day.
+    mapped = []
     for activity in sorted(activities, key=lambda a: a.get("start_date_local") or a.get("start_date") or ""):
         activity_id = activity.get("id")
         if activity_id is None:
             continue
         if activity_id in already:
-            skipped_duplicate += 1
+            totals["skipped_duplicate"] += 1
             continue
         sport = activity.get("sport_type") or activity.get("type") or ""
         if not _allowed_sport(sport, conn.import_rides):
@@ -211,62 +232,129 @@ def import_activities(db: Session, user: User, activities: List[dict]) -> dict:
         log_date = _local_date(activity)
         if not log_date or log_date > user_today:
             continue
-
-        distance_mi = round((activity.get("distance") or 0) / METERS_PER_MILE, 2)
-        duration_min = round((activity.get("moving_time") or 0) / 60, 1)
-
-        existing = db.query(HabitLog).filter(
-            HabitLog.habit_id == habit.id, HabitLog.date == log_date).first()
-        if existing:
-            # Second+ activity that day: accumulate detail only (no re-pay).
-            existing.distance = round((existing.distance or 0) + distance_mi, 2)
-            existing.duration_minutes = round((existing.duration_minutes or 0) + duration_min, 1)
-            db.flush()
-            log_id = existing.id
-        else:
-            result = habit_crud.log_habit(
-                db, user, habit.id,
-                habit_schema.HabitLogCreate(date=log_date, distance=distance_mi,
-                                            duration_minutes=duration_min),
-                enforce_window=False, source="strava",
-                external_ref=f"strava:{activity_id}",
-            )
-            log_id = result["log"]["id"]
-            total_xp += (result["log"].get("player_xp") or 0) + (result["log"].get("attribute_xp") or 0)
-
-        db.add(StravaActivityImport(
-            connection_id=conn.id, user_id=user.id, activity_id=activity_id,
-            sport_type=sport, log_date=log_date.isoformat(),
-            distance_miles=distance_mi, duration_minutes=duration_min, habit_log_id=log_id,
-        ))
         already.add(activity_id)
-        imported += 1
-        days.add(log_date)
-
-    conn.last_synced_at = utc_now()
+        mapped.append((activity_id, sport, log_date,
+                       round((activity.get("distance") or 0) / METERS_PER_MILE, 2),
+                       round((activity.get("moving_time") or 0) / 60, 1)))
+
+    days = {log_date for _, _, log_date, _, _ in mapped}
+    # 2. Dedup against the habit's existing logs on those days.
+    logs = {log.date: log for log in db.query(HabitLog).filter(
+        HabitLog.habit_id == habit.id, HabitLog.date.in_(days)).all()} if days else {}
+
+    # 3. A day's first activity creates its log and earns the XP; later ones
+    #    that day only add distance/duration (no re-pay).
+    firsts = {}
+    for entry in mapped:
+        if entry[2] not in logs:
+            firsts.setdefault(entry[2], entry)
+    new_logs = habit_crud.log_habit_batch(
+        db, user, habit,
+        [habit_schema.HabitLogCreate(date=d, distance=distance, duration_minutes=duration)
+         for _, _, d, distance, duration in firsts.values()],
+        source="strava", external_refs=[f"strava:{entry[0]}" for entry in firsts.values()],
+        user_today=user_today,
+    )
+    logs.update((log.date, log) for log in new_logs)
+    totals["xp_awarded"] += sum((log.player_xp or 0) + (log.attribute_xp or 0) for log in new_logs)
+
+    ledger = []
+    for entry in mapped:
+        activity_id, sport, log_date, distance_mi, duration_min = entry
+        log = logs[log_date]
+        if firsts.get(log_date) is not entry:
+            log.distance = round((log.distance or 0) + distance_mi, 2)
+            log.duration_minutes = round((log.duration_minutes or 0) + duration_min, 1)
+        ledger.append({
+            "connection_id": conn.id, "user_id": user.id, "activity_id": activity_id,
+            "sport_type": sport, "log_date": log_date.isoformat(), "distance_miles": distance_mi,
+            "duration_minutes": duration_min, "habit_log_id": log.id,
+        })
+    if ledger:
+        db.execute(insert(StravaActivityImport), ledger)
+
+    # 4. Day-complete state for every touched date in one set-based pass.
+    habit_crud.recompute_day_completions(db, user, days)
     db.commit()
+    habit_crud.progress_challenge_after_batch(db, user, habit, firsts, user_today)
+    habit_crud.invalidate_user_cache(user.id)
+    totals["imported"] += len(mapped)
+    totals["days"] |= days
+
+
+def _new_totals() -> dict:
+    return {"imported": 0, "skipped_duplicate": 0, "xp_awarded": 0, "days": set()}
 
+
+def _summary(totals: dict) -> dict:
     return {
-        "imported": imported,
-        "days_logged": len(days),
-        "skipped_duplicate": skipped_duplicate,
-        "xp_awarded": total_xp,
+        "imported": totals["imported"],
+        "days_logged": len(totals["days"]),
+        "skipped_duplicate": totals["skipped_duplicate"],
+        "xp_awarded": totals["xp_awarded"],
     }
 
 
+def import_activities(db: Session, user: User, activities: List[dict]) -> dict:
+    """
+    Map a batch of Strava activities onto the target habit. Pure DB work — the
+    caller fetches `activities`, so this is unit-testable without HTTP.
+    """
+    conn, habit = _import_target(db, user)
+    totals = _new_totals()
+    _import_chunk(db, user, conn, habit, activities, _imported_ids(db, user.id), totals)
+    conn.last_synced_at = utc_now()
+    db.commit()
+    return _summary(totals)
+
+
+def _start_epoch(activity: dict) -> Optional[int]:
+    raw = activity.get("start_date")
+    if not raw:
+        return None
+    try:
+        return int(datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def _after_epoch(conn: StravaConnection) -> int:
+    """Where the next sync starts: the cursor a completed sync left, else the
+    last sync time, else the default lookback (first sync)."""
+    if conn.sync_cursor:
+        return conn.sync_cursor - CURSOR_OVERLAP_SECONDS
+    if conn.last_synced_at:
+        return int(conn.last_synced_at.timestamp()) - CURSOR_OVERLAP_SECONDS
+    return int(time.time()) - DEFAULT_LOOKBACK_DAYS * 86400
+
+
 def sync_now(db: Session, user: User) -> dict:
-    """Fetch recent activities from Strava and import them."""
-    conn = get_connection(db, user.id)
-    if not conn:
-        raise ValueError("Strava is not connected")
+    """
+    Fetch every activity since the sync cursor from Strava and import them.
+    Pages are fetched concurrently and imported a wave at a time as they
+    arrive; the cursor and last_synced_at only move once the whole walk has
+    landed, so a sync cut short by an error or the rate limit picks the rest
+    up next time.
+    """
+    conn, habit = _import_target(db, user)
     access_token = ensure_fresh_token(db, conn)
 
-    if conn.last_synced_at:
-        after = int(conn.last_synced_at.timestamp()) - 86400   # 1-day overlap; dedup handles it
-    else:
-        after = int(time.time()) - DEFAULT_LOOKBACK_DAYS * 86400
-    activities = strava_client.list_activities(access_token, after_epoch=after, per_page=100)
-    return import_activities(db, user, activities)
+    after = _after_epoch(conn)
+    already = _imported_ids(db, user.id)
+    totals = _new_totals()
+    conn_id, newest = conn.id, conn.sync_cursor or 0
+    try:
+        for chunk in strava_client.iter_activities(access_token, after_epoch=after):
+            starts = [epoch for epoch in map(_start_epoch, chunk) if epoch]
+            newest = max([newest, *starts])
+            _import_chunk(db, user, conn, habit, chunk, already, totals)
+    except strava_client.StravaError as exc:
+        _forget_rejected_token(conn_id, exc)
+        raise
+    conn.sync_cursor = newest or None
+    conn.last_synced_at = utc_now()
+    db.commit()
+    return _summary(totals)
 
 
 def import_one_activity(db: Session, conn: StravaConnection, activity_id: int) -> dict:
@@ -275,8 +363,17 @@ def import_one_activity(db: Session, conn: StravaConnection, activity_id: int) -
     if not user:
         raise ValueError("User not found")
     access_token = ensure_fresh_token(db, conn)
-    activity = strava_client.get_activity(access_token, activity_id)
-    return import_activities(db, user, [activity])
+    try:
+        activity = strava_client.get_activity(access_token, activity_id)
+    except strava_client.StravaError as exc:
+        _forget_rejected_token(conn.id, exc)
+        raise
+    # Not import_activities: one pushed activity isn't a sync, so it leaves
+    # last_synced_at (and with it the scheduled sync's staleness) alone.
+    conn, habit = _import_target(db, user)
+    totals = _new_totals()
+    _import_chunk(db, user, conn, habit, [activity], _imported_ids(db, user.id), totals)
+    return _summary(totals)
 
 
 def status(db: Session, user: User) -> dict:
@@ -3,6 +3,8 @@ from ..schemas import user_schema
 from ..models import user_model, skill_model, activity_model
 from ..skill_manager import calculate_required_xp, calculate_activity_streak, calculate_level
 from ..crud import activity_crud, workout_crud
+from ..utils.time import forget_user_timezone
+from ..auth import user_cache
 from passlib.context import CryptContext
 
 # Instantiate a CryptContext for hashing passwords
@@ -66,6 +68,8 @@ def delete_user(db: Session, user_id: int):
         return None
     db.delete(user_to_delete)
     db.commit()
+    forget_user_timezone(user_id)
+    user_cache.invalidate_user(user_id)
     return user_to_delete
 
 def get_user_stats(db: Session, user_id: int):
@@ -1,11 +1,19 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, text
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session, contains_eager, joinedload, lazyload
+from sqlalchemy import case, func, insert, text, update
 from ..schemas import workout_schema
 from ..models import workout_model, skill_model, activity_model
 from ..xp_calculator import calculate_workout_xp
 from ..skill_manager import update_skill_xp
 from ..crud.activity_crud import update_activity_streak
 from ..utils.time import utc_now, utc_today
+from ..exercise_catalog import catalog
+from .. import strength_analytics
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 
@@ -66,19 +74,50 @@ def get_exercises_for_specific_day(db: Session, program_id: int, day_name: str):
             workout_model.WorkoutDay.day_name == day_name
         ).all()
 
+def _program_exercise_rows(day_id: int, exercises) -> List[dict]:
+    return [{
+        "day_id": day_id,
+        "exercise_id": exercise["exercise_id"],
+        "sets": exercise["sets"],
+        "recommended_reps": exercise.get("recommended_reps"),
+        "recommended_duration_seconds": exercise.get("recommended_duration_seconds"),
+    } for exercise in exercises]
+
+
+def _load_program(db: Session, program_id: int):
+    """A program with its days and their exercises in one ordered query (not
+    its session history), refreshed over anything already in the session."""
+    rows = (
+        db.query(workout_model.WorkoutProgram)
+        .outerjoin(workout_model.WorkoutProgram.workout_days)
+        .outerjoin(workout_model.WorkoutDay.exercises)
+        .options(
+            lazyload(workout_model.WorkoutProgram.workout_sessions),
+            contains_eager(workout_model.WorkoutProgram.workout_days)
+            .contains_eager(workout_model.WorkoutDay.exercises),
+        )
+        .filter(workout_model.WorkoutProgram.program_id == program_id)
+        .order_by(workout_model.WorkoutDay.day_id, workout_model.ProgramExercise.program_exercise_id)
+        .populate_existing()
+        .all()   # one row per exercise; LIMIT would cut the collections short
+    )
+    return rows[0] if rows else None
+
+
 def create_workout_program(db: Session, user_id: int, program: workout_schema.WorkoutProgramCreate):
     """
-    Create a new workout program.
+    Create a new workout program: the program and its days in one flush, every
+    program exercise in one bulk INSERT, one commit.
     """
     # Check if the program name already exists for the user
-    existing_program = db.query(workout_model.WorkoutProgram).filter(
-        workout_model.WorkoutProgram.user_id == user_id, 
+    existing_program = db.query(workout_model.WorkoutProgram.program_id).filter(
+        workout_model.WorkoutProgram.user_id == user_id,
         workout_model.WorkoutProgram.name == program.name
     ).first()
 
     if existing_program:
         raise ValueError("A program with this name already exists.")
-    
+
     new_program = workout_model.WorkoutProgram(
         user_id=user_id,
         name=program.name,
@@ -89,38 +128,18 @@ def create_workout_program(db: Session, user_id: int, program: workout_schema.Wo
     db.add(new_program)
     db.flush()
 
-    # Iterate over each day in the program
-    for day in program.workout_days:
-        new_day = workout_model.WorkoutDay(
-            program_id=new_program.program_id,
-            day_name=day.day_name
-        )
-        db.add(new_day)
-        db.flush()
-
-        # Iterate over each exercise in the day
-        for exercise in day.exercises:
-            
-            new_program_exercise = workout_model.ProgramExercise(
-                day_id=new_day.day_id,
-                exercise_id=exercise.exercise_id,
-                sets=exercise.sets,
-                recommended_reps=exercise.recommended_reps,
-                recommended_duration_seconds=exercise.recommended_duration_seconds
-            )
-            db.add(new_program_exercise)
-            
-    db.commit()
-    db.refresh(new_program)
-
-    new_program = db.query(workout_model.WorkoutProgram).options(
-        joinedload(workout_model.WorkoutProgram.workout_days).joinedload(
-            workout_model.WorkoutDay.exercises)
-    ).filter(
-        workout_model.WorkoutProgram.program_id == new_program.program_id
-    ).first()
+    days = [workout_model.WorkoutDay(program_id=new_program.program_id, day_name=day.day_name)
+            for day in program.workout_days]
+    db.add_all(days)
+    db.flush()
+    rows = [row for day, day_data in zip(days, program.workout_days)
+            for row in _program_exercise_rows(day.day_id, [e.model_dump() for e in day_data.exercises])]
+    if rows:
+        db.execute(insert(workout_model.ProgramExercise), rows)
 
-    return new_program
+    program_id = new_program.program_id
+    db.commit()
+    return _load_program(db, program_id)
 
 def create_user_exercise(db: Session, user_id: int, exercise: workout_schema.ExerciseCreate):
     new_exercise = workout_model.Exercise(
@@ -143,6 +162,7 @@ def create_user_exercise(db: Session, user_id: int, exercise: workout_schema.Exe
     db.add(new_exercise)
     db.commit()
     db.refresh(new_exercise)
+    catalog.upsert(new_exercise)
     return new_exercise
 
 def edit_exercise(db: Session, exercise_id: int, user_id: int, exercise_update: workout_schema.ExerciseUpdate):
@@ -163,6 +183,7 @@ def edit_exercise(db: Session, exercise_id: int, user_id: int, exercise_update:
     exercise.updated_at = utc_now()
     db.commit()
     db.refresh(exercise)
+    catalog.upsert(exercise)
     return exercise
 
 def delete_exercise(db: Session, exercise_id: int, user_id: int):
@@ -186,35 +207,56 @@ def delete_exercise(db: Session, exercise_id: int, user_id: int):
 
     db.delete(exercise)
     db.commit()
+    catalog.remove(exercise_id)
     return exercise
 
 def get_exercises(db: Session, user_id: Optional[int] = None):
-    query = db.query(workout_model.Exercise).filter(
-        workout_model.Exercise.is_global == True
-    )
-    if user_id is not None:
-        query = query.union(
-            db.query(workout_model.Exercise).filter(
-                workout_model.Exercise.user_id == user_id
-            )
-        )
-    # Alphabetical so the picker is scannable (the UNION above is otherwise
-    # unordered). Case-insensitive sort done in Python to avoid DB-specific
-    # collation differences across the union.
-    return sorted(query.all(), key=lambda e: (e.name or '').lower())
+    """The global library plus the user's own exercises, A-Z, from the catalog index."""
+    return catalog.visible(db, user_id)
+
+
+def search_exercises(db: Session, user_id: Optional[int] = None, q: Optional[str] = None,
+                     muscle_group_id: Optional[int] = None, equipment_id: Optional[int] = None,
+                     limit: int = 25, offset: int = 0) -> dict:
+    """One page of the picker's exercise search (see ExerciseCatalog.search)."""
+    return catalog.search(db, user_id, q, muscle_group_id, equipment_id, limit, offset)
 
 def log_workout_session(db: Session, session_data: workout_schema.WorkoutSessionCreate, user_id: int):
     """
     Log a workout session with performed exercises and sets.
+
+    Batched: every program exercise resolves in one IN query, the session and
+    its exercises go out in one flush (batched INSERT ... RETURNING on
+    Postgres), all sets in one bulk INSERT, and the response is built from
+    the rows in hand rather than re-read. The strength-habit
+    payout shares the transaction; if it fails, its savepoint rolls back and
+    the session still commits.
     """
-    # Fetch program with name
-    workout_program = db.query(workout_model.WorkoutProgram).filter(
+    # Fetch program with name (not its selectin-loaded session history)
+    workout_program = db.query(workout_model.WorkoutProgram).options(
+        lazyload(workout_model.WorkoutProgram.workout_sessions)
+    ).filter(
         workout_model.WorkoutProgram.program_id == session_data.program_id,
         workout_model.WorkoutProgram.user_id == user_id
     ).first()
     if not workout_program:
         raise ValueError("Workout program not found or doesn't belong to the user")
 
+    wanted_ids = {exercise_data.program_exercise_id for exercise_data in session_data.exercises}
+    program_exercises = {
+        row.program_exercise_id: row
+        for row in db.query(
+            workout_model.ProgramExercise.program_exercise_id,
+            workout_model.ProgramExercise.exercise_id,
+            workout_model.Exercise.name,
+        ).join(workout_model.Exercise).filter(
+            workout_model.ProgramExercise.program_exercise_id.in_(wanted_ids)
+        )
+    } if wanted_ids else {}
+    for exercise_data in session_data.exercises:
+        if exercise_data.program_exercise_id not in program_exercises:
+            raise ValueError(f"Exercise with id {exercise_data.program_exercise_id} not found")
+
     # Create new workout session
     new_session = workout_model.WorkoutSession(
         user_id=user_id,
@@ -222,35 +264,17 @@ def log_workout_session(db: Session, session_data: workout_schema.WorkoutSession
         day_id=session_data.day_id,
         session_date=session_data.session_date
     )
-    db.add(new_session)
-    db.flush()
 
     session_exercises = []
-    
+    names = []
+    set_rows = []
+
     # Process each exercise
     for exercise_data in session_data.exercises:
-        # Fetch program exercise with exercise info
-        program_exercise = db.query(workout_model.ProgramExercise).join(
-            workout_model.Exercise
-        ).filter(
-            workout_model.ProgramExercise.program_exercise_id == exercise_data.program_exercise_id
-        ).first()
-        
-        if not program_exercise:
-            raise ValueError(f"Exercise with id {exercise_data.program_exercise_id} not found")
-
-        # Create session exercise record
-        session_exercise = workout_model.SessionExercise(
-            session_id=new_session.session_id,
-            exercise_id=program_exercise.exercise_id,
-            total_volume=0,
-            total_intensity_score=0
-        )
-        db.add(session_exercise)
-        db.flush()
-
+        program_exercise = program_exercises[exercise_data.program_exercise_id]
         total_volume = 0
         total_intensity = 0
+        rows = []
 
         # Process each set
         for set_data in exercise_data.sets:
@@ -258,14 +282,12 @@ def log_workout_session(db: Session, session_data: workout_schema.WorkoutSession
             reps = set_data.reps or 0
             duration = set_data.duration_seconds or 0
 
-            workout_set = workout_model.WorkoutSet(
-                session_exercise_id=session_exercise.session_exercise_id,
-                set_number=set_data.set_number,
-                performed_weight=weight,
-                performed_reps=reps,
-                performed_duration_seconds=duration or None,
-            )
-            db.add(workout_set)
+            rows.append({
+                "set_number": set_data.set_number,
+                "performed_weight": weight,
+                "performed_reps": reps,
+                "performed_duration_seconds": duration or None,
+            })
 
             # Volume: rep sets = weight x reps; time sets = weight x minutes held/carried.
             if duration:
@@ -275,53 +297,67 @@ def log_workout_session(db: Session, session_data: workout_schema.WorkoutSession
             total_volume += set_volume
             total_intensity += set_volume * (1 + (reps / 30))
 
-        # Update session exercise with totals (round intensity to integer)
-        session_exercise.total_volume = round(total_volume, 2)  # Keep 2 decimal places for volume
-        session_exercise.total_intensity_score = round(total_intensity)  # Round to nearest integer
-        session_exercises.append(session_exercise)
-        db.flush()
+        # Session exercise with totals (round intensity to integer)
+        session_exercises.append(workout_model.SessionExercise(
+            session=new_session,
+            exercise_id=program_exercise.exercise_id,
+            total_volume=round(total_volume, 2),  # Keep 2 decimal places for volume
+            total_intensity_score=round(total_intensity),  # Round to nearest integer
+        ))
+        names.append(program_exercise.name)
+        set_rows.append(rows)
+
+    db.add(new_session)
+    db.flush()
+    all_sets = [{**row, "session_exercise_id": se.session_exercise_id}
+                for se, rows in zip(session_exercises, set_rows) for row in rows]
+    if all_sets:
+        db.execute(insert(workout_model.WorkoutSet), all_sets)
+
+    points = {}
+    for ex, rows in zip(session_exercises, set_rows):
+        point = _strength_point([(row["performed_weight"], row["performed_reps"]) for row in rows
+                                 if row["performed_weight"] > 0 and row["performed_reps"] > 0])
+        if point is not None:
+            points[ex.exercise_id] = _merge_points(points[ex.exercise_id], point) \
+                if ex.exercise_id in points else point
+    if points:
+        _fold_into_progression(db, user_id, new_session.session_date.date(), points)
+
+    # Built before anything commits: commit expires every loaded attribute.
+    response = {
+        "session_id": new_session.session_id,
+        "user_id": new_session.user_id,
+        "program_id": new_session.program_id,
+        "program_name": workout_program.name,
+        "session_date": new_session.session_date,
+        "exercises": [{
+            "exercise_id": ex.exercise_id,
+            "name": name,
+            "total_volume": ex.total_volume,
+            "total_intensity_score": ex.total_intensity_score,
+            "sets": [{
+                "set_number": row["set_number"],
+                "weight": row["performed_weight"],
+                "reps": row["performed_reps"]
+            } for row in rows]
+        } for ex, name, rows in zip(session_exercises, names, set_rows)],
+    }
 
     # NOTE: XP is awarded once, by the linked habit log below (volume -> Strength
     # XP via the bucket's detail_kind). The legacy calculate_workout_xp path was
     # removed here to avoid double-counting Strength XP in the v1.0.0 system.
-    db.commit()
 
     # v1.0.0 daily loop: a logged session auto-completes the linked strength habit
     # (per-set logger acts as the habit's detail sheet — no double logging).
-    habit_payout = _complete_strength_habit(
+    response["habit_payout"] = _complete_strength_habit(
         db, user_id, session_data.habit_id,
         total_volume=sum(se.total_volume or 0 for se in session_exercises),
         session_date=session_data.session_date,
     )
-
-    # Fetch the complete session data for the response
-    complete_session = db.query(workout_model.WorkoutSession).options(
-        joinedload(workout_model.WorkoutSession.workout_program),
-        joinedload(workout_model.WorkoutSession.exercises).joinedload(workout_model.SessionExercise.exercise),
-        joinedload(workout_model.WorkoutSession.exercises).joinedload(workout_model.SessionExercise.sets)
-    ).filter(
-        workout_model.WorkoutSession.session_id == new_session.session_id
-    ).first()
-
-    return {
-        "session_id": complete_session.session_id,
-        "user_id": complete_session.user_id,
-        "program_id": complete_session.program_id,
-        "program_name": complete_session.workout_program.name,
-        "session_date": complete_session.session_date,
-        "exercises": [{
-            "exercise_id": ex.exercise_id,
-            "name": ex.exercise.name,
-            "total_volume": ex.total_volume,
-            "total_intensity_score": ex.total_intensity_score,
-            "sets": [{
-                "set_number": s.set_number,
-                "weight": s.performed_weight,
-                "reps": s.performed_reps
-            } for s in ex.sets]
-        } for ex in complete_session.exercises],
-        "habit_payout": habit_payout
-    }
+    db.commit()
+    invalidate_last_performance(user_id=user_id)
+    return response
 
 def _complete_strength_habit(db: Session, user_id: int, habit_id: int, total_volume: float,
                              session_date: datetime = None):
@@ -329,34 +365,33 @@ def _complete_strength_habit(db: Session, user_id: int, habit_id: int, total_vol
     Complete the strength habit tied to a logged workout session (today's log).
     If no habit_id was passed, falls back to the user's single uncompleted
     strength-bucket habit; skips quietly when ambiguous or already logged.
+
+    Runs in a savepoint of the caller's transaction: log_habit's commit lands
+    the workout and the payout together, and a failure here rolls back only
+    the payout.
     """
+    savepoint = db.begin_nested()
     try:
         from . import habit_crud
         from ..schemas import habit_schema
         from ..models.user_model import User
-        from ..utils.time import get_user_today
+        from ..utils.time import get_tzinfo, get_user_timezone, get_user_today
 
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             return None
+        today = get_user_today(db, user)
 
         habit = None
         if habit_id:
             habit = habit_crud.get_user_habit(db, user_id, habit_id)
         else:
-            today = get_user_today(db, user_id)
-            candidates = [
-                h for h in habit_crud.get_user_habits(db, user_id)
-                if h.bucket and h.bucket.key == "strength_training" and h.habit_type == "standard"
-            ]
-            uncompleted = [
-                h for h in candidates
-                if today not in habit_crud._habit_log_dates(db, h.id)
-            ]
+            candidates = habit_crud.get_bucket_habits_logged_on(db, user_id, "strength_training", today)
+            uncompleted = [h for h, logged in candidates if not logged]
             if len(uncompleted) == 1:
                 habit = uncompleted[0]
             elif len(candidates) == 1:
-                habit = candidates[0]
+                habit = candidates[0][0]
 
         if not habit or habit.status != "active":
             return None
@@ -367,8 +402,7 @@ def _complete_strength_habit(db: Session, user_id: int, habit_id: int, total_vol
         log_date = None
         if session_date:
             import pytz
-            from ..utils.time import get_user_timezone_from_db
-            tz = pytz.timezone(get_user_timezone_from_db(db, user_id))
+            tz = get_tzinfo(get_user_timezone(db, user))
             aware = session_date if session_date.tzinfo else pytz.UTC.localize(session_date)
             log_date = aware.astimezone(tz).date()
 
@@ -376,8 +410,10 @@ def _complete_strength_habit(db: Session, user_id: int, habit_id: int, total_vol
             value=total_volume or None,
             date=log_date,
         )
-        return habit_crud.log_habit(db, user, habit.id, payload)
+        return habit_crud.log_habit(db, user, habit.id, payload, habit=habit, user_today=today)
     except Exception:
+        if savepoint.is_active:
+            savepoint.rollback()
         import logging
         logging.getLogger(__name__).exception("Strength habit auto-complete failed (non-fatal)")
         return None
@@ -421,6 +457,7 @@ def get_or_create_exercise(db: Session, exercise_name: str):
         db.add(exercise)
         db.commit()
         db.refresh(exercise)
+        catalog.upsert(exercise)
     return exercise
 
 def get_user_workout_progress(db: Session, user_id: int, start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
@@ -453,30 +490,50 @@ def get_user_workout_progress(db: Session, user_id: int, start_date: datetime =
 
 def delete_workout_program(db: Session, program_id: int):
     """
-    Delete a workout program based on the program ID.
+    Delete a workout program based on the program ID, with its days, program
+    exercises and logged sessions (their exercises and sets too), one bulk
+    DELETE per table.
     """
-    db_program = get_workout_program_by_id(db, program_id)
+    db_program = db.query(workout_model.WorkoutProgram).options(
+        lazyload(workout_model.WorkoutProgram.workout_sessions)
+    ).filter(workout_model.WorkoutProgram.program_id == program_id).first()
     if not db_program:
         return None
-    
-    # Delete related workout sessions
+
+    # Related workout sessions, children first
+    session_ids = db.query(workout_model.WorkoutSession.session_id).filter(
+        workout_model.WorkoutSession.program_id == program_id
+    ).scalar_subquery()
+    session_exercise_ids = db.query(workout_model.SessionExercise.session_exercise_id).filter(
+        workout_model.SessionExercise.session_id.in_(session_ids)
+    ).scalar_subquery()
+    db.query(workout_model.WorkoutSet).filter(
+        workout_model.WorkoutSet.session_exercise_id.in_(session_exercise_ids)
+    ).delete(synchronize_session=False)
+    db.query(workout_model.SessionExercise).filter(
+        workout_model.SessionExercise.session_id.in_(session_ids)
+    ).delete(synchronize_session=False)
     db.query(workout_model.WorkoutSession).filter(
         workout_model.WorkoutSession.program_id == program_id
-    ).delete()
+    ).delete(synchronize_session=False)
 
-    # Delete related program exercises and workout days
-    for day in db_program.workout_days:
-        db.query(workout_model.ProgramExercise).filter(
-            workout_model.ProgramExercise.day_id == day.day_id
-        ).delete()
+    # Related program exercises and workout days
+    day_ids = db.query(workout_model.WorkoutDay.day_id).filter(
+        workout_model.WorkoutDay.program_id == program_id
+    ).scalar_subquery()
+    db.query(workout_model.ProgramExercise).filter(
+        workout_model.ProgramExercise.day_id.in_(day_ids)
+    ).delete(synchronize_session=False)
     db.query(workout_model.WorkoutDay).filter(
         workout_model.WorkoutDay.program_id == program_id
-    ).delete()
+    ).delete(synchronize_session=False)
 
     # Delete the program itself
     db.delete(db_program)
+    rebuild_strength_progression(db, db_program.user_id)
     db.commit()
-    
+    invalidate_last_performance(program_id=program_id)
+
     return db_program
 
 def archive_workout_program(db: Session, program_id: int):
@@ -506,7 +563,16 @@ def unarchive_workout_program(db: Session, program_id: int):
         raise ValueError("Workout program not found")
 
 def update_workout_program(db: Session, program_id: int, program_update: workout_schema.WorkoutProgramUpdate):
-    db_program = get_workout_program_by_id(db, program_id)
+    """
+    Apply a program edit. The day diff is computed once, then applied set-wise:
+    one UPDATE detaching sessions from dropped days, one DELETE of the touched
+    days' program exercises, one flush of new days, one DELETE of the dropped
+    days, one bulk UPDATE of kept day names, one bulk INSERT of exercises, and
+    a single commit.
+    """
+    db_program = db.query(workout_model.WorkoutProgram).options(
+        lazyload(workout_model.WorkoutProgram.workout_sessions)
+    ).filter(workout_model.WorkoutProgram.program_id == program_id).first()
     if not db_program:
         return None
 
@@ -514,53 +580,79 @@ def update_workout_program(db: Session, program_id: int, program_update: workout
     for key, value in update_data.items():
         if key != 'workout_days':
             setattr(db_program, key, value)
-    
+
     if 'workout_days' in update_data:
         # Reconcile days in place: sessions reference day_id, so kept days must
         # survive the edit with their id intact. Each incoming day claims its
-        # existing row by day_id (payloads without one create a new day).
-        remaining = {d.day_id: d for d in db_program.workout_days}
-        incoming = [
-            (day_data, remaining.pop(day_data.get('day_id'), None))
-            for day_data in update_data['workout_days']
-        ]
+        # existing row by day_id (payloads without one, or with an id this
+        # program doesn't own, create a new day).
+        remaining = {day_id for (day_id,) in db.query(workout_model.WorkoutDay.day_id).filter(
+            workout_model.WorkoutDay.program_id == program_id)}
+        kept, added = [], []
+        for day_data in update_data['workout_days']:
+            day_id = day_data.get('day_id')
+            if day_id in remaining:
+                remaining.discard(day_id)
+                kept.append((day_id, day_data))
+            else:
+                added.append(day_data)
+        dropped = list(remaining)
 
-        # Days dropped from the program: detach their sessions (day_id -> NULL,
-        # session-context falls back to inferring the day) before deleting.
-        for day in remaining.values():
+        # Days dropped from the program: detach their sessions (day_id -> NULL)
+        # before deleting. The sessions stay in history; if the latest one is
+        # detached, get_session_context has no day to follow and suggests day one.
+        if dropped:
             db.query(workout_model.WorkoutSession).filter(
-                workout_model.WorkoutSession.day_id == day.day_id
-            ).update({'day_id': None})
+                workout_model.WorkoutSession.day_id.in_(dropped)
+            ).update({'day_id': None}, synchronize_session=False)
+        touched = dropped + [day_id for day_id, _ in kept]
+        if touched:
             db.query(workout_model.ProgramExercise).filter(
-                workout_model.ProgramExercise.day_id == day.day_id
+                workout_model.ProgramExercise.day_id.in_(touched)
             ).delete()
-            db.delete(day)
+        # New days are inserted before the dropped ones go, so a database
+        # that reuses freed ids (SQLite) never hands a dropped day's id to a new one.
+        new_days = [workout_model.WorkoutDay(program_id=program_id, day_name=day_data['day_name'])
+                    for day_data in added]
+        if new_days:
+            db.add_all(new_days)
+            db.flush()
+        if dropped:
+            db.query(workout_model.WorkoutDay).filter(
+                workout_model.WorkoutDay.day_id.in_(dropped)
+            ).delete()
+        if kept:
+            db.execute(update(workout_model.WorkoutDay),
+                       [{"day_id": day_id, "day_name": day_data['day_name']} for day_id, day_data in kept])
 
-        for day_data, day in incoming:
-            if day is None:
-                day = workout_model.WorkoutDay(program_id=program_id, day_name=day_data['day_name'])
-                db.add(day)
-                db.flush()
-            else:
-                day.day_name = day_data['day_name']
-                db.query(workout_model.ProgramExercise).filter(
-                    workout_model.ProgramExercise.day_id == day.day_id
-                ).delete()
-
-            for exercise_data in day_data['exercises']:
-                new_program_exercise = workout_model.ProgramExercise(
-                    day_id=day.day_id,
-                    exercise_id=exercise_data['exercise_id'],
-                    sets=exercise_data['sets'],
-                    recommended_reps=exercise_data.get('recommended_reps'),
-                    recommended_duration_seconds=exercise_data.get('recommended_duration_seconds')
-                )
-                db.add(new_program_exercise)
-
-    db_program.updated_at=utc_now()
+        rows = [row for day_id, day_data in kept + [(d.day_id, data) for d, data in zip(new_days, added)]
+                for row in _program_exercise_rows(day_id, day_data['exercises'])]
+        if rows:
+            db.execute(insert(workout_model.ProgramExercise), rows)
+
+    db_program.updated_at = utc_now()
     db.commit()
-    db.refresh(db_program)
-    return db_program
+    invalidate_last_performance(program_id=program_id)
+    return _load_program(db, program_id)
+
+
+# Last performance is read every time the logger opens and only changes when
+# the user logs a session or edits the program, so results are kept per
+# (user, program) until one of those writes drops them. The TTL bounds how
+# long another worker process can serve a result from before its own edit.
+LAST_PERFORMANCE_TTL_SECONDS = 300
+LAST_PERFORMANCE_CACHE_MAX = 1024
+_last_performance: "OrderedDict[Tuple[int, int], Tuple[float, dict]]" = OrderedDict()
+_last_performance_lock = threading.Lock()
+
+
+def invalidate_last_performance(user_id: Optional[int] = None, program_id: Optional[int] = None) -> None:
+    """Drop cached last-performance results for a user and/or a program."""
+    with _last_performance_lock:
+        for key in [k for k in _last_performance
+                    if (user_id is None or k[0] == user_id) and (program_id is None or k[1] == program_id)]:
+            del _last_performance[key]
+
 
 def get_last_performance(db: Session, user_id: int, program_id: int) -> dict:
     """
@@ -568,47 +660,69 @@ def get_last_performance(db: Session, user_id: int, program_id: int) -> dict:
     ('what did I lift last time?'). Matched by exercise_id, so it carries across
     program edits and days that share an exercise. Returns
     { program_exercise_id: [ {set_number, weight, reps, duration_seconds}, ... ] }.
+
+    One query: ROW_NUMBER() picks the user's latest session_exercise per
+    exercise in the program, joined straight through to its sets.
     """
-    program_exercises = (
-        db.query(workout_model.ProgramExercise)
-        .join(workout_model.WorkoutDay,
-              workout_model.ProgramExercise.day_id == workout_model.WorkoutDay.day_id)
+    key = (user_id, program_id)
+    with _last_performance_lock:
+        cached = _last_performance.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            _last_performance.move_to_end(key)
+            return cached[1]
+
+    pe = workout_model.ProgramExercise
+    se = workout_model.SessionExercise
+    ws = workout_model.WorkoutSession
+    program_exercise_ids = (
+        db.query(pe.exercise_id)
+        .join(workout_model.WorkoutDay, pe.day_id == workout_model.WorkoutDay.day_id)
+        .filter(workout_model.WorkoutDay.program_id == program_id)
+    )
+    latest = (
+        db.query(
+            se.session_exercise_id,
+            se.exercise_id,
+            func.row_number().over(
+                partition_by=se.exercise_id,
+                order_by=(ws.session_date.desc(), ws.session_id.desc(), se.session_exercise_id.desc()),
+            ).label("rn"),
+        )
+        .join(ws, se.session_id == ws.session_id)
+        .filter(ws.user_id == user_id, se.exercise_id.in_(program_exercise_ids.scalar_subquery()))
+        .subquery()
+    )
+    rows = (
+        db.query(
+            pe.program_exercise_id,
+            workout_model.WorkoutSet.set_number,
+            workout_model.WorkoutSet.performed_weight,
+            workout_model.WorkoutSet.performed_reps,
+            workout_model.WorkoutSet.performed_duration_seconds,
+        )
+        .join(workout_model.WorkoutDay, pe.day_id == workout_model.WorkoutDay.day_id)
+        .join(latest, (latest.c.exercise_id == pe.exercise_id) & (latest.c.rn == 1))
+        .join(workout_model.WorkoutSet,
+              workout_model.WorkoutSet.session_exercise_id == latest.c.session_exercise_id)
         .filter(workout_model.WorkoutDay.program_id == program_id)
+        .order_by(pe.program_exercise_id, workout_model.WorkoutSet.set_number)
         .all()
     )
 
     result = {}
-    for pe in program_exercises:
-        latest = (
-            db.query(workout_model.SessionExercise)
-            .join(workout_model.WorkoutSession,
-                  workout_model.SessionExercise.session_id == workout_model.WorkoutSession.session_id)
-            .filter(
-                workout_model.WorkoutSession.user_id == user_id,
-                workout_model.SessionExercise.exercise_id == pe.exercise_id,
-            )
-            .order_by(workout_model.WorkoutSession.session_date.desc())
-            .first()
-        )
-        if not latest:
-            continue
-        sets = (
-            db.query(workout_model.WorkoutSet)
-            .filter(workout_model.WorkoutSet.session_exercise_id == latest.session_exercise_id)
-            .order_by(workout_model.WorkoutSet.set_number)
-            .all()
-        )
-        if not sets:
-            continue
-        result[pe.program_exercise_id] = [
-            {
-                "set_number": s.set_number,
-                "weight": s.performed_weight,
-                "reps": s.performed_reps,
-                "duration_seconds": s.performed_duration_seconds,
-            }
-            for s in sets
-        ]
+    for row in rows:
+        result.setdefault(row.program_exercise_id, []).append({
+            "set_number": row.set_number,
+            "weight": row.performed_weight,
+            "reps": row.performed_reps,
+            "duration_seconds": row.performed_duration_seconds,
+        })
+
+    with _last_performance_lock:
+        _last_performance[key] = (time.monotonic() + LAST_PERFORMANCE_TTL_SECONDS, result)
+        _last_performance.move_to_end(key)
+        while len(_last_performance) > LAST_PERFORMANCE_CACHE_MAX:
+            _last_performance.popitem(last=False)
     return result
 
 
@@ -621,105 +735,137 @@ def get_session_context(db: Session, user_id: int, program_id: int) -> dict:
 
     Returns { suggested_day_id, last_session | None }. last_session carries day_id,
     day_name, session_date and a per-exercise set summary.
+
+    The last session's day comes from its stored day_id only; sessions logged
+    before day_id existed get theirs from backfill_session_days(), which
+    migration d9e0f1a2b3c4 runs. A session whose day is unknown (or was
+    dropped from the program) suggests day one.
     """
-    days = (
-        db.query(workout_model.WorkoutDay)
+    ordered_day_ids = [
+        row.day_id for row in
+        db.query(workout_model.WorkoutDay.day_id)
         .filter(workout_model.WorkoutDay.program_id == program_id)
         .order_by(workout_model.WorkoutDay.day_id)
-        .all()
-    )
-    if not days:
+    ]
+    if not ordered_day_ids:
         return {"suggested_day_id": None, "last_session": None}
 
-    ordered_day_ids = [d.day_id for d in days]
-    day_name_by_id = {d.day_id: d.day_name for d in days}
-
     last = (
-        db.query(workout_model.WorkoutSession)
+        db.query(workout_model.WorkoutSession.session_id, workout_model.WorkoutSession.day_id)
         .filter(
             workout_model.WorkoutSession.user_id == user_id,
             workout_model.WorkoutSession.program_id == program_id,
         )
-        .options(
-            joinedload(workout_model.WorkoutSession.exercises)
-            .joinedload(workout_model.SessionExercise.exercise),
-            joinedload(workout_model.WorkoutSession.exercises)
-            .joinedload(workout_model.SessionExercise.sets),
-        )
         .order_by(
             workout_model.WorkoutSession.session_date.desc(),
             workout_model.WorkoutSession.session_id.desc(),
         )
         .first()
     )
-
     if not last:
         return {"suggested_day_id": ordered_day_ids[0], "last_session": None}
 
-    # Which day did the last session perform? Prefer the stored day_id; fall back
-    # to inferring it from the logged exercises for legacy sessions (logged before
-    # day_id was persisted) so the first suggestion is still correct.
-    last_day_id = last.day_id if last.day_id in day_name_by_id else None
-    if last_day_id is None:
-        last_day_id = _infer_session_day(db, program_id, last, ordered_day_ids)
-
-    if last_day_id in ordered_day_ids:
-        idx = ordered_day_ids.index(last_day_id)
-        suggested_day_id = ordered_day_ids[(idx + 1) % len(ordered_day_ids)]
+    if last.day_id in ordered_day_ids:
+        last_day_id = last.day_id
+        suggested_day_id = ordered_day_ids[(ordered_day_ids.index(last_day_id) + 1) % len(ordered_day_ids)]
     else:
+        last_day_id = None
         suggested_day_id = ordered_day_ids[0]
 
-    last_session = {
-        "session_id": last.session_id,
-        "day_id": last_day_id,
-        "day_name": day_name_by_id.get(last_day_id),
-        "session_date": last.session_date,
-        "exercises": [
-            {
-                "name": se.exercise.name,
-                "sets": [
-                    {
-                        "set_number": s.set_number,
-                        "weight": s.performed_weight,
-                        "reps": s.performed_reps,
-                        "duration_seconds": s.performed_duration_seconds,
-                    }
-                    for s in sorted(se.sets, key=lambda x: x.set_number or 0)
-                ],
+    last_session = None
+    exercises = {}
+    for row in _session_rows(db, [last.session_id]):
+        if last_session is None:
+            last_session = {
+                "session_id": row.session_id,
+                "day_id": last_day_id,
+                "day_name": row.day_name if last_day_id is not None else None,
+                "session_date": row.session_date,
+                "exercises": [],
             }
-            for se in last.exercises
-        ],
-    }
+        if row.session_exercise_id is None:
+            continue
+        exercise = exercises.get(row.session_exercise_id)
+        if exercise is None:
+            exercise = exercises[row.session_exercise_id] = {"name": row.exercise_name, "sets": []}
+            last_session["exercises"].append(exercise)
+        if row.set_id is not None:
+            exercise["sets"].append({
+                "set_number": row.set_number,
+                "weight": row.performed_weight,
+                "reps": row.performed_reps,
+                "duration_seconds": row.performed_duration_seconds,
+            })
 
     return {"suggested_day_id": suggested_day_id, "last_session": last_session}
 
 
-def _infer_session_day(db: Session, program_id: int, session, ordered_day_ids: List[int]):
-    """
-    Best-effort: pick the program day whose exercises overlap the session's
-    exercises the most (ties broken by earliest day in the cycle). Returns a
-    day_id or None. Used only for sessions logged before day_id was tracked.
+SESSION_DAY_BACKFILL_BATCH = 500
+
+
+def backfill_session_days(db: Session, batch_size: int = SESSION_DAY_BACKFILL_BATCH,
+                          after_session_id: int = 0, progress=None) -> dict:
     """
-    session_exercise_ids = {se.exercise_id for se in session.exercises}
-    if not session_exercise_ids:
-        return None
+    Infer and store day_id for sessions logged before it was tracked. A session's
+    day is the program day whose exercises overlap the session's the most (ties
+    go to the earliest day in the cycle); sessions with no overlap stay NULL.
 
-    rows = (
-        db.query(workout_model.ProgramExercise.exercise_id, workout_model.WorkoutDay.day_id)
-        .join(workout_model.WorkoutDay,
-              workout_model.ProgramExercise.day_id == workout_model.WorkoutDay.day_id)
-        .filter(workout_model.WorkoutDay.program_id == program_id)
-        .all()
-    )
-    overlap = {}
-    for exercise_id, day_id in rows:
-        if exercise_id in session_exercise_ids:
-            overlap[day_id] = overlap.get(day_id, 0) + 1
+    Works through NULL-day sessions in session_id order, batch_size at a time:
+    one SELECT for the batch, one grouped overlap query, one bulk UPDATE and a
+    commit per batch, so an interrupted run keeps what it did and resumes from
+    the last reported session id (after_session_id). progress, if given, is
+    called after each batch with the running totals.
 
-    if not overlap:
-        return None
-    # Max overlap; tie -> earliest day in program order.
-    return min(overlap, key=lambda d: (-overlap[d], ordered_day_ids.index(d)))
+    Returns { scanned, updated, last_session_id }.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    ws = workout_model.WorkoutSession
+    se = workout_model.SessionExercise
+    pe = workout_model.ProgramExercise
+    wd = workout_model.WorkoutDay
+
+    totals = {"scanned": 0, "updated": 0, "last_session_id": after_session_id}
+    while True:
+        batch = [
+            row.session_id for row in
+            db.query(ws.session_id)
+            .filter(ws.day_id.is_(None), ws.session_id > totals["last_session_id"])
+            .order_by(ws.session_id)
+            .limit(batch_size)
+        ]
+        if not batch:
+            return totals
+
+        overlap = (
+            db.query(
+                ws.session_id,
+                wd.day_id,
+                func.row_number().over(
+                    partition_by=ws.session_id,
+                    order_by=(func.count(func.distinct(pe.program_exercise_id)).desc(), wd.day_id),
+                ).label("rn"),
+            )
+            .join(se, se.session_id == ws.session_id)
+            .join(wd, wd.program_id == ws.program_id)
+            .join(pe, (pe.day_id == wd.day_id) & (pe.exercise_id == se.exercise_id))
+            .filter(ws.session_id.in_(batch))
+            .group_by(ws.session_id, wd.day_id)
+            .subquery()
+        )
+        inferred = [
+            {"session_id": row.session_id, "day_id": row.day_id}
+            for row in db.query(overlap.c.session_id, overlap.c.day_id).filter(overlap.c.rn == 1)
+        ]
+        if inferred:
+            db.execute(update(ws), inferred)
+        db.commit()
+
+        totals["scanned"] += len(batch)
+        totals["updated"] += len(inferred)
+        totals["last_session_id"] = batch[-1]
+        if progress is not None:
+            progress(dict(totals))
 
 
 def get_running_progress(db: Session, user_id: int):
@@ -819,93 +965,286 @@ def get_weight_progress(db: Session, user_id: int):
     #     "totalWeightChange": total_weight_change
     # }
 
-def get_strength_progression(db: Session, user_id: int) -> dict:
+# --- strength progression ---------------------------------------------------
+# Per-(user, exercise, day) summaries live in strength_progression. A logged
+# session folds into the latest day in O(1); a session dated before the
+# exercise's latest day, or a user with no rows yet, falls back to a rebuild
+# from the sets. Deleting sessions (program delete) rebuilds the user. Reads
+# never write the table.
+
+def _strength_point(rep_sets) -> Optional[dict]:
+    """Top set, best e1RM and volume for one performed exercise, from its
+    (weight, reps) pairs with both > 0. None when there are none. Same
+    arithmetic as strength_analytics.daily_points, one entry at a time."""
+    if not rep_sets:
+        return None
+    top_weight, top_reps = max(rep_sets)
+    return {
+        "top_weight": top_weight,
+        "top_reps": top_reps,
+        "e1rm": float(strength_analytics.round_e1rm(max(strength_analytics.e1rm(w, r) for w, r in rep_sets))),
+        "volume": round(sum(int(strength_analytics.volume_hundredths(w, r)) for w, r in rep_sets) / 100),
+    }
+
+
+def _merge_points(a: dict, b: dict) -> dict:
+    """Two sessions on one date keep the better top set and add up the volume."""
+    best = max(a, b, key=lambda p: (p["e1rm"], p["top_weight"], p["top_reps"]))
+    return {**best, "volume": a["volume"] + b["volume"]}
+
+
+def _with_priors(point: dict, prior_weight: Optional[float], prior_e1rm: Optional[float]) -> dict:
+    # PR flags: a day beats every earlier one (the first day is a baseline, not a PR).
+    return {
+        **point,
+        "prior_best_weight": prior_weight,
+        "prior_best_e1rm": prior_e1rm,
+        "pr_weight": prior_weight is not None and point["top_weight"] > prior_weight,
+        "pr_e1rm": prior_e1rm is not None and point["e1rm"] > prior_e1rm,
+    }
+
+
+def _running_best(prior: Optional[float], value: float) -> float:
+    return value if prior is None else max(prior, value)
+
+
+def rebuild_strength_progression(db: Session, user_id: int, exercise_ids: Optional[List[int]] = None) -> int:
     """
-    Gym progression over time, per exercise: top-set weight and estimated 1RM
-    (Epley, rep factor capped at 12 where the estimate stays honest) for each
-    session, plus deltas vs the previous session and all-time bests.
+    Recompute a user's strength_progression rows (all of them, or just
+    exercise_ids) from their logged sets. Flushes; the caller commits.
+    Returns the number of rows written.
     """
-    sessions = (
-        db.query(workout_model.WorkoutSession)
-        .filter(workout_model.WorkoutSession.user_id == user_id)
-        .options(
-            joinedload(workout_model.WorkoutSession.workout_program),
-            joinedload(workout_model.WorkoutSession.workout_day),
-            joinedload(workout_model.WorkoutSession.exercises)
-            .joinedload(workout_model.SessionExercise.exercise),
-            joinedload(workout_model.WorkoutSession.exercises)
-            .joinedload(workout_model.SessionExercise.sets),
+    progression = workout_model.StrengthProgression
+    stale = db.query(progression).filter(progression.user_id == user_id)
+    if exercise_ids is not None:
+        stale = stale.filter(progression.exercise_id.in_(exercise_ids))
+    stale.delete(synchronize_session=False)
+
+    points = strength_analytics.daily_points(strength_analytics.load_sets(db, user_id, exercise_ids))
+    rows = strength_analytics.progression_rows(user_id, points)
+    if rows:
+        db.execute(insert(progression), rows)
+    return len(rows)
+
+
+def _fold_into_progression(db: Session, user_id: int, day, points: Dict[int, dict]) -> None:
+    """Fold one just-flushed session's per-exercise points (for `day`) into
+    strength_progression: one read of each exercise's latest row, then an
+    in-place merge (same day) or a bulk append (later day)."""
+    progression = workout_model.StrengthProgression
+    ranked = (
+        db.query(
+            progression.id,
+            func.row_number().over(
+                partition_by=progression.exercise_id, order_by=progression.session_date.desc()
+            ).label("rn"),
         )
-        .order_by(workout_model.WorkoutSession.session_date,
-                  workout_model.WorkoutSession.session_id)
-        .all()
+        .filter(progression.user_id == user_id, progression.exercise_id.in_(points))
+        .subquery()
     )
+    latest = {
+        row.exercise_id: row
+        for row in db.query(progression).join(ranked, ranked.c.id == progression.id).filter(ranked.c.rn == 1)
+    }
+    if not latest and db.query(progression.id).filter(progression.user_id == user_id).first() is None:
+        # Never built for this user (history predates the table): build it all, this session included.
+        rebuild_strength_progression(db, user_id)
+        return
+
+    backfilled = []
+    appended = []
+    for exercise_id, point in points.items():
+        row = latest.get(exercise_id)
+        if row is not None and row.session_date > day:
+            backfilled.append(exercise_id)
+        elif row is not None and row.session_date == day:
+            current = {field: getattr(row, field) for field in ("top_weight", "top_reps", "e1rm", "volume")}
+            merged = _with_priors(_merge_points(current, point), row.prior_best_weight, row.prior_best_e1rm)
+            for field, value in merged.items():
+                setattr(row, field, value)
+        else:
+            prior_weight = _running_best(row.prior_best_weight, row.top_weight) if row is not None else None
+            prior_e1rm = _running_best(row.prior_best_e1rm, row.e1rm) if row is not None else None
+            appended.append({"user_id": user_id, "exercise_id": exercise_id, "session_date": day,
+                             **_with_priors(point, prior_weight, prior_e1rm)})
+    if appended:
+        db.execute(insert(progression), appended)
+    if backfilled:
+        rebuild_strength_progression(db, user_id, backfilled)
 
-    def e1rm(weight, reps):
-        return weight * (1 + min(reps, 12) / 30)
 
-    by_exercise = {}
-    session_log = []
-    for session in sessions:
-        log_entry = {
-            "date": session.session_date.date().isoformat(),
-            "program": session.workout_program.name if session.workout_program else None,
-            "day": session.workout_day.day_name if session.workout_day else None,
-            "exercises": [],
-        }
-        for se in session.exercises:
-            name = se.exercise.name if se.exercise else "Unknown"
-            all_sets = sorted(se.sets, key=lambda s: s.set_number or 0)
-            log_entry["exercises"].append({
-                "name": name,
-                "sets": [
-                    {
-                        "weight": s.performed_weight,
-                        "reps": s.performed_reps,
-                        "duration_seconds": s.performed_duration_seconds,
-                    }
-                    for s in all_sets
-                ],
-            })
+# --- session history (keyset pages) ------------------------------------------
+# Newest first by (session_date, session_id). The cursor is the last row's key,
+# base64-wrapped so clients treat it as opaque; a page never re-reads or skips
+# rows when sessions are logged while the user scrolls.
 
-            rep_sets = [
-                (s.performed_weight or 0, s.performed_reps or 0)
-                for s in all_sets
-                if (s.performed_reps or 0) > 0 and (s.performed_weight or 0) > 0
-            ]
-            if not rep_sets:
-                continue
-            top_weight, top_reps = max(rep_sets, key=lambda t: (t[0], t[1]))
-            point = {
-                "date": log_entry["date"],
-                "top_weight": top_weight,
-                "top_set": f"{top_weight:g}x{top_reps}",
-                "e1rm": round(max(e1rm(w, r) for w, r in rep_sets), 1),
-                "volume": round(sum(w * r for w, r in rep_sets)),
+SESSION_PAGE_SIZE = 20
+SESSION_PAGE_MAX = 100
+
+
+def _encode_session_cursor(session_date: datetime, session_id: int) -> str:
+    raw = json.dumps([session_date.isoformat(), session_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_session_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        session_date, session_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(session_date), int(session_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _session_page(db: Session, user_id: int, cursor: Optional[str], limit: int,
+                  with_exercises_only: bool = False) -> Tuple[List[int], Optional[str]]:
+    """One page of the user's session ids, newest first, and the cursor for the next."""
+    if not 1 <= limit <= SESSION_PAGE_MAX:
+        raise ValueError(f"limit must be between 1 and {SESSION_PAGE_MAX}")
+    ws = workout_model.WorkoutSession
+    query = db.query(ws.session_id, ws.session_date).filter(ws.user_id == user_id)
+    if with_exercises_only:
+        query = query.filter(
+            db.query(workout_model.SessionExercise.session_exercise_id)
+            .filter(workout_model.SessionExercise.session_id == ws.session_id)
+            .exists()
+        )
+    if cursor:
+        after_date, after_id = _decode_session_cursor(cursor)
+        query = query.filter(
+            (ws.session_date < after_date) | ((ws.session_date == after_date) & (ws.session_id < after_id))
+        )
+    rows = query.order_by(ws.session_date.desc(), ws.session_id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_session_cursor(rows[-1].session_date, rows[-1].session_id)
+    return [row.session_id for row in rows], next_cursor
+
+
+def _session_rows(db: Session, session_ids: List[int]):
+    """Sessions x exercises x sets for the given ids, one flat query, page order
+    restored by the caller."""
+    return (
+        db.query(
+            workout_model.WorkoutSession.session_id,
+            workout_model.WorkoutSession.user_id,
+            workout_model.WorkoutSession.program_id,
+            workout_model.WorkoutSession.session_date,
+            workout_model.WorkoutProgram.name.label("program_name"),
+            workout_model.WorkoutDay.day_name,
+            workout_model.SessionExercise.session_exercise_id,
+            workout_model.SessionExercise.exercise_id,
+            workout_model.SessionExercise.total_volume,
+            workout_model.SessionExercise.total_intensity_score,
+            workout_model.Exercise.name.label("exercise_name"),
+            workout_model.WorkoutSet.set_id,
+            workout_model.WorkoutSet.set_number,
+            workout_model.WorkoutSet.performed_weight,
+            workout_model.WorkoutSet.performed_reps,
+            workout_model.WorkoutSet.performed_duration_seconds,
+        )
+        .outerjoin(workout_model.SessionExercise,
+                   workout_model.SessionExercise.session_id == workout_model.WorkoutSession.session_id)
+        .outerjoin(workout_model.WorkoutProgram,
+                   workout_model.WorkoutProgram.program_id == workout_model.WorkoutSession.program_id)
+        .outerjoin(workout_model.WorkoutDay,
+                   workout_model.WorkoutDay.day_id == workout_model.WorkoutSession.day_id)
+        .outerjoin(workout_model.Exercise,
+                   workout_model.Exercise.exercise_id == workout_model.SessionExercise.exercise_id)
+        .outerjoin(workout_model.WorkoutSet,
+                   workout_model.WorkoutSet.session_exercise_id == workout_model.SessionExercise.session_exercise_id)
+        .filter(workout_model.WorkoutSession.session_id.in_(session_ids))
+        .order_by(workout_model.SessionExercise.session_exercise_id,
+                  func.coalesce(workout_model.WorkoutSet.set_number, 0))
+        .all()
+    ) if session_ids else []
+
+
+def get_session_history(db: Session, user_id: int, cursor: Optional[str] = None,
+                        limit: int = SESSION_PAGE_SIZE) -> dict:
+    """
+    One page of the session log, newest first: each session's date, program,
+    day and per-exercise sets. Returns { sessions, next_cursor }; next_cursor is
+    None on the last page. Raises ValueError on a bad cursor or limit.
+    """
+    session_ids, next_cursor = _session_page(db, user_id, cursor, limit, with_exercises_only=True)
+    sessions = {session_id: None for session_id in session_ids}
+    exercises = {}
+    for row in _session_rows(db, session_ids):
+        entry = sessions[row.session_id]
+        if entry is None:
+            entry = sessions[row.session_id] = {
+                "session_id": row.session_id,
+                "date": row.session_date.date().isoformat(),
+                "program": row.program_name,
+                "day": row.day_name,
+                "exercises": [],
             }
-            ex = by_exercise.setdefault(name, {"name": name, "sessions": []})
-            # Two sessions on one date keep the better numbers for that day.
-            if ex["sessions"] and ex["sessions"][-1]["date"] == point["date"]:
-                prev = ex["sessions"][-1]
-                if point["e1rm"] >= prev["e1rm"]:
-                    prev.update(point)
-                prev["volume"] = prev["volume"] + point["volume"]
-            else:
-                ex["sessions"].append(point)
+        exercise = exercises.get(row.session_exercise_id)
+        if exercise is None:
+            exercise = exercises[row.session_exercise_id] = {"name": row.exercise_name or "Unknown", "sets": []}
+            entry["exercises"].append(exercise)
+        if row.set_id is not None:
+            exercise["sets"].append({
+                "weight": row.performed_weight,
+                "reps": row.performed_reps,
+                "duration_seconds": row.performed_duration_seconds,
+            })
+    return {"sessions": list(sessions.values()), "next_cursor": next_cursor}
+
+
+_PROGRESSION_FIELDS = ("exercise_id", "session_date", "top_weight", "top_reps", "e1rm", "volume",
+                       "pr_weight", "pr_e1rm")
 
-        if log_entry["exercises"]:
-            session_log.append(log_entry)
+
+def get_strength_progression(db: Session, user_id: int) -> dict:
+    """
+    Gym progression over time, per exercise: top-set weight and estimated 1RM
+    for each training day, plus deltas vs the previous day and all-time bests.
+    Read from strength_progression. A user with no rows yet (history from before
+    the table, until scripts/rebuild_strength_progression.py has run) gets the
+    same points computed from their sets, without storing them: a read that
+    wrote could race another read, or a logged session's fold, on the table's
+    unique key. The session log pages separately through get_session_history.
+    """
+    progression = workout_model.StrengthProgression
+    rows = (
+        db.query(progression, workout_model.Exercise.name)
+        .outerjoin(workout_model.Exercise,
+                   workout_model.Exercise.exercise_id == progression.exercise_id)
+        .filter(progression.user_id == user_id)
+        .order_by(progression.exercise_id, progression.session_date)
+        .all()
+    )
+    if rows:
+        points = [({field: getattr(row, field) for field in _PROGRESSION_FIELDS}, name) for row, name in rows]
+    else:
+        computed = strength_analytics.progression_rows(
+            user_id, strength_analytics.daily_points(strength_analytics.load_sets(db, user_id)))
+        names = dict(
+            db.query(workout_model.Exercise.exercise_id, workout_model.Exercise.name)
+            .filter(workout_model.Exercise.exercise_id.in_({p["exercise_id"] for p in computed}))
+            .all()
+        ) if computed else {}
+        points = [(p, names.get(p["exercise_id"]))
+                  for p in sorted(computed, key=lambda p: (p["exercise_id"], p["session_date"]))]
+
+    by_exercise = {}
+    for point, name in points:
+        ex = by_exercise.setdefault(point["exercise_id"], {"name": name or "Unknown", "sessions": []})
+        ex["sessions"].append({
+            "date": point["session_date"].isoformat(),
+            "top_weight": point["top_weight"],
+            "top_set": f"{point['top_weight']:g}x{point['top_reps']}",
+            "e1rm": point["e1rm"],
+            "volume": round(point["volume"]),
+            "pr_weight": point["pr_weight"],
+            "pr_e1rm": point["pr_e1rm"],
+        })
 
     exercises = []
     for ex in by_exercise.values():
         points = ex["sessions"]
-        # PR flags: a point beats every earlier one (first session is baseline, not a PR).
-        best_w = best_e = None
-        for point in points:
-            point["pr_weight"] = best_w is not None and point["top_weight"] > best_w
-            point["pr_e1rm"] = best_e is not None and point["e1rm"] > best_e
-            best_w = point["top_weight"] if best_w is None else max(best_w, point["top_weight"])
-            best_e = point["e1rm"] if best_e is None else max(best_e, point["e1rm"])
         latest = points[-1]
         previous = points[-2] if len(points) > 1 else None
         exercises.append({
@@ -921,54 +1260,104 @@ def get_strength_progression(db: Session, user_id: int) -> dict:
     # Most recently trained first, most established next.
     exercises.sort(key=lambda e: (e["last_date"], e["sessions_count"]), reverse=True)
 
-    cutoff_30d = (utc_now().date() - timedelta(days=30)).isoformat()
+    cutoff = utc_now().date() - timedelta(days=30)
+    session_ids = (
+        db.query(workout_model.WorkoutSession.session_id)
+        .join(workout_model.SessionExercise,
+              workout_model.SessionExercise.session_id == workout_model.WorkoutSession.session_id)
+        .filter(workout_model.WorkoutSession.user_id == user_id)
+    )
+    total_sessions, sessions_30d = db.query(
+        func.count(func.distinct(workout_model.WorkoutSession.session_id)),
+        func.count(func.distinct(case(
+            (workout_model.WorkoutSession.session_date >= datetime.combine(cutoff, datetime.min.time()),
+             workout_model.WorkoutSession.session_id)))),
+    ).filter(workout_model.WorkoutSession.session_id.in_(session_ids.scalar_subquery())).one()
+
+    cutoff_30d = cutoff.isoformat()
     return {
         "exercises": exercises,
         "summary": {
-            "total_sessions": len(session_log),
-            "sessions_30d": sum(1 for s in session_log if s["date"] >= cutoff_30d),
+            "total_sessions": total_sessions,
+            "sessions_30d": sessions_30d,
             "prs_30d": sum(
                 1 for e in exercises for p in e["sessions"]
                 if p["date"] >= cutoff_30d and (p["pr_weight"] or p["pr_e1rm"])
             ),
         },
-        # Full history, newest first — feeds the session-log sheet.
-        "session_history": list(reversed(session_log)),
     }
 
 
-def get_workout_progress(db: Session, user_id: int):
-    sessions = db.query(workout_model.WorkoutSession).filter(
-        workout_model.WorkoutSession.user_id == user_id
-    ).options(
-        joinedload(workout_model.WorkoutSession.workout_program),
-        joinedload(workout_model.WorkoutSession.exercises).joinedload(workout_model.SessionExercise.exercise),
-        joinedload(workout_model.WorkoutSession.exercises).joinedload(workout_model.SessionExercise.sets)
-    ).order_by(workout_model.WorkoutSession.session_date.desc()).all()
+STRENGTH_TRENDS_WEEKS = 26
+STRENGTH_TRENDS_MAX_WEEKS = 260
+
 
+def get_strength_trends(db: Session, user_id: int, weeks: int = STRENGTH_TRENDS_WEEKS) -> dict:
+    """
+    Training load over the last `weeks` Monday-based weeks (this one included):
+    tonnage per week with its rolling 4-week sum, and tonnage per muscle group
+    (heaviest first, series aligned with weeks). Raises ValueError on a bad
+    weeks.
+    """
+    if not 1 <= weeks <= STRENGTH_TRENDS_MAX_WEEKS:
+        raise ValueError(f"weeks must be between 1 and {STRENGTH_TRENDS_MAX_WEEKS}")
+    last_week = utc_today()
+    first_week = last_week - timedelta(weeks=weeks - 1)
+    sets = strength_analytics.load_sets(db, user_id, since=strength_analytics.trends_since(first_week))
+    trends = strength_analytics.weekly_trends(sets, first_week, last_week)
+
+    names = {g["id"]: g["name"] for g in catalog.lookup_data(db)["muscleGroups"]}
+    muscle_groups = [
+        {"id": group_id if group_id != strength_analytics.UNKNOWN_MUSCLE_GROUP else None,
+         "name": names.get(group_id, "Other"), "tonnage": tonnage, "total": sum(tonnage)}
+        for group_id, tonnage in trends["muscle_groups"].items()
+    ]
+    muscle_groups.sort(key=lambda g: (-g["total"], g["name"]))
     return {
-        "sessions": [
-            workout_schema.WorkoutSession(
-                session_id=session.session_id,
-                user_id=session.user_id,
-                program_id=session.program_id,
-                program_name=session.workout_program.name,
-                session_date=session.session_date,
-                exercises=[
-                    workout_schema.SessionExercise(
-                        exercise_id=exercise.exercise_id,
-                        name=exercise.exercise.name,
-                        sets=[
-                            workout_schema.ExerciseSet(
-                                set_number=set.set_number,
-                                weight=set.performed_weight,
-                                reps=set.performed_reps
-                            ) for set in exercise.sets
-                        ],
-                        total_volume=exercise.total_volume,
-                        total_intensity_score=exercise.total_intensity_score
-                    ) for exercise in session.exercises
-                ]
-            ) for session in sessions
-        ]
-    }
\ No newline at end of file
+        "weeks": [
+            {"week_start": start.isoformat(), "volume": volume, "rolling_volume": rolling}
+            for start, volume, rolling in zip(trends["week_starts"], trends["volume"], trends["rolling_volume"])
+        ],
+        "muscle_groups": muscle_groups,
+    }
+
+
+def get_workout_progress(db: Session, user_id: int, cursor: Optional[str] = None,
+                         limit: int = SESSION_PAGE_SIZE) -> dict:
+    """
+    One page of full session detail (exercises with totals and sets), newest
+    first. Returns { sessions, next_cursor }, paged like get_session_history.
+    """
+    session_ids, next_cursor = _session_page(db, user_id, cursor, limit)
+    sessions = {session_id: None for session_id in session_ids}
+    exercises = {}
+    for row in _session_rows(db, session_ids):
+        entry = sessions[row.session_id]
+        if entry is None:
+            entry = sessions[row.session_id] = {
+                "session_id": row.session_id,
+                "user_id": row.user_id,
+                "program_id": row.program_id,
+                "program_name": row.program_name,
+                "session_date": row.session_date,
+                "exercises": [],
+            }
+        if row.session_exercise_id is None:
+            continue
+        exercise = exercises.get(row.session_exercise_id)
+        if exercise is None:
+            exercise = exercises[row.session_exercise_id] = {
+                "exercise_id": row.exercise_id,
+                "name": row.exercise_name,
+                "sets": [],
+                "total_volume": row.total_volume,
+                "total_intensity_score": row.total_intensity_score,
+            }
+            entry["exercises"].append(exercise)
+        if row.set_id is not None:
+            exercise["sets"].append({
+                "set_number": row.set_number,
+                "weight": row.performed_weight,
+                "reps": row.performed_reps,
+            })
+    return {"sessions": list(sessions.values()), "next_cursor": next_cursor}
@@ -12,7 +12,8 @@ engine = create_engine(
     pool_pre_ping=True,  # Test connection before using it
     pool_recycle=3600,   # Recycle connections after 1 hour
     pool_size=5,         # Keep 5 connections in pool
-    max_overflow=10      # Allow up to 10 overflow connections
+    # Overflow up to REQUEST_THREADS + DB_POOL_HEADROOM in total (see config.py)
+    max_overflow=max(0, Config.REQUEST_THREADS + Config.DB_POOL_HEADROOM - 5)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
\ No newline at end of file
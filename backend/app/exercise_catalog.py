@@ -0,0 +1,171 @@
+"""
+Process-wide index over the exercise library and its five lookup tables.
+
+The library is a few hundred rows that change only when a user creates, edits
+or deletes one of their own exercises, so it is read once and kept in memory:
+the picker's search, facet counts and paging run over plain dicts instead of
+re-reading the tables per request. The CRUD write paths update the index in
+place (upsert / remove); the TTL reloads it so other worker processes pick up
+those writes.
+
+Search ranks a name that starts with the query first, then names where every
+query word starts a word, then substrings, then close fuzzy matches (difflib),
+so a typo still finds the exercise.
+"""
+import difflib
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .models import workout_model
+
+CATALOG_TTL_SECONDS = 600
+FUZZY_CUTOFF = 0.75
+FACETS = ("muscle_group_id", "equipment_id")
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _snapshot(exercise: workout_model.Exercise) -> dict:
+    return {column.key: getattr(exercise, column.key) for column in workout_model.Exercise.__table__.columns}
+
+
+class ExerciseCatalog:
+    def __init__(self, ttl_seconds: float = CATALOG_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._exercises: Dict[int, dict] = {}
+        self._lookups: Optional[dict] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    # --- loading -----------------------------------------------------------
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._lookups is not None and self._expires_at > time.monotonic():
+            return
+        exercises = {e.exercise_id: _snapshot(e) for e in db.query(workout_model.Exercise).all()}
+        lookups = {
+            "categories": [{"id": r.id, "name": r.name} for r in db.query(workout_model.ExerciseCategory).all()],
+            "muscleGroups": [{"id": r.id, "name": r.name} for r in db.query(workout_model.ExerciseMuscleGroup).all()],
+            "equipment": [{"id": r.id, "name": r.name} for r in db.query(workout_model.ExerciseEquipment).all()],
+            "difficultyLevels": [{"id": r.id, "level": r.level}
+                                 for r in db.query(workout_model.ExerciseDifficultyLevel).all()],
+            "exerciseTypes": [{"id": r.id, "type": r.type} for r in db.query(workout_model.ExerciseType).all()],
+        }
+        with self._lock:
+            self._exercises = exercises
+            self._lookups = lookups
+            self._expires_at = time.monotonic() + self.ttl_seconds
+
+    def upsert(self, exercise: workout_model.Exercise) -> None:
+        """Reflect a created or edited exercise (call after its commit)."""
+        snapshot = _snapshot(exercise)
+        with self._lock:
+            if self._lookups is not None:
+                self._exercises[snapshot["exercise_id"]] = snapshot
+
+    def remove(self, exercise_id: int) -> None:
+        with self._lock:
+            self._exercises.pop(exercise_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exercises = {}
+            self._lookups = None
+            self._expires_at = 0.0
+
+    # --- reads -------------------------------------------------------------
+
+    def lookup_data(self, db: Session) -> dict:
+        self._ensure_loaded(db)
+        return self._lookups
+
+    def visible(self, db: Session, user_id: Optional[int] = None) -> List[dict]:
+        """The global library plus the user's own exercises, A-Z (case-insensitive)."""
+        self._ensure_loaded(db)
+        with self._lock:
+            exercises = list(self._exercises.values())
+        return sorted(
+            (e for e in exercises if e["is_global"] or (user_id is not None and e["user_id"] == user_id)),
+            key=lambda e: (e["name"] or "").lower(),
+        )
+
+    def search(self, db: Session, user_id: Optional[int] = None, q: Optional[str] = None,
+               muscle_group_id: Optional[int] = None, equipment_id: Optional[int] = None,
+               limit: int = 25, offset: int = 0) -> dict:
+        """
+        One page of matching exercises plus facet counts. Each facet's counts
+        apply the query and every *other* facet filter, so the picker can show
+        how many results each muscle group / equipment choice would leave.
+        Returns { items, total, limit, offset, facets }.
+        """
+        matches = _rank(self.visible(db, user_id), q)
+        filters = {"muscle_group_id": muscle_group_id, "equipment_id": equipment_id}
+
+        def passes(exercise, skip=None):
+            return all(value is None or exercise[facet] == value
+                       for facet, value in filters.items() if facet != skip)
+
+        lookups = self._lookups
+        names = {
+            "muscle_group_id": {r["id"]: r["name"] for r in lookups["muscleGroups"]},
+            "equipment_id": {r["id"]: r["name"] for r in lookups["equipment"]},
+        }
+        facets = {}
+        for facet in FACETS:
+            counts: Dict[int, int] = {}
+            for exercise in matches:
+                if passes(exercise, skip=facet):
+                    counts[exercise[facet]] = counts.get(exercise[facet], 0) + 1
+            facets[facet.removesuffix("_id")] = sorted(
+                ({"id": value, "name": names[facet].get(value), "count": count} for value, count in counts.items()),
+                key=lambda f: (-f["count"], f["name"] or ""),
+            )
+
+        filtered = [e for e in matches if passes(e)]
+        return {
+            "items": filtered[offset:offset + limit],
+            "total": len(filtered),
+            "limit": limit,
+            "offset": offset,
+            "facets": facets,
+        }
+
+
+def _rank(exercises: List[dict], q: Optional[str]) -> List[dict]:
+    """Exercises matching q, best first (ties stay A-Z). No query matches everything."""
+    query = (q or "").strip().lower()
+    if not query:
+        return exercises
+    query_words = _words(query)
+    ranked = []
+    for position, exercise in enumerate(exercises):
+        name = (exercise["name"] or "").lower()
+        words = _words(name)
+        if name.startswith(query):
+            score = 0.0
+        elif query_words and all(any(w.startswith(qw) for w in words) for qw in query_words):
+            score = 1.0
+        elif query in name:
+            score = 2.0
+        else:
+            # Fuzzy: the best of the whole name and each same-length run of words.
+            width = max(1, len(query_words))
+            candidates = [name] + [" ".join(words[i:i + width]) for i in range(len(words))]
+            ratio = max(difflib.SequenceMatcher(None, query, c).ratio() for c in candidates)
+            if ratio < FUZZY_CUTOFF:
+                continue
+            score = 3.0 + (1.0 - ratio)
+        ranked.append((score, position, exercise))
+    ranked.sort(key=lambda t: (t[0], t[1]))
+    return [exercise for _, _, exercise in ranked]
+
+
+catalog = ExerciseCatalog()
@@ -8,8 +8,11 @@ shouldn't kill a gym streak.
   * weekly     — N x per week; streak = consecutive weeks hitting the target
   * weekdays   — specific days; skipped (unscheduled) days don't break the streak
 
-Streaks are always recomputed from logs, never stored — that's what lets a
-backfilled missed day restore a streak with zero special-casing.
+Streaks are always derivable from logs — that's what lets a backfilled
+missed day restore a streak with zero special-casing. The streak *summary*
+at the bottom of this module is a cache of that derivation, kept current
+incrementally on the hot path and recomputed from the dates whenever an
+edit lands somewhere an O(1) update can't reason about.
 """
 from datetime import date, timedelta
 from typing import Iterable, Optional, Set
@@ -198,3 +201,225 @@ def best_streak(cadence_type: str, weekdays: Optional[Iterable[int]],
 def day_streak(complete_dates: Set[date], today: date) -> int:
     """Same shape as a daily habit streak, over day-complete dates."""
     return daily_streak(complete_dates, today)
+
+
+# ---------------------------------------------------------------------------
+# Streak summary — the incremental form of the functions above
+# ---------------------------------------------------------------------------
+#
+# A summary describes a habit's log history in O(1) space:
+#   last_date         latest log date
+#   total             number of logs
+#   week_anchor/count the week of last_date and its completions
+#   run_end           the latest "hit" period (a day, or a week anchor for weekly)
+#   run_length        consecutive hit periods ending at run_end
+#   prior_best        best run among runs that ended before the current one
+#   best              max(prior_best, run_length)
+# The update functions return None when an edit can't be applied without the
+# full history; callers then rebuild with streak_summary().
+
+def cadence_key(cadence_type: str, weekdays: Optional[Iterable[int]],
+                times_per_week: Optional[int]) -> str:
+    """Identifies the cadence a summary was built for (a re-cadence invalidates it)."""
+    if cadence_type == CADENCE_WEEKLY:
+        return f"{CADENCE_WEEKLY}:{max(1, times_per_week or 1)}"
+    if cadence_type == CADENCE_WEEKDAYS:
+        return f"{CADENCE_WEEKDAYS}:{','.join(str(d) for d in sorted(set(weekdays or [])))}"
+    return CADENCE_DAILY
+
+
+def _previous_scheduled(d: date, scheduled: Set[int]) -> date:
+    cursor = d - timedelta(days=1)
+    while cursor.weekday() not in scheduled:
+        cursor -= timedelta(days=1)
+    return cursor
+
+
+def _period_step(cadence_type: str, scheduled: Set[int], period: date) -> date:
+    """The hit period immediately before `period` under this cadence."""
+    if cadence_type == CADENCE_WEEKLY:
+        return period - timedelta(weeks=1)
+    if cadence_type == CADENCE_WEEKDAYS:
+        return _previous_scheduled(period, scheduled)
+    return period - timedelta(days=1)
+
+
+def empty_summary() -> dict:
+    return {"last_date": None, "total": 0, "week_anchor": None, "week_count": 0,
+            "run_end": None, "run_length": 0, "prior_best": 0, "best": 0}
+
+
+def streak_summary(cadence_type: str, weekdays: Optional[Iterable[int]],
+                   times_per_week: Optional[int], dates: Set[date]) -> dict:
+    """Full recompute of a summary from every log date (the reference the cache is checked against)."""
+    summary = empty_summary()
+    if not dates:
+        return summary
+    last = max(dates)
+    anchor = week_start(last)
+    summary.update(last_date=last, total=len(dates), week_anchor=anchor,
+                   week_count=sum(1 for d in dates if week_start(d) == anchor))
+
+    scheduled = set(weekdays or [])
+    if cadence_type == CADENCE_WEEKLY:
+        target = max(1, times_per_week or 1)
+        counts = {}
+        for d in dates:
+            counts[week_start(d)] = counts.get(week_start(d), 0) + 1
+        hits = {a for a, n in counts.items() if n >= target}
+    elif cadence_type == CADENCE_WEEKDAYS:
+        hits = {d for d in dates if d.weekday() in scheduled} if scheduled else set()
+    else:
+        hits = set(dates)
+
+    best = best_streak(cadence_type, weekdays, times_per_week, dates)
+    if hits:
+        run_end = max(hits)
+        run_length = 0
+        cursor = run_end
+        while cursor in hits:
+            run_length += 1
+            cursor = _period_step(cadence_type, scheduled, cursor)
+        # prior_best: the best run once the current one is set aside.
+        rest = hits - _run_periods(cadence_type, scheduled, run_end, run_length)
+        prior_best = _best_run_over(cadence_type, scheduled, rest)
+        summary.update(run_end=run_end, run_length=run_length, prior_best=prior_best)
+    summary["best"] = best
+    return summary
+
+
+def _run_periods(cadence_type: str, scheduled: Set[int], run_end: date, run_length: int) -> Set[date]:
+    periods = set()
+    cursor = run_end
+    for _ in range(run_length):
+        periods.add(cursor)
+        cursor = _period_step(cadence_type, scheduled, cursor)
+    return periods
+
+
+def _best_run_over(cadence_type: str, scheduled: Set[int], hits: Set[date]) -> int:
+    best = 0
+    for period in hits:
+        if _period_step(cadence_type, scheduled, period) in hits:
+            continue  # not the start of a run
+        run, cursor = 0, period
+        while cursor in hits:
+            run += 1
+            cursor = cursor + (timedelta(weeks=1) if cadence_type == CADENCE_WEEKLY else timedelta(days=1))
+            if cadence_type == CADENCE_WEEKDAYS:
+                while cursor.weekday() not in scheduled:
+                    cursor += timedelta(days=1)
+        best = max(best, run)
+    return best
+
+
+def _extend_run(summary: dict, cadence_type: str, scheduled: Set[int], period: date) -> None:
+    if summary["run_end"] is not None and _period_step(cadence_type, scheduled, period) == summary["run_end"]:
+        summary["run_length"] += 1
+    else:
+        summary["prior_best"] = max(summary["prior_best"], summary["run_length"])
+        summary["run_length"] = 1
+    summary["run_end"] = period
+    summary["best"] = max(summary["prior_best"], summary["run_length"])
+
+
+def summary_after_log(summary: dict, cadence_type: str, weekdays: Optional[Iterable[int]],
+                      times_per_week: Optional[int], d: date) -> Optional[dict]:
+    """
+    Fold a new log date into a summary in O(1). Appends (d after the last log)
+    always apply; a backfill applies only when it can't touch the streak run
+    (an unscheduled weekday, or an extra completion in the latest week).
+    """
+    out = dict(summary)
+    scheduled = set(weekdays or [])
+    last = out["last_date"]
+    anchor = week_start(d)
+
+    if last is not None and d <= last:
+        same_week = anchor == out["week_anchor"]
+        if d == last or not same_week:
+            return None
+        if cadence_type == CADENCE_DAILY:
+            return None
+        if cadence_type == CADENCE_WEEKDAYS and d.weekday() in scheduled:
+            return None
+    else:
+        out["last_date"] = d
+
+    out["total"] += 1
+    if anchor == out["week_anchor"]:
+        out["week_count"] += 1
+    else:
+        out["week_anchor"], out["week_count"] = anchor, 1
+
+    if cadence_type == CADENCE_WEEKLY:
+        if out["week_count"] == max(1, times_per_week or 1):
+            _extend_run(out, cadence_type, scheduled, anchor)
+    elif cadence_type == CADENCE_WEEKDAYS:
+        if d.weekday() in scheduled:
+            _extend_run(out, cadence_type, scheduled, d)
+    else:
+        _extend_run(out, cadence_type, scheduled, d)
+    return out
+
+
+def summary_after_unlog(summary: dict, cadence_type: str, weekdays: Optional[Iterable[int]],
+                        times_per_week: Optional[int], d: date,
+                        previous_date: Optional[date]) -> Optional[dict]:
+    """
+    Remove a log date from a summary in O(1). Only undoing the latest log is
+    handled (previous_date is the newest log left after it); anything that
+    would need the history behind the current run returns None.
+    """
+    if summary["last_date"] != d:
+        return None
+    if previous_date is None:
+        return empty_summary()
+
+    out = dict(summary)
+    scheduled = set(weekdays or [])
+    count_before = out["week_count"]
+    if count_before <= 1:
+        return None  # the latest week empties; its predecessor's count isn't tracked
+    out["last_date"] = previous_date
+    out["total"] -= 1
+    out["week_count"] -= 1
+
+    shrinks = (
+        (cadence_type == CADENCE_DAILY)
+        or (cadence_type == CADENCE_WEEKDAYS and d.weekday() in scheduled)
+        or (cadence_type == CADENCE_WEEKLY and count_before == max(1, times_per_week or 1))
+    )
+    if shrinks:
+        period = out["week_anchor"] if cadence_type == CADENCE_WEEKLY else d
+        if out["run_end"] != period or out["run_length"] <= 1:
+            return None
+        out["run_length"] -= 1
+        out["run_end"] = _period_step(cadence_type, scheduled, period)
+        out["best"] = max(out["prior_best"], out["run_length"])
+    return out
+
+
+def summary_current_streak(summary: dict, cadence_type: str, weekdays: Optional[Iterable[int]],
+                           today: date) -> int:
+    """current_streak() answered from a summary: is the stored run still alive today?"""
+    run_end = summary["run_end"]
+    if run_end is None or not summary["run_length"]:
+        return 0
+    if cadence_type == CADENCE_WEEKLY:
+        this_week = week_start(today)
+        alive = run_end in (this_week, this_week - timedelta(weeks=1))
+    elif cadence_type == CADENCE_WEEKDAYS:
+        scheduled = set(weekdays or [])
+        if not scheduled:
+            return 0
+        cursor = today if today.weekday() in scheduled else _previous_scheduled(today, scheduled)
+        alive = run_end == cursor or (cursor == today and run_end == _previous_scheduled(today, scheduled))
+    else:
+        alive = run_end in (today, today - timedelta(days=1))
+    return summary["run_length"] if alive else 0
+
+
+def summary_week_count(summary: dict, today: date) -> int:
+    """week_count() answered from a summary."""
+    return summary["week_count"] if summary["week_anchor"] == week_start(today) else 0
@@ -1,12 +1,16 @@
 import logging
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
 from fastapi import FastAPI
 from dotenv import load_dotenv
 load_dotenv()
 
+from .config import Config
 from .oauth2_config import OAuth2Config
 from .cors import setup_cors
 from .routers import oauth2_router, user_router, activity_router, skill_router, workout_router, challenge_router, admin_router, habit_router, focus_router, strava_router
-from . import models
+from . import models, strava_client, strava_jobs
 from .database import engine, SessionLocal
 
 models.Base.metadata.create_all(bind=engine)
@@ -93,7 +97,26 @@ def _bootstrap():
 
 _bootstrap()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Handlers do sync Session work, so FastAPI runs them off the event loop on
+    # this threadpool: REQUEST_THREADS, less the Strava import workers' threads.
+    # The DB pool is sized above this (see Config.DB_POOL_HEADROOM).
+    workers = strava_jobs.workers if Config.strava_configured() else None
+    reserved = workers.workers if workers else 0
+    to_thread.current_default_thread_limiter().total_tokens = max(1, Config.REQUEST_THREADS - reserved)
+    if workers:
+        workers.start()
+    try:
+        yield
+    finally:
+        if workers:
+            workers.stop()
+        strava_client.api.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 setup_cors(app)
 
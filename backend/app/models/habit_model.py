@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, ForeignKey, Integer, String, Float, DateTime, Boolean, Date, JSON,
-    Text, UniqueConstraint
+    Index, Text, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 
@@ -131,9 +131,37 @@ class HabitLog(Base):
 
     __table_args__ = (
         UniqueConstraint("habit_id", "date", name="uq_habit_log_per_day"),
+        # attribute XP already paid to a user on a day (daily cap); covers the sum
+        Index("ix_habit_logs_user_date_attribute", "user_id", "date", "attribute",
+              postgresql_include=["attribute_xp"]),
     )
 
 
+class HabitStreak(Base):
+    """
+    Cached streak summary for one habit (see habit_logic's streak summary).
+    Derived data: logs stay the source of truth, and any row can be rebuilt
+    from them. cadence_key records the cadence it was computed under, so a
+    re-cadenced habit is rebuilt on next read instead of served stale.
+    """
+    __tablename__ = "habit_streaks"
+    id = Column(Integer, primary_key=True, index=True)
+    habit_id = Column(Integer, ForeignKey("habits.id", ondelete="CASCADE"), nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    cadence_key = Column(String, nullable=False)
+    last_date = Column(Date, nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    week_anchor = Column(Date, nullable=True)        # Monday of last_date's week
+    week_count = Column(Integer, nullable=False, default=0)
+    run_end = Column(Date, nullable=True)            # latest hit day (week anchor for weekly)
+    run_length = Column(Integer, nullable=False, default=0)
+    prior_best = Column(Integer, nullable=False, default=0)
+    best = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
+    habit = relationship("Habit")
+
+
 class DayCompletion(Base):
     """
     Day-complete state for a user + date. All scheduled habits done = complete;
@@ -174,3 +202,8 @@ class PlayerXPEvent(Base):
     created_at = Column(DateTime, default=utc_now)
 
     user = relationship("User")
+
+    __table_args__ = (
+        # pay-once check: has this (source, source_key) already paid this user?
+        Index("ix_player_xp_events_user_source_key", "user_id", "source", "source_key"),
+    )
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, ForeignKey, Integer, BigInteger, String, Float, DateTime, Boolean,
-    UniqueConstraint
+    Index, Text, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 
@@ -30,7 +30,21 @@ class StravaConnection(Base):
     target_habit_id = Column(Integer, ForeignKey("habits.id", ondelete="SET NULL"), nullable=True)
     import_rides = Column(Boolean, nullable=False, default=False)   # runs always; rides opt-in
 
-    last_synced_at = Column(DateTime, nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)   # last completed full sync (webhooks don't move it)
+    # Newest activity start (epoch seconds) a completed sync has seen; the next
+    # sync asks Strava for activities after it (less an overlap).
+    sync_cursor = Column(BigInteger, nullable=True)
+
+    # Scheduled sync bookkeeping (see strava_sync): the outcome of the last
+    # attempt, and the backoff a failing connection waits out.
+    last_sync_attempt_at = Column(DateTime, nullable=True)
+    last_sync_status = Column(String, nullable=True)        # 'ok' | 'error' | 'rate_limited'
+    last_sync_error = Column(Text, nullable=True)
+    last_sync_duration_ms = Column(Integer, nullable=True)
+    last_sync_imported = Column(Integer, nullable=True)
+    sync_failures = Column(Integer, nullable=False, default=0)   # consecutive
+    next_sync_at = Column(DateTime, nullable=True)               # null = due whenever stale
+
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
@@ -65,3 +79,31 @@ class StravaActivityImport(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "activity_id", name="uq_strava_activity_per_user"),
     )
+
+
+class StravaImportJob(Base):
+    """
+    One webhook-announced activity waiting to be imported (see strava_jobs).
+    The webhook only inserts the row; workers fetch and import it, retrying
+    with backoff. Unique per activity, so Strava's redelivered events collapse
+    into one job. status: 'pending' | 'running' | 'done' | 'dead' (gave up;
+    the dead-letter list, kept for inspection and requeue).
+    """
+    __tablename__ = "strava_import_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    athlete_id = Column(BigInteger, nullable=False, index=True)
+    activity_id = Column(BigInteger, nullable=False)
+
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=utc_now)
+    locked_until = Column(DateTime, nullable=True)     # a running job's lease; expired = worker died
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=utc_now)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("activity_id", name="uq_strava_import_job_activity"),
+        # workers pick the oldest due job of a status
+        Index("ix_strava_import_jobs_status_due", "status", "next_attempt_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Enum, Float, Text, Boolean
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Date, Enum, Float, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -42,6 +42,12 @@ class ProgramExercise(Base):
 
 class WorkoutSession(Base):
     __tablename__ = "workout_sessions"
+    __table_args__ = (
+        # "latest session of a user's program" (the logger's session context)
+        Index("ix_workout_sessions_user_program_date", "user_id", "program_id", "session_date", "session_id"),
+        # a user's sessions newest first (history paging, latest-per-exercise)
+        Index("ix_workout_sessions_user_date", "user_id", "session_date", "session_id"),
+    )
     session_id = Column(Integer, primary_key=True, index=True)
     program_id = Column(Integer, ForeignKey('workout_programs.program_id'))
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'))
@@ -61,6 +67,11 @@ class WorkoutSession(Base):
 
 class SessionExercise(Base):
     __tablename__ = 'session_exercises'
+    __table_args__ = (
+        # "sessions that trained this exercise" (last performance, progression)
+        Index("ix_session_exercises_exercise_session", "exercise_id", "session_id"),
+        Index("ix_session_exercises_session_id", "session_id"),
+    )
     session_exercise_id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey('workout_sessions.session_id'))
     exercise_id = Column(Integer, ForeignKey('exercises.exercise_id'))
@@ -73,6 +84,9 @@ class SessionExercise(Base):
 
 class WorkoutSet(Base):
     __tablename__ = 'workout_sets'
+    __table_args__ = (
+        Index("ix_workout_sets_session_exercise_set", "session_exercise_id", "set_number"),
+    )
     set_id = Column(Integer, primary_key=True, index=True)
     session_exercise_id = Column(Integer, ForeignKey('session_exercises.session_exercise_id'))
     set_number = Column(Integer)
@@ -82,6 +96,32 @@ class WorkoutSet(Base):
 
     session_exercise = relationship("SessionExercise", back_populates="sets")
 
+class StrengthProgression(Base):
+    """
+    One user's best numbers for one exercise on one day: the top set (heaviest,
+    by e1RM), Epley e1RM, rep volume, and whether the day set a weight or e1RM
+    PR over every earlier day. Derived data maintained by log_workout_session
+    and rebuildable from the sets (rebuild_strength_progression), so the
+    progression view reads one row per trained day instead of replaying history.
+    prior_best_* are the running bests before this day, which lets a second
+    session on the same day re-merge without looking further back.
+    """
+    __tablename__ = "strength_progression"
+    __table_args__ = (UniqueConstraint("user_id", "exercise_id", "session_date"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.exercise_id", ondelete="CASCADE"), nullable=False)
+    session_date = Column(Date, nullable=False)
+    top_weight = Column(Float, nullable=False)
+    top_reps = Column(Integer, nullable=False)
+    e1rm = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+    prior_best_weight = Column(Float, nullable=True)     # None on the exercise's first day
+    prior_best_e1rm = Column(Float, nullable=True)
+    pr_weight = Column(Boolean, nullable=False, default=False)
+    pr_e1rm = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
 # Models below will be used for a global library of exercises in which users can choose from and add to
 class ExerciseCategory(Base):
     __tablename__ = 'exercise_categories'
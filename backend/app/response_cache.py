@@ -0,0 +1,120 @@
+"""
+Per-user cache for the read-model endpoints (Today, heatmaps, stats overview).
+
+Those responses only change when the user writes (a log, a habit edit, a
+challenge step) or when their local day rolls over, so entries are keyed
+(user_id, endpoint, params, user-local date) and every write path drops the
+user's entries via habit_crud.invalidate_user_cache(). Entries hold the
+rendered body and its ETag, so a hit skips both the queries and the JSON
+encoding, and a matching If-None-Match skips the body entirely.
+
+A read that races a write must not store what it computed before the write
+landed: readers take generation(user_id) before computing and pass it to
+put(), which skips storing if the user was invalidated since. Generations
+come from one counter bumped by every invalidation; each user's latest is
+kept in a bounded LRU, and a user whose stamp was evicted is treated as
+invalidated at the newest evicted stamp (at worst a put is skipped).
+
+Bounded LRU over all users. The TTL caps staleness across worker processes,
+which each hold their own cache and only see their own invalidations.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional, Set, Tuple
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL_SECONDS = 60
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2) against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[Tuple]] = {}
+        self._clock = 0                                               # bumped per invalidation
+        self._invalidated: "OrderedDict[int, int]" = OrderedDict()    # user -> clock at last invalidation
+        self._forgotten = 0                                           # newest stamp evicted from it
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: int) -> int:
+        """Read before computing a body; pass to put() so a write in between wins."""
+        with self._lock:
+            return self._clock
+
+    def get(self, user_id: int, *key: Hashable) -> Optional[CachedResponse]:
+        full_key = (user_id, *key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._drop(full_key)
+                return None
+            self._entries.move_to_end(full_key)
+            return entry
+
+    def put(self, user_id: int, *key: Hashable, body: bytes, generation: Optional[int] = None) -> CachedResponse:
+        """Store a body (and return it as an entry). With a generation from
+        before the body was computed, a user invalidated since isn't stored."""
+        full_key = (user_id, *key)
+        entry = CachedResponse(body, etag_for(body), time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            if generation is not None and self._invalidated.get(user_id, self._forgotten) > generation:
+                return entry
+            self._entries[full_key] = entry
+            self._entries.move_to_end(full_key)
+            self._keys_by_user.setdefault(user_id, set()).add(full_key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return entry
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for full_key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(full_key, None)
+            self._clock += 1
+            self._invalidated[user_id] = self._clock
+            self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > self.max_entries:
+                _, stamp = self._invalidated.popitem(last=False)
+                self._forgotten = max(self._forgotten, stamp)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, full_key: Tuple) -> None:
+        self._entries.pop(full_key, None)
+        keys = self._keys_by_user.get(full_key[0])
+        if keys is not None:
+            keys.discard(full_key)
+            if not keys:
+                del self._keys_by_user[full_key[0]]
+
+
+responses = ResponseCache()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from ..auth.admin_auth import require_admin, require_admin_or_moderator, make_user_admin, revoke_admin_role
+from ..auth import user_cache
 from ..dependencies import get_db
 from ..models.user_model import User
 from ..models.challenge_model import UserChallenge
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.get("/users", response_model=List[UserSchema])
-async def get_all_users(
+def get_all_users(
     skip: int = 0,
     limit: int = 100,
     _admin_user: User = Depends(require_admin_or_moderator),
@@ -30,33 +31,33 @@ async def get_all_users(
 
 
 @router.post("/users/{user_id}/make-admin")
-async def grant_admin_role(
+def grant_admin_role(
     user_id: int,
     _admin_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Grant admin role to a user (admin only)"""
-    user = await make_user_admin(user_id, db)
+    user = make_user_admin(user_id, db)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": f"User {user.username} granted admin role"}
 
 
 @router.post("/users/{user_id}/revoke-admin")
-async def revoke_admin_role_endpoint(
+def revoke_admin_role_endpoint(
     user_id: int,
     _admin_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Revoke admin role from a user (admin only)"""
-    user = await revoke_admin_role(user_id, db)
+    user = revoke_admin_role(user_id, db)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": f"Admin role revoked from user {user.username}"}
 
 
 @router.patch("/users/{user_id}/features")
-async def toggle_user_feature(
+def toggle_user_feature(
     user_id: int,
     payload: FeatureToggle,
     _admin_user: User = Depends(require_admin),
@@ -73,12 +74,13 @@ async def toggle_user_feature(
         flags.pop(payload.key, None)
     user.feature_flags = flags
     db.commit()
+    user_cache.invalidate_user(user_id)
     return {"message": f"Feature '{payload.key}' {'enabled' if payload.enabled else 'disabled'} "
                        f"for user {user.username}", "feature_flags": flags}
 
 
 @router.get("/challenges", response_model=List[ChallengeSchema])
-async def get_all_challenges_admin(
+def get_all_challenges_admin(
     _admin_user: User = Depends(require_admin_or_moderator),
     db: Session = Depends(get_db)
 ):
@@ -88,7 +90,7 @@ async def get_all_challenges_admin(
 
 
 @router.post("/challenges/{challenge_id}/toggle-active")
-async def toggle_challenge_active(
+def toggle_challenge_active(
     challenge_id: int,
     _admin_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -103,7 +105,7 @@ async def toggle_challenge_active(
 
 
 @router.post("/users/{user_id}/complete-challenge-day")
-async def admin_complete_challenge_day(
+def admin_complete_challenge_day(
     user_id: int,
     _admin_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -132,7 +134,7 @@ async def admin_complete_challenge_day(
 
 
 @router.post("/users/{user_id}/reset-progress")
-async def reset_user_progress_endpoint(
+def reset_user_progress_endpoint(
     user_id: int,
     _admin_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -146,9 +148,14 @@ async def reset_user_progress_endpoint(
 
 
 @router.get("/stats")
-async def get_admin_stats(
+def get_admin_stats(
     _admin_user: User = Depends(require_admin_or_moderator),
     db: Session = Depends(get_db)
 ):
     """Get system statistics (admin/moderator only)"""
-    return admin_crud.get_system_stats(db)
\ No newline at end of file
+    return admin_crud.get_system_stats(db)
+
+@router.get("/cache-stats")
+def get_cache_stats(_admin_user: User = Depends(require_admin_or_moderator)):
+    """Per-process auth cache counters (hits, misses, hit_rate) for this worker."""
+    return {"auth_user_cache": user_cache.stats()}
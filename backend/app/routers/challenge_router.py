@@ -10,7 +10,7 @@ from ..dependencies import get_db
 router = APIRouter(prefix="/challenges", tags=["challenges"])
 
 @router.get("/available", response_model=challenge_schema.ChallengeLibraryResponse)
-async def get_available_challenges(
+def get_available_challenges(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
 ):
@@ -27,7 +27,7 @@ async def get_available_challenges(
         )
 
 @router.post("/join", response_model=challenge_schema.UserChallenge)
-async def join_challenge(
+def join_challenge(
     request: challenge_schema.ChallengeJoinRequest,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
@@ -54,7 +54,7 @@ async def join_challenge(
         )
 
 @router.get("/active")
-async def get_active_challenge(
+def get_active_challenge(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
 ):
@@ -95,7 +95,7 @@ async def get_active_challenge(
         )
 
 @router.post("/complete")
-async def mark_day_complete(
+def mark_day_complete(
     request: challenge_schema.MarkCompleteRequest,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
@@ -140,7 +140,7 @@ async def mark_day_complete(
         )
 
 @router.post("/quit")
-async def quit_challenge(
+def quit_challenge(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
 ):
@@ -164,7 +164,7 @@ async def quit_challenge(
         )
 
 @router.get("/history", response_model=challenge_schema.ChallengeHistoryResponse)
-async def get_challenge_history(
+def get_challenge_history(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
@@ -189,7 +189,7 @@ async def get_challenge_history(
         )
 
 @router.get("/badges", response_model=challenge_schema.UserBadgesResponse)
-async def get_user_badges(
+def get_user_badges(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
 ):
@@ -207,7 +207,7 @@ async def get_user_badges(
 
 # Admin endpoints (for seeding challenges, managing badges, etc.)
 @router.get("/{challenge_id}", response_model=challenge_schema.Challenge)
-async def get_challenge_by_id(
+def get_challenge_by_id(
     challenge_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
@@ -232,7 +232,7 @@ async def get_challenge_by_id(
         )
 
 @router.post("/restore-grace-period/{user_challenge_id}", response_model=challenge_schema.UserChallenge)
-async def restore_challenge_grace_period(
+def restore_challenge_grace_period(
     user_challenge_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
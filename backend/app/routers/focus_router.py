@@ -37,7 +37,7 @@ def _bad_request(e: ValueError):
 # --- State & summary -----------------------------------------------------------
 
 @router.get("/state")
-async def get_state(
+def get_state(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
 ):
@@ -46,7 +46,7 @@ async def get_state(
 
 
 @router.get("/summary")
-async def get_summary(
+def get_summary(
     days: int = Query(105, ge=7, le=400),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -58,7 +58,7 @@ async def get_summary(
 # --- Categories -----------------------------------------------------------------
 
 @router.get("/categories")
-async def list_categories(
+def list_categories(
     include_archived: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -68,7 +68,7 @@ async def list_categories(
 
 
 @router.post("/categories", status_code=status.HTTP_201_CREATED)
-async def create_category(
+def create_category(
     data: focus_schema.FocusCategoryCreate,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -81,7 +81,7 @@ async def create_category(
 
 
 @router.patch("/categories/{category_id}")
-async def update_category(
+def update_category(
     category_id: int,
     data: focus_schema.FocusCategoryUpdate,
     db: Session = Depends(get_db),
@@ -97,7 +97,7 @@ async def update_category(
 # --- Sessions ---------------------------------------------------------------------
 
 @router.get("/active")
-async def get_active(
+def get_active(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
 ):
@@ -106,7 +106,7 @@ async def get_active(
 
 
 @router.post("/sessions/start")
-async def start_session(
+def start_session(
     payload: focus_schema.FocusSessionStart,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -118,7 +118,7 @@ async def start_session(
 
 
 @router.post("/sessions/{session_id}/pause")
-async def pause_session(
+def pause_session(
     session_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -131,7 +131,7 @@ async def pause_session(
 
 
 @router.post("/sessions/{session_id}/resume")
-async def resume_session(
+def resume_session(
     session_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -143,7 +143,7 @@ async def resume_session(
 
 
 @router.post("/sessions/{session_id}/capture")
-async def add_capture(
+def add_capture(
     session_id: int,
     payload: focus_schema.CaptureAdd,
     db: Session = Depends(get_db),
@@ -156,7 +156,7 @@ async def add_capture(
 
 
 @router.post("/sessions/{session_id}/stop")
-async def stop_session(
+def stop_session(
     session_id: int,
     payload: focus_schema.FocusSessionStop,
     db: Session = Depends(get_db),
@@ -170,7 +170,7 @@ async def stop_session(
 
 
 @router.post("/sessions", status_code=status.HTTP_201_CREATED)
-async def create_manual_session(
+def create_manual_session(
     payload: focus_schema.FocusSessionManual,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -183,7 +183,7 @@ async def create_manual_session(
 
 
 @router.get("/sessions")
-async def list_sessions(
+def list_sessions(
     on_date: date = Query(..., alias="date"),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -192,7 +192,7 @@ async def list_sessions(
 
 
 @router.patch("/sessions/{session_id}")
-async def update_session(
+def update_session(
     session_id: int,
     payload: focus_schema.FocusSessionUpdate,
     db: Session = Depends(get_db),
@@ -205,7 +205,7 @@ async def update_session(
 
 
 @router.delete("/sessions/{session_id}")
-async def delete_session(
+def delete_session(
     session_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -219,7 +219,7 @@ async def delete_session(
 # --- Day notes & settings ------------------------------------------------------------
 
 @router.put("/day-note")
-async def upsert_day_note(
+def upsert_day_note(
     payload: focus_schema.FocusDayNoteUpsert,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
@@ -231,7 +231,7 @@ async def upsert_day_note(
 
 
 @router.patch("/settings")
-async def update_settings(
+def update_settings(
     payload: focus_schema.FocusSettingsUpdate,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(require_click_tracking),
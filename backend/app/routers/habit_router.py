@@ -2,7 +2,8 @@ import logging
 from datetime import date
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from ..models import user_model
@@ -10,6 +11,8 @@ from ..schemas import habit_schema
 from ..crud import habit_crud
 from ..auth import auth_utils
 from ..dependencies import get_db
+from ..response_cache import etag_matches, responses
+from ..utils.time import get_user_today
 
 router = APIRouter(tags=["habits"])
 logger = logging.getLogger(__name__)
@@ -19,10 +22,28 @@ def _bad_request(e: ValueError):
     return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+def _cached_read(request: Request, db: Session, user: user_model.User, endpoint: str,
+                 params: tuple, compute) -> Response:
+    """
+    Serve a read-model endpoint through the per-user response cache (see
+    app.response_cache). Keyed by the user's local date so a rollover misses;
+    habit_crud writes invalidate. 304 when the client's ETag is still current.
+    """
+    user_today = get_user_today(db, user)
+    entry = responses.get(user.id, endpoint, params, user_today)
+    if entry is None:
+        generation = responses.generation(user.id)   # a write landing during compute() wins
+        entry = responses.put(user.id, endpoint, params, user_today, body=JSONResponse(compute()).body,
+                              generation=generation)
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": entry.etag})
+    return Response(entry.body, media_type="application/json", headers={"ETag": entry.etag})
+
+
 # --- Buckets & library -------------------------------------------------------
 
 @router.get("/buckets", response_model=List[habit_schema.BucketOut])
-async def get_buckets(
+def get_buckets(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
@@ -33,18 +54,20 @@ async def get_buckets(
 # --- Today (the daily loop) --------------------------------------------------
 
 @router.get("/today")
-async def get_today(
+def get_today(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
     """Everything the Today view needs in one call."""
-    return habit_crud.get_today(db, current_user)
+    return _cached_read(request, db, current_user, "today", (),
+                        lambda: habit_crud.get_today(db, current_user))
 
 
 # --- Habit CRUD ---------------------------------------------------------------
 
 @router.get("/habits", response_model=List[habit_schema.HabitOut])
-async def list_habits(
+def list_habits(
     include_archived: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
@@ -53,7 +76,7 @@ async def list_habits(
 
 
 @router.get("/habits/slots")
-async def get_slots(
+def get_slots(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
@@ -61,34 +84,45 @@ async def get_slots(
 
 
 @router.get("/habits/heatmap")
-async def get_heatmap(
+def get_heatmap(
+    request: Request,
     days: int = Query(182, ge=7, le=400),
     habit_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
-    return habit_crud.get_heatmap(db, current_user, days=days, habit_id=habit_id)
+    return _cached_read(request, db, current_user, "heatmap", (days, habit_id),
+                        lambda: habit_crud.get_heatmap(db, current_user, days=days, habit_id=habit_id))
 
 
 @router.get("/habits/heatmap-by-habit")
-async def get_heatmap_by_habit(
+def get_heatmap_by_habit(
+    request: Request,
     days: int = Query(126, ge=7, le=400),
+    encoding: str = Query("days"),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
-    return habit_crud.get_heatmap_by_habit(db, current_user, days=days)
+    """encoding=bits|rle returns one compact string grid per habit instead of day dicts."""
+    try:
+        return _cached_read(request, db, current_user, "heatmap-by-habit", (days, encoding),
+                            lambda: habit_crud.get_heatmap_by_habit(db, current_user, days=days, encoding=encoding))
+    except ValueError as e:
+        raise _bad_request(e)
 
 
 @router.get("/habits/stats-overview")
-async def get_stats_overview(
+def get_stats_overview(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
-    return habit_crud.get_stats_overview(db, current_user)
+    return _cached_read(request, db, current_user, "stats-overview", (),
+                        lambda: habit_crud.get_stats_overview(db, current_user))
 
 
 @router.post("/habits", response_model=habit_schema.HabitOut, status_code=status.HTTP_201_CREATED)
-async def create_habit(
+def create_habit(
     data: habit_schema.HabitCreate,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
@@ -100,7 +134,7 @@ async def create_habit(
 
 
 @router.post("/habits/reorder", response_model=List[habit_schema.HabitOut])
-async def reorder_habits(
+def reorder_habits(
     payload: habit_schema.HabitReorder,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
@@ -109,7 +143,7 @@ async def reorder_habits(
 
 
 @router.patch("/habits/{habit_id}", response_model=habit_schema.HabitOut)
-async def update_habit(
+def update_habit(
     habit_id: int,
     data: habit_schema.HabitUpdate,
     db: Session = Depends(get_db),
@@ -122,7 +156,7 @@ async def update_habit(
 
 
 @router.post("/habits/{habit_id}/archive", response_model=habit_schema.HabitOut)
-async def archive_habit(
+def archive_habit(
     habit_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
@@ -134,7 +168,7 @@ async def archive_habit(
 
 
 @router.post("/habits/{habit_id}/restore", response_model=habit_schema.HabitOut)
-async def restore_habit(
+def restore_habit(
     habit_id: int,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
@@ -148,7 +182,7 @@ async def restore_habit(
 # --- Logging -------------------------------------------------------------------
 
 @router.post("/habits/{habit_id}/logs")
-async def log_habit(
+def log_habit(
     habit_id: int,
     payload: habit_schema.HabitLogCreate,
     db: Session = Depends(get_db),
@@ -165,7 +199,7 @@ async def log_habit(
 
 
 @router.patch("/habits/{habit_id}/logs/{log_date}")
-async def update_log(
+def update_log(
     habit_id: int,
     log_date: date,
     payload: habit_schema.HabitLogUpdate,
@@ -179,7 +213,7 @@ async def update_log(
 
 
 @router.delete("/habits/{habit_id}/logs/{log_date}")
-async def delete_log(
+def delete_log(
     habit_id: int,
     log_date: date,
     db: Session = Depends(get_db),
@@ -27,7 +27,7 @@ IOS_PLATFORM = "ios"
 
 
 @router.get("/login")
-async def login_via_google(platform: str | None = None):
+def login_via_google(platform: str | None = None):
     authorize_url = OAuth2Config.authorize_url
     client_id = OAuth2Config.client_id
     redirect_uri = OAuth2Config.callback_url
@@ -45,7 +45,7 @@ async def login_via_google(platform: str | None = None):
     return {"login_url": login_url}
 
 @router.get("/auth/callback")
-async def callback(code: str, state: str = "", db: Session = Depends(get_db)):
+def callback(code: str, state: str = "", db: Session = Depends(get_db)):
     if not code:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing authorization code")
     
@@ -71,7 +71,7 @@ async def callback(code: str, state: str = "", db: Session = Depends(get_db)):
 
     # Verify and register user
     print(f"Fetched User Info: {user_info}")
-    result = await handle_user_authentication(user_info, db)
+    result = handle_user_authentication(user_info, db)
 
     # iOS hands tokens back over the app's custom scheme; every other platform
     # returns to the web frontend URL. Only the redirect target differs.
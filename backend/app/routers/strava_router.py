@@ -6,6 +6,7 @@ only available when the server has STRAVA_* configured.
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
@@ -15,7 +16,7 @@ from ..schemas import strava_schema
 from ..crud import strava_crud
 from ..auth import auth_utils
 from ..dependencies import get_db
-from .. import strava_client
+from .. import strava_client, strava_jobs
 
 router = APIRouter(prefix="/strava", tags=["strava"])
 logger = logging.getLogger(__name__)
@@ -34,7 +35,7 @@ def _bad_request(e: ValueError):
 
 
 @router.get("/status")
-async def strava_status(
+def strava_status(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
@@ -42,7 +43,7 @@ async def strava_status(
 
 
 @router.get("/connect")
-async def strava_connect(
+def strava_connect(
     platform: str | None = Query(None),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
@@ -54,7 +55,7 @@ async def strava_connect(
 
 
 @router.get("/callback")
-async def strava_callback(
+def strava_callback(
     code: str | None = Query(None),
     state: str = Query(""),
     error: str | None = Query(None),
@@ -82,7 +83,7 @@ async def strava_callback(
 
 
 @router.post("/sync")
-async def strava_sync(
+def strava_sync(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
@@ -91,14 +92,17 @@ async def strava_sync(
         return strava_crud.sync_now(db, current_user)
     except ValueError as e:
         raise _bad_request(e)
-    except strava_client.StravaError:
+    except strava_client.StravaError as e:
+        if e.status_code == 429:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                detail="Strava is busy right now — try again in a few minutes")
         logger.exception("Strava sync failed")
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY,
                             detail="Couldn't reach Strava — try again in a bit")
 
 
 @router.patch("/settings")
-async def strava_settings(
+def strava_settings(
     payload: strava_schema.StravaSettingsUpdate,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
@@ -113,7 +117,7 @@ async def strava_settings(
 
 
 @router.post("/disconnect")
-async def strava_disconnect(
+def strava_disconnect(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user),
 ):
@@ -135,21 +139,31 @@ async def strava_webhook_verify(request: Request):
 
 @router.post("/webhook")
 async def strava_webhook_event(request: Request, db: Session = Depends(get_db)):
-    """Receive an activity event and import it. Always 200 fast so Strava doesn't
-    retry; the actual work is best-effort."""
+    """Receive an activity event and queue its import. Always 200 fast so Strava
+    doesn't retry: this only inserts a strava_import_jobs row (on the threadpool)
+    and the strava_jobs workers do the fetch + import. Async only to read the
+    raw body (a malformed one must still get a 200)."""
     try:
         event = await request.json()
     except Exception:
         return {"ok": True}
-
-    if event.get("object_type") == "activity" and event.get("aspect_type") == "create":
-        owner_id = event.get("owner_id")
-        activity_id = event.get("object_id")
-        conn = (db.query(strava_crud.StravaConnection)
-                .filter(strava_crud.StravaConnection.athlete_id == owner_id).first())
-        if conn and conn.target_habit_id and activity_id:
-            try:
-                strava_crud.import_one_activity(db, conn, activity_id)
-            except Exception:
-                logger.exception("Strava webhook import failed (non-fatal)")
+    if await run_in_threadpool(_enqueue_webhook_event, db, event):
+        strava_jobs.workers.notify()
     return {"ok": True}
+
+
+def _enqueue_webhook_event(db: Session, event: dict) -> bool:
+    if not isinstance(event, dict):
+        return False
+    if event.get("object_type") != "activity" or event.get("aspect_type") != "create":
+        return False
+    try:
+        owner_id, activity_id = int(event["owner_id"]), int(event["object_id"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    try:
+        return strava_jobs.enqueue(db, owner_id, activity_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Couldn't queue Strava webhook event (non-fatal)")
+        return False
@@ -4,8 +4,9 @@ from ..oauth2_config import OAuth2Config
 from ..models import user_model
 from ..schemas import user_schema
 from ..crud import user_crud, skill_crud
-from ..auth import auth_utils
+from ..auth import auth_utils, user_cache
 from ..dependencies import get_db
+from ..utils.time import forget_user_timezone
 from typing import List, Dict
 from urllib.parse import urlencode
 from sqlalchemy.inspection import inspect
@@ -16,7 +17,7 @@ router = APIRouter()
 
 # User Authentication
 @router.get("/auth/login")
-async def oauth_login():
+def oauth_login():
     try:
         query_params = {
             "response_type": "code",
@@ -34,7 +35,7 @@ async def oauth_login():
 # flow: registration token -> /user-setup -> finalize -> the same JWTs.
 # Only the bcrypt hash ever enters the token; the plaintext is never stored.
 @router.post("/auth/email-start")
-async def email_registration_start(request: user_schema.EmailStartRequest, db: Session = Depends(get_db)):
+def email_registration_start(request: user_schema.EmailStartRequest, db: Session = Depends(get_db)):
     if user_crud.get_user_by_email(db, email=request.email):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="That email is already registered - sign in instead")
@@ -50,7 +51,7 @@ async def email_registration_start(request: user_schema.EmailStartRequest, db: S
 
 # Email/password sign-in: same tokens as the OAuth flow, different credential.
 @router.post("/auth/email-login")
-async def email_login(request: user_schema.EmailLoginRequest, db: Session = Depends(get_db)):
+def email_login(request: user_schema.EmailLoginRequest, db: Session = Depends(get_db)):
     identifier = request.identifier.strip()
     user = (user_crud.get_user_by_email(db, email=identifier) if "@" in identifier
             else user_crud.get_user_by_username(db, username=identifier))
@@ -68,7 +69,7 @@ async def email_login(request: user_schema.EmailLoginRequest, db: Session = Depe
 
 # Create a useranme from first-time Google Log-in
 @router.post("/set-username")
-async def set_username(request: user_schema.SetUsernameRequest, db: Session = Depends(get_db)):
+def set_username(request: user_schema.SetUsernameRequest, db: Session = Depends(get_db)):
     # Validate the temporary token and extract user info
     user_info = auth_utils.validate_registration_token(request.token)
     if not user_info:
@@ -97,7 +98,7 @@ async def set_username(request: user_schema.SetUsernameRequest, db: Session = De
 
 # Final step of the OAuth registration process
 @router.post("/finalize-oauth-registration")
-async def create_oauth_user(request: user_schema.CreateAccountRequest, db: Session = Depends(get_db)):
+def create_oauth_user(request: user_schema.CreateAccountRequest, db: Session = Depends(get_db)):
     # Validate the temporary token and extract user info
     user_info = auth_utils.validate_registration_token(request.temp_token)
     if not user_info:
@@ -134,7 +135,7 @@ async def create_oauth_user(request: user_schema.CreateAccountRequest, db: Sessi
 
 # Used for refreshing expired tokens
 @router.post("/refresh-token")
-async def refresh_token_endpoint(request: user_schema.RefreshTokenRequest, db: Session = Depends(get_db)):
+def refresh_token_endpoint(request: user_schema.RefreshTokenRequest, db: Session = Depends(get_db)):
     decoded_token = auth_utils.validate_refresh_token(request.refresh_token)
     if not decoded_token:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token")
@@ -204,7 +205,7 @@ def delete_user_endpoint(user_id: int, db: Session = Depends(get_db)):
 
 # Get the current user's data
 @router.get("/users/me", response_model=user_schema.UserWithSkills)
-async def read_current_user_data(db: Session = Depends(get_db), current_user: user_model.User = Depends(auth_utils.get_current_user)):
+def read_current_user_data(db: Session = Depends(get_db), current_user: user_model.User = Depends(auth_utils.get_current_user)):
     user_data = db.query(user_model.User).filter(user_model.User.id == current_user.id).first()
     if not user_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -223,7 +224,7 @@ async def read_current_user_data(db: Session = Depends(get_db), current_user: us
     return user_schema.UserWithSkills(**user_dict, skills=skills_dicts)
 
 @router.put("/users/me/timezone")
-async def update_user_timezone(
+def update_user_timezone(
     timezone: str = Body(..., embed=True),
     db: Session = Depends(get_db), 
     current_user: user_model.User = Depends(auth_utils.get_current_user)
@@ -237,6 +238,8 @@ async def update_user_timezone(
         
         current_user.timezone = timezone
         db.commit()
+        forget_user_timezone(current_user.id)
+        user_cache.invalidate_user(current_user.id)
         db.refresh(current_user)
         
         return {"message": "Timezone updated successfully", "timezone": timezone}
@@ -247,7 +250,7 @@ async def update_user_timezone(
         )
 
 @router.put("/users/me/avatar")
-async def update_user_avatar(
+def update_user_avatar(
     payload: user_schema.AvatarUpdate,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_utils.get_current_user)
@@ -261,6 +264,7 @@ async def update_user_avatar(
                             detail="Avatar must be an https image URL or a preset")
     current_user.avatar_url = url
     db.commit()
+    user_cache.invalidate_user(current_user.id)
     return {"avatar_url": url}
 
 
@@ -4,6 +4,7 @@ from ..schemas import workout_schema
 from ..models import workout_model
 from ..crud import workout_crud, user_crud
 from ..dependencies import get_db
+from ..exercise_catalog import catalog
 from typing import List, Dict, Tuple, Optional
 import logging
 from datetime import datetime
@@ -45,6 +46,14 @@ def update_exercise(user_id: int, exercise_id: int, exercise_update: workout_sch
 def get_exercises(user_id: Optional[int] = None, db: Session = Depends(get_db)):
     return workout_crud.get_exercises(db, user_id)
 
+# Picker search: ranked name match, muscle-group/equipment facets, one page at a time
+@router.get("/exercises/search", response_model=workout_schema.ExerciseSearchPage)
+def search_exercises(user_id: Optional[int] = None, q: Optional[str] = None,
+                     muscle_group_id: Optional[int] = None, equipment_id: Optional[int] = None,
+                     limit: int = Query(25, ge=1, le=100), offset: int = Query(0, ge=0),
+                     db: Session = Depends(get_db)):
+    return workout_crud.search_exercises(db, user_id, q, muscle_group_id, equipment_id, limit, offset)
+
 @router.delete("/exercises/{exercise_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_exercise(user_id: int, exercise_id: int, db: Session = Depends(get_db)):
     try:
@@ -60,13 +69,7 @@ def delete_exercise(user_id: int, exercise_id: int, db: Session = Depends(get_db
 # Fetch exercise metadata values    
 @router.get("/exercises/lookup-data")
 def get_exercise_lookup_data(db: Session = Depends(get_db)):
-    return {
-        "categories": [{"id": cat.id, "name": cat.name} for cat in db.query(workout_model.ExerciseCategory).all()],
-        "muscleGroups": [{"id": mg.id, "name": mg.name} for mg in db.query(workout_model.ExerciseMuscleGroup).all()],
-        "equipment": [{"id": eq.id, "name": eq.name} for eq in db.query(workout_model.ExerciseEquipment).all()],
-        "difficultyLevels": [{"id": dl.id, "level": dl.level} for dl in db.query(workout_model.ExerciseDifficultyLevel).all()],
-        "exerciseTypes": [{"id": et.id, "type": et.type} for et in db.query(workout_model.ExerciseType).all()]
-    }
+    return catalog.lookup_data(db)
 
 # Get a workout program by ID
 @router.get("/workout-programs/{program_id}", response_model=workout_schema.WorkoutProgram)
@@ -112,11 +115,42 @@ def read_workout_program_details(program_id: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout program not found")
     return program_details
 
-# Per-exercise top-set weight + estimated 1RM over time, and recent sessions
+# Per-exercise top-set weight + estimated 1RM over time, and session counts
 @router.get("/users/{user_id}/strength-progression")
 def read_strength_progression(user_id: int, db: Session = Depends(get_db)):
     return workout_crud.get_strength_progression(db, user_id)
 
+# Weekly tonnage, its rolling 4-week sum, and tonnage per muscle group
+@router.get("/users/{user_id}/strength-trends")
+def read_strength_trends(user_id: int,
+                         weeks: int = Query(workout_crud.STRENGTH_TRENDS_WEEKS, ge=1,
+                                            le=workout_crud.STRENGTH_TRENDS_MAX_WEEKS),
+                         db: Session = Depends(get_db)):
+    try:
+        return workout_crud.get_strength_trends(db, user_id, weeks)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+# Session log, newest first, one keyset page at a time (pass back next_cursor)
+@router.get("/users/{user_id}/session-history")
+def read_session_history(user_id: int, cursor: Optional[str] = None,
+                         limit: int = Query(workout_crud.SESSION_PAGE_SIZE, ge=1, le=workout_crud.SESSION_PAGE_MAX),
+                         db: Session = Depends(get_db)):
+    try:
+        return workout_crud.get_session_history(db, user_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+# Full session detail (exercise totals + sets), paged like the session log
+@router.get("/users/{user_id}/workout-progress/sessions")
+def read_workout_progress_sessions(user_id: int, cursor: Optional[str] = None,
+                                   limit: int = Query(workout_crud.SESSION_PAGE_SIZE, ge=1, le=workout_crud.SESSION_PAGE_MAX),
+                                   db: Session = Depends(get_db)):
+    try:
+        return workout_crud.get_workout_progress(db, user_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 # Last performed sets per program-exercise (in-logger "what did I lift last time?")
 @router.get("/users/{user_id}/workout-programs/{program_id}/last-performance")
 def read_last_performance(user_id: int, program_id: int, db: Session = Depends(get_db)):
@@ -209,8 +243,11 @@ def delete_all_workout_data(db: Session = Depends(get_db)):
         
         # Only delete user-created exercises
         db.query(workout_model.Exercise).filter(workout_model.Exercise.is_global == False).delete()
+        db.query(workout_model.StrengthProgression).delete()
 
         db.commit()
+        catalog.clear()
+        workout_crud.invalidate_last_performance()
         return {"detail": "All workout data deleted successfully."}
     except Exception as e:
         db.rollback()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 # Create schemas
 class ExerciseCreate(BaseModel):
@@ -78,6 +78,18 @@ class Exercise(BaseModel):
     class Config:
         from_attributes = True
 
+class ExerciseFacet(BaseModel):
+    id: int
+    name: Optional[str]
+    count: int
+
+class ExerciseSearchPage(BaseModel):
+    items: List[Exercise]
+    total: int
+    limit: int
+    offset: int
+    facets: Dict[str, List[ExerciseFacet]]
+
 class ExerciseSet(BaseModel):
     set_number: int
     weight: Optional[float] = None
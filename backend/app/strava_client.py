@@ -2,10 +2,19 @@
 Thin Strava API wrapper: OAuth token exchange/refresh + activity fetch. Pure
 HTTP, no DB — the CRUD layer owns persistence and mapping. All calls raise
 StravaError on a non-2xx so the router can turn it into a clean 4xx/5xx.
+
+Every call goes through one pooled httpx.AsyncClient (keep-alive, so a sync
+reuses its TLS connections) running on a private event-loop thread; the
+module-level functions are blocking wrappers for the sync CRUD layer. A shared
+RateBudget tracks Strava's app-wide 15-minute and daily limits from the
+X-RateLimit headers, and iter_activities() walks a history's pages several at
+a time within it, handing back each wave as a chunk to import.
 """
+import asyncio
 import logging
+import threading
 import time
-from typing import List, Optional
+from typing import AsyncIterator, Iterator, List, Optional
 
 import httpx
 
@@ -25,9 +34,270 @@ RIDE_SPORT_TYPES = {"Ride", "VirtualRide", "MountainBikeRide", "GravelRide", "EB
 # Refresh a bit before the token actually expires so a call never races the clock.
 TOKEN_EXPIRY_BUFFER_SECONDS = 120
 
+MAX_PER_PAGE = 200               # Strava's cap for /athlete/activities
+PAGE_CONCURRENCY = 4             # pages in flight per history walk
+MAX_CONNECTIONS = 20
+REQUEST_TIMEOUT_SECONDS = 20.0
+
+# Strava's default app limits (15-minute, daily) until a response tells us ours.
+DEFAULT_RATE_LIMITS = (200, 2000)
+# Requests a bulk page walk leaves untouched in each window, so webhook imports
+# and token refreshes still get through while a backfill runs.
+RATE_LIMIT_RESERVE = 10
+_WINDOW_SECONDS = (15 * 60, 24 * 3600)
+
 
 class StravaError(Exception):
-    """Any failed Strava HTTP call."""
+    """Any failed Strava HTTP call. status_code is None when no response came back."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """Worth trying again later: rate-limited, a Strava-side error, or no response."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def _header_pair(headers, name: str) -> Optional[List[int]]:
+    try:
+        first, second = headers[name].split(",")[:2]
+        return [int(first), int(second)]
+    except (KeyError, ValueError):
+        return None
+
+
+class RateBudget:
+    """
+    Strava's app-wide request limits: a 15-minute window (resetting at :00, :15,
+    :30 and :45 UTC) and a daily one (midnight UTC). Requests are counted as
+    they're sent, and each response's X-RateLimit-Usage — which includes every
+    other process sharing the app's limit — is adopted when it's higher. Reads
+    have their own, tighter limit on newer apps (X-ReadRateLimit-*); every call
+    here is a read, so that one wins when present.
+    """
+
+    def __init__(self, limits=DEFAULT_RATE_LIMITS, reserve: int = RATE_LIMIT_RESERVE, clock=time.time):
+        self.limits = list(limits)
+        self.usage = [0, 0]
+        self.reserve = reserve
+        self._clock = clock
+        self._windows = None
+        self._lock = threading.Lock()
+
+    def _roll(self) -> None:
+        now = self._clock()
+        windows = [int(now // seconds) for seconds in _WINDOW_SECONDS]
+        if self._windows is not None:
+            self.usage = [0 if new != old else used
+                          for used, old, new in zip(self.usage, self._windows, windows)]
+        self._windows = windows
+
+    def _left(self) -> int:
+        return min(limit - used for limit, used in zip(self.limits, self.usage))
+
+    def headroom(self) -> int:
+        """Requests a bulk walk may still make in the current windows."""
+        with self._lock:
+            self._roll()
+            return max(0, self._left() - self.reserve)
+
+    def seconds_until_reset(self) -> int:
+        """Until the exhausted window with the longest wait rolls over (0 if none is)."""
+        with self._lock:
+            self._roll()
+            now = self._clock()
+            return int(max([seconds - now % seconds
+                            for seconds, limit, used in zip(_WINDOW_SECONDS, self.limits, self.usage)
+                            if used >= limit] or [0]))
+
+    def take(self) -> None:
+        with self._lock:
+            self._roll()
+            if self._left() < 1:
+                raise StravaError("Strava rate limit reached; try again after the window resets", 429)
+            self.usage = [used + 1 for used in self.usage]
+
+    def observe(self, headers, status_code: int) -> None:
+        with self._lock:
+            self._roll()
+            limits = _header_pair(headers, "X-ReadRateLimit-Limit") or _header_pair(headers, "X-RateLimit-Limit")
+            usage = _header_pair(headers, "X-ReadRateLimit-Usage") or _header_pair(headers, "X-RateLimit-Usage")
+            if limits:
+                self.limits = limits
+            if usage:
+                self.usage = [max(ours, theirs) for ours, theirs in zip(self.usage, usage)]
+            if status_code == 429 and self._left() > 0:
+                self.usage[0] = self.limits[0]      # Strava says we're over; sit out this window
+
+
+class StravaAPI:
+    """
+    One pooled httpx.AsyncClient on its own event-loop thread, shared by every
+    caller in the process. Async code on that loop awaits the coroutines
+    directly; anything else (the sync CRUD layer) goes through run().
+    """
+
+    def __init__(self, budget: Optional[RateBudget] = None, max_connections: int = MAX_CONNECTIONS,
+                 timeout: float = REQUEST_TIMEOUT_SECONDS):
+        self.budget = budget or RateBudget()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # --- event loop ----------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="strava-http", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro):
+        """Run a coroutine on the client's loop and block for its result."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("StravaAPI.run() called from its own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _http(self) -> httpx.AsyncClient:
+        # Created on the loop thread, which is the only one that touches it.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections))
+        return self._client
+
+    # --- requests ------------------------------------------------------------
+
+    async def request(self, method: str, url: str, what: str, **kwargs) -> httpx.Response:
+        self.budget.take()
+        try:
+            resp = await self._http().request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            raise StravaError(f"{what} failed: {exc!r}") from exc
+        self.budget.observe(resp.headers, resp.status_code)
+        if resp.status_code != 200:
+            raise StravaError(f"{what} failed ({resp.status_code}): {resp.text}", resp.status_code)
+        return resp
+
+    async def exchange_code(self, code: str) -> dict:
+        resp = await self.request("POST", STRAVA_OAUTH_URL, "Token exchange", data={
+            "client_id": Config.STRAVA_CLIENT_ID,
+            "client_secret": Config.STRAVA_CLIENT_SECRET,
+            "code": code,
+            "grant_type": "authorization_code",
+        })
+        return resp.json()
+
+    async def refresh_tokens(self, refresh_token: str) -> dict:
+        resp = await self.request("POST", STRAVA_OAUTH_URL, "Token refresh", data={
+            "client_id": Config.STRAVA_CLIENT_ID,
+            "client_secret": Config.STRAVA_CLIENT_SECRET,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token",
+        })
+        return resp.json()
+
+    async def list_activities(self, access_token: str, after_epoch: Optional[int] = None,
+                              per_page: int = 50, page: int = 1) -> List[dict]:
+        params = {"per_page": per_page, "page": page}
+        if after_epoch:
+            params["after"] = after_epoch
+        resp = await self.request("GET", f"{STRAVA_API_BASE}/athlete/activities", "Activity fetch",
+                                  headers={"Authorization": f"Bearer {access_token}"}, params=params)
+        return resp.json()
+
+    async def get_activity(self, access_token: str, activity_id: int) -> dict:
+        resp = await self.request("GET", f"{STRAVA_API_BASE}/activities/{activity_id}",
+                                  f"Activity {activity_id} fetch",
+                                  headers={"Authorization": f"Bearer {access_token}"})
+        return resp.json()
+
+    async def deauthorize(self, access_token: str) -> None:
+        await self.request("POST", STRAVA_DEAUTHORIZE_URL, "Deauthorize",
+                           headers={"Authorization": f"Bearer {access_token}"})
+
+    # --- history walk ----------------------------------------------------------
+
+    async def _wave(self, access_token: str, after_epoch: Optional[int], first_page: int,
+                    per_page: int, concurrency: int) -> List[List[dict]]:
+        size = min(concurrency, self.budget.headroom())
+        if size < 1:
+            raise StravaError("Strava rate limit budget spent; try again after "
+                              f"{self.budget.seconds_until_reset()}s", 429)
+        return await asyncio.gather(*(self.list_activities(access_token, after_epoch, per_page, page)
+                                      for page in range(first_page, first_page + size)))
+
+    async def walk_activities(self, access_token: str, after_epoch: Optional[int] = None,
+                              per_page: int = MAX_PER_PAGE,
+                              concurrency: int = PAGE_CONCURRENCY) -> AsyncIterator[List[dict]]:
+        """
+        Every activity (after after_epoch), one chunk per wave of pages. A wave
+        fetches up to `concurrency` pages at once, fewer when the rate budget is
+        low; the next wave is already in flight while the caller handles this
+        one. The walk ends at the first short page — at most concurrency - 1
+        empty pages are fetched past the end.
+        """
+        page = 1
+        wave = asyncio.ensure_future(self._wave(access_token, after_epoch, page, per_page, concurrency))
+        try:
+            while wave is not None:
+                pages = await wave
+                page += len(pages)
+                complete = any(len(p) < per_page for p in pages)
+                wave = None if complete else asyncio.ensure_future(
+                    self._wave(access_token, after_epoch, page, per_page, concurrency))
+                chunk = [activity for p in pages for activity in p]
+                if chunk:
+                    yield chunk
+        finally:
+            if wave is not None:
+                wave.cancel()
+
+    def iter_activities(self, access_token: str, after_epoch: Optional[int] = None,
+                        per_page: int = MAX_PER_PAGE, concurrency: int = PAGE_CONCURRENCY) -> Iterator[List[dict]]:
+        """Blocking form of walk_activities() for the sync CRUD layer."""
+        walk = self.walk_activities(access_token, after_epoch, per_page, concurrency)
+        try:
+            while True:
+                chunk = self.run(_next_or_none(walk))
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.run(walk.aclose())
+
+
+async def _next_or_none(walk: AsyncIterator):
+    try:
+        return await walk.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+api = StravaAPI()
 
 
 def authorize_url(state: str) -> str:
@@ -46,28 +316,12 @@ def authorize_url(state: str) -> str:
 
 def exchange_code(code: str) -> dict:
     """Trade an authorization code for tokens + the athlete summary."""
-    resp = httpx.post(STRAVA_OAUTH_URL, data={
-        "client_id": Config.STRAVA_CLIENT_ID,
-        "client_secret": Config.STRAVA_CLIENT_SECRET,
-        "code": code,
-        "grant_type": "authorization_code",
-    }, timeout=15)
-    if resp.status_code != 200:
-        raise StravaError(f"Token exchange failed ({resp.status_code}): {resp.text}")
-    return resp.json()
+    return api.run(api.exchange_code(code))
 
 
 def refresh_tokens(refresh_token: str) -> dict:
     """Get a fresh access token from a refresh token."""
-    resp = httpx.post(STRAVA_OAUTH_URL, data={
-        "client_id": Config.STRAVA_CLIENT_ID,
-        "client_secret": Config.STRAVA_CLIENT_SECRET,
-        "refresh_token": refresh_token,
-        "grant_type": "refresh_token",
-    }, timeout=15)
-    if resp.status_code != 200:
-        raise StravaError(f"Token refresh failed ({resp.status_code}): {resp.text}")
-    return resp.json()
+    return api.run(api.refresh_tokens(refresh_token))
 
 
 def needs_refresh(expires_at: int, now: Optional[int] = None) -> bool:
@@ -77,31 +331,24 @@ def needs_refresh(expires_at: int, now: Optional[int] = None) -> bool:
 
 def list_activities(access_token: str, after_epoch: Optional[int] = None,
                     per_page: int = 50, page: int = 1) -> List[dict]:
-    """Athlete's activities, newest first, optionally only those after a time."""
-    params = {"per_page": per_page, "page": page}
-    if after_epoch:
-        params["after"] = after_epoch
-    resp = httpx.get(f"{STRAVA_API_BASE}/athlete/activities",
-                     headers={"Authorization": f"Bearer {access_token}"},
-                     params=params, timeout=20)
-    if resp.status_code != 200:
-        raise StravaError(f"Activity fetch failed ({resp.status_code}): {resp.text}")
-    return resp.json()
+    """One page of the athlete's activities, newest first, optionally only those after a time."""
+    return api.run(api.list_activities(access_token, after_epoch, per_page, page))
+
+
+def iter_activities(access_token: str, after_epoch: Optional[int] = None,
+                    per_page: int = MAX_PER_PAGE, concurrency: int = PAGE_CONCURRENCY) -> Iterator[List[dict]]:
+    """All of the athlete's activities (after a time), in chunks; see StravaAPI.walk_activities."""
+    return api.iter_activities(access_token, after_epoch, per_page, concurrency)
 
 
 def get_activity(access_token: str, activity_id: int) -> dict:
     """A single activity by id (used by the webhook path)."""
-    resp = httpx.get(f"{STRAVA_API_BASE}/activities/{activity_id}",
-                     headers={"Authorization": f"Bearer {access_token}"}, timeout=20)
-    if resp.status_code != 200:
-        raise StravaError(f"Activity {activity_id} fetch failed ({resp.status_code}): {resp.text}")
-    return resp.json()
+    return api.run(api.get_activity(access_token, activity_id))
 
 
 def deauthorize(access_token: str) -> None:
     """Best-effort revoke on Strava's side; failure here is non-fatal to disconnect."""
     try:
-        httpx.post(STRAVA_DEAUTHORIZE_URL,
-                   headers={"Authorization": f"Bearer {access_token}"}, timeout=15)
+        api.run(api.deauthorize(access_token))
     except Exception:
         logger.warning("Strava deauthorize call failed (non-fatal)", exc_info=True)
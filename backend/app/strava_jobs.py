@@ -0,0 +1,233 @@
+"""
+Durable queue for Strava webhook imports.
+
+Strava wants a 2xx within two seconds and redelivers otherwise, so the webhook
+handler only records (athlete_id, activity_id) in strava_import_jobs and acks.
+Workers claim due jobs, fetch the activity and run the normal importer:
+
+  * Claiming is a row lock with SKIP LOCKED plus a conditional UPDATE that sets
+    a lease, so any number of workers (threads here, or scripts/strava_worker.py
+    processes) never run the same job twice. A worker that dies mid-job just
+    lets its lease expire and the job is picked up again, unless it already
+    had MAX_ATTEMPTS claims: then it goes 'dead' (a job that keeps killing its
+    worker must not be re-leased forever). An athlete with a job
+    running has the rest of theirs held back, so a burst of webhooks for one
+    athlete imports in turn rather than racing over the same logs and streaks.
+  * Failures Strava may recover from (429, 5xx, network) go back to 'pending'
+    with exponential backoff; anything else (404, revoked access, a ValueError
+    from the importer) or MAX_ATTEMPTS tries marks the job 'dead' — the
+    dead-letter list, kept with its last error for inspection and requeue().
+  * The importer's own dedup ledger makes a retried job idempotent.
+"""
+import logging
+import random
+import threading
+from contextlib import closing
+from datetime import timedelta
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+
+from .config import Config
+from .models.strava_model import StravaConnection, StravaImportJob
+from .utils.time import utc_now
+from . import strava_client
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, DEAD = "pending", "running", "done", "dead"
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30        # 30s, 1m, 2m, 4m, 8m ... capped below
+BACKOFF_MAX_SECONDS = 3600
+LEASE_SECONDS = 300              # one import is a token refresh + one fetch; far under this
+POLL_SECONDS = 5.0               # idle workers re-check this often (notify() wakes them sooner)
+_ERROR_CHARS = 2000
+
+
+def enqueue(db: Session, athlete_id: int, activity_id: int) -> bool:
+    """Queue an activity for import. False if it was already queued (a redelivered event)."""
+    insert = (postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert)
+    stmt = insert(StravaImportJob).values(
+        athlete_id=athlete_id, activity_id=activity_id, status=PENDING, attempts=0,
+        next_attempt_at=utc_now(), created_at=utc_now(),
+    ).on_conflict_do_nothing(index_elements=["activity_id"])
+    inserted = db.execute(stmt).rowcount
+    db.commit()
+    return bool(inserted)
+
+
+def _lease_expired(now):
+    return and_(StravaImportJob.status == RUNNING, StravaImportJob.locked_until < now)
+
+
+def _due(now):
+    """Pending and due, or running on a lease that expired with attempts left —
+    and no other job of the same athlete holds a live lease, so one athlete's
+    imports never overlap."""
+    job, other = StravaImportJob, aliased(StravaImportJob)
+    athlete_busy = exists().where(other.athlete_id == job.athlete_id, other.status == RUNNING,
+                                  other.locked_until >= now)
+    return and_(or_(and_(job.status == PENDING, job.next_attempt_at <= now),
+                    and_(_lease_expired(now), job.attempts < MAX_ATTEMPTS)),
+                ~athlete_busy)
+
+
+def claim_next(db: Session) -> Optional[StravaImportJob]:
+    """Lease the oldest due job to this worker (attempts counts the claim), or None.
+    Expired leases that used up MAX_ATTEMPTS are settled as dead first."""
+    now = utc_now()
+    exhausted = (db.query(StravaImportJob)
+                 .filter(_lease_expired(now), StravaImportJob.attempts >= MAX_ATTEMPTS)
+                 .update({"status": DEAD, "locked_until": None, "finished_at": now,
+                          "last_error": f"lease expired after {MAX_ATTEMPTS} attempt(s)"},
+                         synchronize_session=False))
+    if exhausted:
+        db.commit()
+        logger.error("Strava jobs: %s dead after their lease expired %s time(s)", exhausted, MAX_ATTEMPTS)
+    job_id = (db.query(StravaImportJob.id).filter(_due(now))
+              .order_by(StravaImportJob.next_attempt_at, StravaImportJob.id)
+              .limit(1).with_for_update(skip_locked=True).scalar())
+    if job_id is None:
+        db.rollback()
+        return None
+    # Conditional on still being due: without row locks (SQLite) two workers can
+    # pick the same id, and only one of them may win it.
+    claimed = (db.query(StravaImportJob)
+               .filter(StravaImportJob.id == job_id, _due(now))
+               .update({"status": RUNNING, "locked_until": now + timedelta(seconds=LEASE_SECONDS),
+                        "attempts": StravaImportJob.attempts + 1}, synchronize_session=False))
+    db.commit()
+    return db.get(StravaImportJob, job_id) if claimed else None
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts`, with jitter so a Strava outage's
+    backlog doesn't come back in one burst."""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.0)
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, strava_client.StravaError):
+        return exc.retryable
+    return not isinstance(exc, ValueError)
+
+
+def _settle(db: Session, job_id: int, **values) -> None:
+    db.query(StravaImportJob).filter(StravaImportJob.id == job_id).update(
+        values, synchronize_session=False)
+    db.commit()
+
+
+def run_job(db: Session, job: StravaImportJob) -> str:
+    """Import a claimed job's activity; returns the status it ends in."""
+    from .crud import strava_crud
+
+    job_id, attempts = job.id, job.attempts
+    conn = (db.query(StravaConnection)
+            .filter(StravaConnection.athlete_id == job.athlete_id).first())
+    try:
+        if conn and conn.target_habit_id:
+            strava_crud.import_one_activity(db, conn, job.activity_id)
+        else:
+            logger.info("Strava job %s: athlete %s has no import target; dropping",
+                        job_id, job.athlete_id)
+    except Exception as exc:
+        db.rollback()
+        error = f"{type(exc).__name__}: {exc}"[:_ERROR_CHARS]
+        if _retryable(exc) and attempts < MAX_ATTEMPTS:
+            logger.warning("Strava job %s failed (attempt %s), retrying: %s", job_id, attempts, error)
+            _settle(db, job_id, status=PENDING, locked_until=None, last_error=error,
+                    next_attempt_at=utc_now() + timedelta(seconds=backoff_seconds(attempts)))
+            return PENDING
+        logger.error("Strava job %s dead after %s attempt(s): %s", job_id, attempts, error)
+        _settle(db, job_id, status=DEAD, locked_until=None, last_error=error, finished_at=utc_now())
+        return DEAD
+    _settle(db, job_id, status=DONE, locked_until=None, finished_at=utc_now())
+    return DONE
+
+
+def work_once(db: Session) -> Optional[str]:
+    """Claim and run one job. None when nothing is due."""
+    job = claim_next(db)
+    return run_job(db, job) if job else None
+
+
+def dead_jobs(db: Session, limit: int = 100) -> List[StravaImportJob]:
+    return (db.query(StravaImportJob).filter(StravaImportJob.status == DEAD)
+            .order_by(StravaImportJob.finished_at.desc(), StravaImportJob.id.desc())
+            .limit(limit).all())
+
+
+def requeue(db: Session, job_ids: Optional[Iterable[int]] = None) -> int:
+    """Put dead jobs (all, or just job_ids) back in the queue with a fresh attempt budget."""
+    query = db.query(StravaImportJob).filter(StravaImportJob.status == DEAD)
+    if job_ids is not None:
+        query = query.filter(StravaImportJob.id.in_(list(job_ids)))
+    count = query.update({"status": PENDING, "attempts": 0, "next_attempt_at": utc_now(),
+                          "finished_at": None}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+class WorkerPool:
+    """
+    Threads draining the queue, each with its own Session. An idle worker sleeps
+    up to poll_seconds, or until notify() (the webhook calls it after enqueueing).
+    """
+
+    def __init__(self, workers: int, poll_seconds: float = POLL_SECONDS,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def start(self) -> None:
+        if self._threads or self.workers < 1:
+            return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._run, name=f"strava-worker-{n}", daemon=True)
+                         for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from .database import SessionLocal
+            return SessionLocal()
+        return self.session_factory()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with closing(self._session()) as db:
+                    outcome = work_once(db)
+            except Exception:
+                logger.exception("Strava worker crashed on a job; its lease will expire")
+                outcome = None
+            if outcome is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+workers = WorkerPool(Config.STRAVA_WORKERS)
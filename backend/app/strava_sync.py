@@ -0,0 +1,158 @@
+"""
+Scheduled Strava sync for every connected athlete.
+
+Webhooks cover new activities as they happen; this catches whatever they
+missed (dropped events, edits, an outage) by running the normal sync_now for
+each connection that hasn't synced in STALE_AFTER_SECONDS. It runs as its own
+process (scripts/strava_sync.py), once or on an interval:
+
+  * Connections are read in keyset pages of `batch_size` ids, never all at
+    once, and only the stale ones with an import target; a connection that
+    failed waits out its backoff (next_sync_at).
+  * Each page is synced by `concurrency` threads, each with its own Session,
+    over the shared pooled client. Every request comes out of
+    strava_client.api.budget, which tracks Strava's app-wide usage from its
+    response headers; a connection only starts with MIN_HEADROOM requests to
+    spare, and the run ends once the budget is spent. What's left is still
+    stale next run.
+  * Each sync is incremental from the connection's sync_cursor.
+  * The outcome of every attempt (status, error, duration, activities
+    imported) is written on the connection row; run_once returns the run's
+    totals.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from .models.strava_model import StravaConnection
+from .models.user_model import User
+from .utils.time import utc_now
+from . import strava_client
+
+logger = logging.getLogger(__name__)
+
+OK, ERROR, RATE_LIMITED = "ok", "error", "rate_limited"   # recorded on the connection
+DEFERRED, GONE = "deferred", "gone"                       # run outcomes only: no budget / deleted
+
+STALE_AFTER_SECONDS = 6 * 3600
+BATCH_SIZE = 200
+CONCURRENCY = 4
+MIN_HEADROOM = strava_client.PAGE_CONCURRENCY + 1   # a token refresh plus one wave of pages
+FAILURE_BACKOFF_SECONDS = 900    # 15m, 30m, 1h ... capped below
+FAILURE_BACKOFF_MAX_SECONDS = 86400
+_ERROR_CHARS = 2000
+
+
+def stale_connection_ids(db: Session, now, after_id: int = 0, limit: int = BATCH_SIZE,
+                         stale_after: int = STALE_AFTER_SECONDS) -> List[int]:
+    """The next `limit` ids above after_id that are due a sync."""
+    conn = StravaConnection
+    rows = (db.query(conn.id)
+            .filter(conn.id > after_id, conn.target_habit_id.isnot(None),
+                    or_(conn.last_synced_at.is_(None),
+                        conn.last_synced_at < now - timedelta(seconds=stale_after)),
+                    or_(conn.next_sync_at.is_(None), conn.next_sync_at <= now))
+            .order_by(conn.id).limit(limit).all())
+    return [row.id for row in rows]
+
+
+def failure_backoff_seconds(failures: int) -> int:
+    return min(FAILURE_BACKOFF_MAX_SECONDS, FAILURE_BACKOFF_SECONDS * 2 ** (failures - 1))
+
+
+def _record(db: Session, connection_id: int, **values) -> None:
+    db.query(StravaConnection).filter(StravaConnection.id == connection_id).update(
+        values, synchronize_session=False)
+    db.commit()
+
+
+def sync_connection(db: Session, connection_id: int) -> dict:
+    """Sync one connection and record how it went; returns {"status", "imported"}."""
+    from .crud import strava_crud
+
+    conn = db.get(StravaConnection, connection_id)
+    user = db.get(User, conn.user_id) if conn else None
+    if user is None:
+        return {"status": GONE, "imported": 0}
+    failures = conn.sync_failures or 0
+    started, began = utc_now(), time.perf_counter()
+    try:
+        result = strava_crud.sync_now(db, user)
+    except Exception as exc:
+        db.rollback()
+        elapsed_ms = int((time.perf_counter() - began) * 1000)
+        error = f"{type(exc).__name__}: {exc}"[:_ERROR_CHARS]
+        if isinstance(exc, strava_client.StravaError) and exc.status_code == 429:
+            # Not the connection's fault: retry once the window resets.
+            wait = strava_client.api.budget.seconds_until_reset()
+            _record(db, connection_id, last_sync_attempt_at=started, last_sync_status=RATE_LIMITED,
+                    last_sync_error=error, last_sync_duration_ms=elapsed_ms, last_sync_imported=None,
+                    next_sync_at=utc_now() + timedelta(seconds=wait))
+            return {"status": RATE_LIMITED, "imported": 0}
+        if not isinstance(exc, (strava_client.StravaError, ValueError)):
+            logger.exception("Strava sync of connection %s crashed", connection_id)
+        else:
+            logger.warning("Strava sync of connection %s failed: %s", connection_id, error)
+        failures += 1
+        _record(db, connection_id, last_sync_attempt_at=started, last_sync_status=ERROR,
+                last_sync_error=error, last_sync_duration_ms=elapsed_ms, last_sync_imported=None,
+                sync_failures=failures,
+                next_sync_at=utc_now() + timedelta(seconds=failure_backoff_seconds(failures)))
+        return {"status": ERROR, "imported": 0}
+    _record(db, connection_id, last_sync_attempt_at=started, last_sync_status=OK,
+            last_sync_error=None, last_sync_duration_ms=int((time.perf_counter() - began) * 1000),
+            last_sync_imported=result["imported"], sync_failures=0, next_sync_at=None)
+    return {"status": OK, "imported": result["imported"]}
+
+
+class SyncRunner:
+    """One pass over every stale connection per run_once(); see the module docstring."""
+
+    def __init__(self, concurrency: int = CONCURRENCY, batch_size: int = BATCH_SIZE,
+                 stale_after: int = STALE_AFTER_SECONDS,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.stale_after = stale_after
+        self.session_factory = session_factory
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from .database import SessionLocal
+            return SessionLocal()
+        return self.session_factory()
+
+    def _sync_one(self, connection_id: int) -> dict:
+        if strava_client.api.budget.headroom() < MIN_HEADROOM:
+            return {"status": DEFERRED, "imported": 0}
+        with closing(self._session()) as db:
+            return sync_connection(db, connection_id)
+
+    def run_once(self) -> dict:
+        """Sync every connection that's due, until done or out of rate budget."""
+        began = time.perf_counter()
+        totals = {"connections": 0, OK: 0, ERROR: 0, RATE_LIMITED: 0, DEFERRED: 0, GONE: 0,
+                  "imported": 0, "budget_spent": False}
+        now, last_id = utc_now(), 0
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="strava-sync") as pool:
+            while not totals["budget_spent"]:
+                with closing(self._session()) as db:
+                    ids = stale_connection_ids(db, now, last_id, self.batch_size, self.stale_after)
+                if not ids:
+                    break
+                last_id = ids[-1]
+                for outcome in pool.map(self._sync_one, ids):
+                    totals["connections"] += 1
+                    totals[outcome["status"]] += 1
+                    totals["imported"] += outcome["imported"]
+                totals["budget_spent"] = (bool(totals[DEFERRED] or totals[RATE_LIMITED])
+                                          or strava_client.api.budget.headroom() < MIN_HEADROOM)
+        totals["seconds"] = round(time.perf_counter() - began, 1)
+        logger.info("Strava sync run: %s", totals)
+        return totals
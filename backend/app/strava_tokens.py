@@ -0,0 +1,112 @@
+"""
+Strava access tokens for a connection: served from memory while valid, and
+refreshed at most once per expiry window however many syncs and webhook
+imports ask at the same moment.
+
+  * Cache: connection id -> access token, kept until expires_at minus
+    TOKEN_EXPIRY_BUFFER_SECONDS (the point strava_client.needs_refresh says to
+    refresh). Bounded LRU, like the other per-process caches.
+  * In-process single-flight: callers for one connection queue on a lock
+    stripe; whoever gets it first refreshes, the rest find the cache filled.
+  * Across processes (API workers, strava_worker.py, the sync runner): the
+    refresh happens under SELECT ... FOR UPDATE on the connection row, and the
+    row is re-read once the lock is held. A process that waited on another's
+    refresh sees the committed token and doesn't call Strava again, so the
+    refresh token it holds is never spent twice.
+
+Paths that replace or drop a connection's tokens call forget().
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from .models.strava_model import StravaConnection
+from . import strava_client
+
+TOKEN_CACHE_MAX_ENTRIES = 4096
+_LOCK_STRIPES = 64
+
+
+class _Entry(NamedTuple):
+    access_token: str
+    usable_until: float
+
+
+_entries: "OrderedDict[int, _Entry]" = OrderedDict()
+_lock = threading.Lock()
+_flights = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+_counters = {"hits": 0, "misses": 0, "refreshes": 0, "evictions": 0}
+
+
+def cached(connection_id: int) -> Optional[str]:
+    with _lock:
+        entry = _entries.get(connection_id)
+        if entry is None or entry.usable_until <= time.time():
+            _counters["misses"] += 1
+            if entry is not None:
+                del _entries[connection_id]
+            return None
+        _entries.move_to_end(connection_id)
+        _counters["hits"] += 1
+        return entry.access_token
+
+
+def store(connection_id: int, access_token: str, expires_at: int) -> None:
+    usable_until = expires_at - strava_client.TOKEN_EXPIRY_BUFFER_SECONDS
+    with _lock:
+        _entries[connection_id] = _Entry(access_token, usable_until)
+        _entries.move_to_end(connection_id)
+        while len(_entries) > TOKEN_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _counters["evictions"] += 1
+
+
+def forget(connection_id: int) -> None:
+    with _lock:
+        _entries.pop(connection_id, None)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        for key in _counters:
+            _counters[key] = 0
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_counters, "entries": len(_entries)}
+
+
+def access_token(db: Session, conn: StravaConnection) -> str:
+    """A valid access token for conn, refreshing (and persisting) it if it's near expiry."""
+    connection_id = conn.id
+    token = cached(connection_id)
+    if token is not None:
+        return token
+    with _flights[connection_id % _LOCK_STRIPES]:
+        token = cached(connection_id)
+        if token is not None:
+            return token
+        row = (db.query(StravaConnection).filter(StravaConnection.id == connection_id)
+               .with_for_update().populate_existing().one())
+        if not strava_client.needs_refresh(row.expires_at):
+            token, expires_at = row.access_token, row.expires_at
+            db.commit()
+        else:
+            try:
+                refreshed = strava_client.refresh_tokens(row.refresh_token)
+            except Exception:
+                db.rollback()
+                raise
+            row.access_token = token = refreshed["access_token"]
+            row.refresh_token = refreshed["refresh_token"]
+            row.expires_at = expires_at = refreshed["expires_at"]
+            db.commit()
+            with _lock:
+                _counters["refreshes"] += 1
+        store(connection_id, token, expires_at)
+        return token
@@ -0,0 +1,259 @@
+"""
+Strength analytics over a user's logged sets, as NumPy column passes.
+
+A user's sets are read with one lean SELECT (no ORM objects) into parallel
+arrays, one element per set. Every derived figure is then a sort plus a
+grouped reduction over those arrays instead of a Python loop per set:
+
+- daily_points: per (exercise, day) the top set, Epley e1RM, rep volume and
+  weight / e1RM PR flags against every earlier day. These are the
+  strength_progression rows; rebuild_strength_progression writes them.
+- weekly_trends: total tonnage per Monday-based week, its rolling 4-week
+  sum, and tonnage per muscle group per week (the trends endpoint).
+
+The numbers match the incremental path in workout_crud (_strength_point /
+_merge_points / _with_priors), which folds in one session at a time.
+"""
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import workout_model
+
+E1RM_REP_CAP = 12
+ROLLING_WEEKS = 4
+UNKNOWN_MUSCLE_GROUP = -1
+
+_DAY = "datetime64[D]"
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class SetColumns(NamedTuple):
+    """One element per performed set with weight and reps both > 0."""
+    exercise_id: np.ndarray       # int64
+    entry_id: np.ndarray          # session_exercise_id, int64
+    day: np.ndarray               # datetime64[D], the session's date
+    weight: np.ndarray            # float64
+    reps: np.ndarray              # int64
+    muscle_group_id: np.ndarray   # int64, UNKNOWN_MUSCLE_GROUP if the exercise is gone
+
+
+class DailyPoints(NamedTuple):
+    """One element per (exercise, day), sorted by exercise then day."""
+    exercise_id: np.ndarray
+    day: np.ndarray
+    top_weight: np.ndarray
+    top_reps: np.ndarray
+    e1rm: np.ndarray
+    volume: np.ndarray
+    prior_best_weight: np.ndarray   # NaN on an exercise's first day
+    prior_best_e1rm: np.ndarray
+    pr_weight: np.ndarray           # bool
+    pr_e1rm: np.ndarray
+
+
+def e1rm(weight, reps):
+    """Epley, rep factor capped at E1RM_REP_CAP where the estimate stays honest."""
+    return weight * (1 + np.minimum(reps, E1RM_REP_CAP) / 30)
+
+
+def round_e1rm(values):
+    """e1RM as stored and compared: one decimal."""
+    return np.round(values, 1)
+
+
+def volume_hundredths(weight, reps):
+    """A set's weight x reps in whole hundredths. Volumes add up as integers, so
+    a total doesn't depend on the order (or pairwise grouping) of the addition."""
+    return np.rint(weight * reps * 100).astype(np.int64)
+
+
+# --- loading -----------------------------------------------------------------
+
+def load_sets(db: Session, user_id: int, exercise_ids: Optional[Iterable[int]] = None,
+              since: Optional[date] = None) -> SetColumns:
+    ws = workout_model.WorkoutSession
+    se = workout_model.SessionExercise
+    wset = workout_model.WorkoutSet
+    stmt = (
+        select(se.exercise_id, se.session_exercise_id, ws.session_date,
+               wset.performed_weight, wset.performed_reps, workout_model.Exercise.muscle_group_id)
+        .join(ws, se.session_id == ws.session_id)
+        .join(wset, wset.session_exercise_id == se.session_exercise_id)
+        .outerjoin(workout_model.Exercise, workout_model.Exercise.exercise_id == se.exercise_id)
+        .where(ws.user_id == user_id, wset.performed_weight > 0, wset.performed_reps > 0)
+    )
+    if exercise_ids is not None:
+        stmt = stmt.where(se.exercise_id.in_(list(exercise_ids)))
+    if since is not None:
+        stmt = stmt.where(ws.session_date >= datetime.combine(since, datetime.min.time()))
+    return columns_from_rows(db.execute(stmt).all())
+
+
+def columns_from_rows(rows) -> SetColumns:
+    """(exercise_id, entry_id, session_date, weight, reps, muscle_group_id) tuples -> SetColumns."""
+    n = len(rows)
+    if not n:
+        empty = np.empty(0, dtype=np.int64)
+        return SetColumns(empty, empty, np.empty(0, dtype=_DAY), np.empty(0), empty, empty)
+    exercise_id, entry_id, session_date, weight, reps, muscle_group_id = zip(*rows)
+    # Day ordinals convert an order of magnitude faster than datetime objects do.
+    ordinals = np.fromiter((d.toordinal() for d in session_date), dtype=np.int64, count=n)
+    return SetColumns(
+        exercise_id=np.fromiter(exercise_id, dtype=np.int64, count=n),
+        entry_id=np.fromiter(entry_id, dtype=np.int64, count=n),
+        day=(ordinals - _EPOCH_ORDINAL).astype(_DAY),
+        weight=np.fromiter(weight, dtype=np.float64, count=n),
+        reps=np.fromiter(reps, dtype=np.int64, count=n),
+        muscle_group_id=np.fromiter((UNKNOWN_MUSCLE_GROUP if m is None else m for m in muscle_group_id),
+                                    dtype=np.int64, count=n),
+    )
+
+
+# --- per-day points ------------------------------------------------------------
+
+def _group_starts(*keys: np.ndarray) -> np.ndarray:
+    """Start index of each run of equal keys in arrays already sorted by them."""
+    n = len(keys[0])
+    changed = np.zeros(n, dtype=bool)
+    changed[:1] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(changed)
+
+
+def _prior_best(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Max of the earlier elements of each element's group (NaN for a group's
+    first). Groups are laid out as rows of a -inf padded grid so one
+    maximum.accumulate covers all of them without offsets that lose precision."""
+    n = len(values)
+    prior = np.full(n, np.nan)
+    if n == 0:
+        return prior
+    lengths = np.diff(np.append(starts, n))
+    rows = np.repeat(np.arange(len(starts)), lengths)
+    cols = np.arange(n) - np.repeat(starts, lengths)
+    grid = np.full((len(starts), lengths.max()), -np.inf)
+    grid[rows, cols] = values
+    running = np.maximum.accumulate(grid, axis=1)
+    later = cols > 0
+    prior[later] = running[rows[later], cols[later] - 1]
+    return prior
+
+
+def daily_points(sets: SetColumns) -> DailyPoints:
+    """
+    Per (exercise, day): each session entry's top set is its heaviest (then
+    most reps) set, its e1RM the best of its sets; when an exercise was done
+    more than once on a day, the entry with the best (e1RM, weight, reps)
+    gives the day's numbers and the volumes add up. A PR beats every earlier
+    day of that exercise; the first day is a baseline, not a PR.
+    """
+    # Entries: sort sets by (entry, weight, reps) so each entry's last set is its top set.
+    order = np.lexsort((sets.reps, sets.weight, sets.entry_id))
+    entry = sets.entry_id[order]
+    weight, reps = sets.weight[order], sets.reps[order]
+    starts = _group_starts(entry)
+    if len(starts) == 0:
+        empty = np.empty(0)
+        return DailyPoints(np.empty(0, dtype=np.int64), np.empty(0, dtype=_DAY), empty,
+                           np.empty(0, dtype=np.int64), empty, empty, empty, empty,
+                           np.empty(0, dtype=bool), np.empty(0, dtype=bool))
+    ends = np.append(starts[1:], len(entry)) - 1
+    entry_exercise = sets.exercise_id[order][starts]
+    entry_day = sets.day[order][starts]
+    entry_weight, entry_reps = weight[ends], reps[ends]
+    entry_e1rm = round_e1rm(np.maximum.reduceat(e1rm(weight, reps), starts))
+    entry_volume = np.rint(np.add.reduceat(volume_hundredths(weight, reps), starts) / 100)
+
+    # Days: the best entry of each (exercise, day) sorts last.
+    order = np.lexsort((entry_reps, entry_weight, entry_e1rm, entry_day, entry_exercise))
+    exercise, day = entry_exercise[order], entry_day[order]
+    starts = _group_starts(exercise, day)
+    ends = np.append(starts[1:], len(exercise)) - 1
+    points_exercise, points_day = exercise[ends], day[ends]
+    top_weight, top_reps, best_e1rm = entry_weight[order][ends], entry_reps[order][ends], entry_e1rm[order][ends]
+    volume = np.add.reduceat(entry_volume[order], starts)
+
+    exercise_starts = _group_starts(points_exercise)
+    prior_weight = _prior_best(top_weight, exercise_starts)
+    prior_e1rm = _prior_best(best_e1rm, exercise_starts)
+    with np.errstate(invalid="ignore"):
+        pr_weight = top_weight > prior_weight
+        pr_e1rm = best_e1rm > prior_e1rm
+    return DailyPoints(points_exercise, points_day, top_weight, top_reps, best_e1rm, volume,
+                       prior_weight, prior_e1rm, pr_weight, pr_e1rm)
+
+
+def progression_rows(user_id: int, points: DailyPoints) -> List[dict]:
+    """DailyPoints as strength_progression insert rows (plain Python values)."""
+    def optional(values):
+        return [None if np.isnan(v) else v for v in values.tolist()]
+
+    return [
+        {"user_id": user_id, "exercise_id": exercise_id, "session_date": day, "top_weight": top_weight,
+         "top_reps": top_reps, "e1rm": best_e1rm, "volume": volume, "prior_best_weight": prior_weight,
+         "prior_best_e1rm": prior_e1rm, "pr_weight": pr_weight, "pr_e1rm": pr_e1rm}
+        for exercise_id, day, top_weight, top_reps, best_e1rm, volume, prior_weight, prior_e1rm, pr_weight, pr_e1rm
+        in zip(points.exercise_id.tolist(), points.day.tolist(), points.top_weight.tolist(),
+               points.top_reps.tolist(), points.e1rm.tolist(), points.volume.tolist(),
+               optional(points.prior_best_weight), optional(points.prior_best_e1rm),
+               points.pr_weight.tolist(), points.pr_e1rm.tolist())
+    ]
+
+
+# --- weekly trends -------------------------------------------------------------
+
+def week_index(days: np.ndarray) -> np.ndarray:
+    """Monday-based week number (the epoch, 1970-01-01, was a Thursday)."""
+    return (days.astype(np.int64) + 3) // 7
+
+
+def week_start(index: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=int(index) * 7 - 3)
+
+
+def trends_since(first_week: date) -> date:
+    """Earliest set date weekly_trends(first_week=...) looks at: the Monday
+    ROLLING_WEEKS - 1 weeks before first_week's, for the rolling sum."""
+    return first_week - timedelta(days=first_week.weekday(), weeks=ROLLING_WEEKS - 1)
+
+
+def weekly_trends(sets: SetColumns, first_week: date, last_week: date) -> dict:
+    """
+    Tonnage (weight x reps) per week from first_week's Monday through
+    last_week's, with the rolling ROLLING_WEEKS sum (which also counts sets
+    from the weeks just before the window), and per muscle group per week.
+    Returns { week_starts, volume, rolling_volume, muscle_groups: {id: [..]} }.
+    """
+    w0 = int(week_index(np.array([first_week], dtype=_DAY))[0])
+    w1 = int(week_index(np.array([last_week], dtype=_DAY))[0])
+    if w1 < w0:
+        raise ValueError("last_week is before first_week")
+    lead = ROLLING_WEEKS - 1
+    n_weeks = w1 - w0 + 1
+
+    weeks = week_index(sets.day) - (w0 - lead)
+    keep = (weeks >= 0) & (weeks < n_weeks + lead)
+    weeks = weeks[keep]
+    tonnage = (sets.weight * sets.reps)[keep]
+
+    volume = np.bincount(weeks, weights=tonnage, minlength=n_weeks + lead)
+    cumulative = np.concatenate(([0.0], np.cumsum(volume)))
+    rolling = cumulative[ROLLING_WEEKS:] - cumulative[:-ROLLING_WEEKS]
+
+    in_window = weeks >= lead
+    groups, group_index = np.unique(sets.muscle_group_id[keep][in_window], return_inverse=True)
+    by_group = np.bincount(group_index * n_weeks + (weeks[in_window] - lead),
+                           weights=tonnage[in_window], minlength=len(groups) * n_weeks)
+    by_group = by_group.reshape(len(groups), n_weeks)
+
+    return {
+        "week_starts": [week_start(w) for w in range(w0, w1 + 1)],
+        "volume": np.rint(volume[lead:]).astype(np.int64).tolist(),
+        "rolling_volume": np.rint(rolling).astype(np.int64).tolist(),
+        "muscle_groups": {int(g): np.rint(row).astype(np.int64).tolist() for g, row in zip(groups, by_group)},
+    }
@@ -1,7 +1,13 @@
-from datetime import datetime, timezone, date, timedelta
+from datetime import datetime, timezone, date, timedelta, tzinfo
+from functools import lru_cache
+import time
 import pytz
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from ..models.user_model import User
 
 def utc_now():
     """Return the current UTC datetime."""
@@ -11,14 +17,17 @@ def utc_today():
     """Return the current UTC date."""
     return datetime.now(timezone.utc).date()
 
-def get_user_date(user_timezone: str = 'UTC') -> date:
-    """Get current date in user's timezone. Ensures operations use user's calendar day, not UTC."""
+@lru_cache(maxsize=None)
+def get_tzinfo(user_timezone: Optional[str]) -> tzinfo:
+    """pytz zone for a name, built once per name. Unknown names fall back to UTC."""
     try:
-        tz = pytz.timezone(user_timezone)
-        return datetime.now(tz).date()
+        return pytz.timezone(user_timezone or 'UTC')
     except Exception:
-        # Fallback to UTC timezone
-        return datetime.now(pytz.UTC).date()
+        return pytz.UTC
+
+def get_user_date(user_timezone: str = 'UTC') -> date:
+    """Get current date in user's timezone. Ensures operations use user's calendar day, not UTC."""
+    return datetime.now(get_tzinfo(user_timezone)).date()
 
 def get_user_timezone_from_db(db: Session, user_id: int) -> str:
     """Get user's timezone from database, defaulting to 'UTC'."""
@@ -26,19 +35,49 @@ def get_user_timezone_from_db(db: Session, user_id: int) -> str:
     user = db.query(User).filter(User.id == user_id).first()
     return user.timezone if user and user.timezone else 'UTC'
 
-def get_user_today(db: Session, user_id: int) -> date:
-    """Get today's date in user's timezone."""
-    user_timezone = get_user_timezone_from_db(db, user_id)
-    return get_user_date(user_timezone)
+# user_id -> (timezone, expiry) for callers that only hold an id. Writes to
+# users.timezone call forget_user_timezone(); the TTL bounds staleness in the
+# other worker processes, which don't see that call.
+USER_TIMEZONE_TTL_SECONDS = 300
+USER_TIMEZONE_CACHE_MAX = 10000
+_user_timezones: Dict[int, Tuple[str, float]] = {}
+
+def forget_user_timezone(user_id: int) -> None:
+    """Drop a cached timezone. Call after changing or deleting a user."""
+    _user_timezones.pop(user_id, None)
 
-def get_user_yesterday(db: Session, user_id: int) -> date:
+def get_user_timezone(db: Session, user) -> str:
+    """
+    User's timezone name without a query where possible. Pass the loaded User
+    when you have it (its column value is used as-is, unless the instance is
+    expired); a bare user_id goes through the TTL cache, then the database.
+    """
+    if not isinstance(user, int):
+        loaded = inspect(user).dict
+        if "timezone" in loaded:
+            return loaded["timezone"] or 'UTC'
+        user = user.id
+    cached = _user_timezones.get(user)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    user_timezone = get_user_timezone_from_db(db, user)
+    if len(_user_timezones) >= USER_TIMEZONE_CACHE_MAX:
+        _user_timezones.pop(next(iter(_user_timezones)), None)
+    _user_timezones[user] = (user_timezone, time.monotonic() + USER_TIMEZONE_TTL_SECONDS)
+    return user_timezone
+
+def get_user_today(db: Session, user: Union[int, "User"]) -> date:
+    """Get today's date in user's timezone. Accepts a user_id or a loaded User."""
+    return get_user_date(get_user_timezone(db, user))
+
+def get_user_yesterday(db: Session, user: Union[int, "User"]) -> date:
     """Get yesterday's date in user's timezone. Used for historical activity logging."""
-    user_today = get_user_today(db, user_id)
+    user_today = get_user_today(db, user)
     return user_today - timedelta(days=1)
 
 def validate_activity_date(
     db: Session,
-    user_id: int,
+    user_id: Union[int, "User"],
     activity_date: Optional[date],
     is_admin: bool = False
 ) -> tuple[bool, str, date]:
@@ -77,7 +116,7 @@ def validate_activity_date(
         return (True, "", activity_date)
 
     # For regular users, check if previous day logging is enabled
-    user_yesterday = get_user_yesterday(db, user_id)
+    user_yesterday = user_today - timedelta(days=1)
 
     if activity_date == user_yesterday:
         # Check if feature flag allows previous day logging
@@ -12,6 +12,11 @@ Design goals: legible, capped, consistency-weighted. No punishment
 mechanics — a broken streak is the loss.
 """
 import math
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, List
+
+import numpy as np
 
 # ---------------------------------------------------------------------------
 # Tuning constants (the "numbers pass" lives here, in one place)
@@ -155,19 +160,25 @@ def xp_required_for_level(level: int) -> int:
     return round(PLAYER_LEVEL_BASE_XP * (level ** PLAYER_LEVEL_EXPONENT))
 
 
+# The curve is fixed at import, so it's tabulated once: _LEVEL_COST[n] is
+# xp_required_for_level(n) and _LEVEL_FLOOR[n - 1] the total XP at which level
+# n starts. Resolving a total is then a bisect instead of a walk up the levels.
+_LEVEL_COST = (0,) + tuple(xp_required_for_level(n) for n in range(1, PLAYER_LEVEL_MAX + 1))
+_LEVEL_FLOOR = tuple(accumulate(_LEVEL_COST[1:PLAYER_LEVEL_MAX], initial=0))
+_LEVEL_COST_ARRAY = np.array(_LEVEL_COST, dtype=np.int64)
+_LEVEL_FLOOR_ARRAY = np.array(_LEVEL_FLOOR, dtype=np.int64)
+
+
 def player_level_from_xp(total_xp: int) -> dict:
     """
     Resolve total player XP into level + progress. By construction
     xp_to_next is always positive and xp_into_level is always >= 0.
     """
     total_xp = max(0, int(total_xp or 0))
-    level = 1
-    remaining = total_xp
-    while level < PLAYER_LEVEL_MAX and remaining >= xp_required_for_level(level):
-        remaining -= xp_required_for_level(level)
-        level += 1
+    level = bisect_right(_LEVEL_FLOOR, total_xp)
+    remaining = total_xp - _LEVEL_FLOOR[level - 1]
 
-    required = xp_required_for_level(level)
+    required = _LEVEL_COST[level]
     return {
         "level": level,
         "total_xp": total_xp,
@@ -177,6 +188,25 @@ def player_level_from_xp(total_xp: int) -> dict:
     }
 
 
+def player_levels_from_xp(totals: Iterable[int]) -> List[dict]:
+    """
+    player_level_from_xp for many totals, in input order: one searchsorted
+    over the level table and array arithmetic for the progress fields,
+    instead of a bisect per total.
+    """
+    xp = np.maximum(0, np.fromiter((int(total or 0) for total in totals), dtype=np.int64))
+    levels = np.searchsorted(_LEVEL_FLOOR_ARRAY, xp, side="right")
+    remaining = xp - _LEVEL_FLOOR_ARRAY[levels - 1]
+    required = _LEVEL_COST_ARRAY[levels]
+    to_next = np.maximum(1, required - remaining)
+    progress = np.minimum(1.0, remaining / np.maximum(required, 1))
+    return [
+        {"level": level, "total_xp": total, "xp_into_level": into, "xp_to_next": nxt, "level_progress": frac}
+        for level, total, into, nxt, frac in zip(levels.tolist(), xp.tolist(), remaining.tolist(),
+                                                 to_next.tolist(), progress.tolist())
+    ]
+
+
 # ---------------------------------------------------------------------------
 # Habit slots (focus over hoarding)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Infer and store day_id for workout sessions logged before it was tracked, so
+the logger's next-day suggestion can read it directly. Migration d9e0f1a2b3c4
+runs this on upgrade; use the script after an offline (--sql) upgrade, or to
+re-run it by hand. Commits per batch and
+prints the last session id after each one; if a run is interrupted, pass that
+id to --resume-from. Safe to re-run: only sessions whose day_id is NULL are
+touched, and ones that match no program day stay NULL.
+
+    python scripts/backfill_session_days.py
+    python scripts/backfill_session_days.py --batch-size 2000 --resume-from 81500
+"""
+import argparse
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.crud import workout_crud
+
+
+def _report(totals):
+    print(f"  scanned {totals['scanned']}, set {totals['updated']} "
+          f"(through session {totals['last_session_id']})", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=workout_crud.SESSION_DAY_BACKFILL_BATCH,
+                        help="sessions per transaction")
+    parser.add_argument("--resume-from", type=int, default=0,
+                        help="skip sessions up to and including this id (from a previous run's output)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        totals = workout_crud.backfill_session_days(
+            db, batch_size=args.batch_size, after_session_id=args.resume_from, progress=_report,
+        )
+    finally:
+        db.close()
+
+    print(f"{totals['updated']} of {totals['scanned']} legacy session(s) assigned a day")
+
+
+if __name__ == "__main__":
+    main()
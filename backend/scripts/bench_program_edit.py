@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark the workout-program editor: create, edit and delete one program of
+--days days holding --exercises exercises in total, --rounds times. Reports
+statements sent and wall time per operation; --db-latency-ms adds a sleep per
+statement to stand in for the round trip to Postgres, which is where a
+per-row editor pays.
+
+Runs workout_crud directly against a throwaway SQLite file.
+
+    python scripts/bench_program_edit.py
+    python scripts/bench_program_edit.py --days 7 --exercises 50 --rounds 20 --db-latency-ms 1
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app.crud import workout_crud
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.models.user_model import User
+from app.models.workout_model import Exercise
+from app.schemas import workout_schema
+
+
+def _seed(exercises: int):
+    db = SessionLocal()
+    try:
+        user = User(username="bench", email="bench@example.com", timezone="UTC", player_xp=0)
+        db.add(user)
+        db.add_all(Exercise(name=f"Lift {n}", category_id=1, muscle_group_id=1, equipment_id=1,
+                            difficulty_level_id=1, exercise_type_id=1) for n in range(exercises))
+        db.commit()
+        return user.id, [e.exercise_id for e in db.query(Exercise.exercise_id).order_by(Exercise.exercise_id)]
+    finally:
+        db.close()
+
+
+def _days(exercise_ids, days, shift=0, day_ids=None):
+    """exercise_ids dealt round-robin over `days` days (rotated by `shift`)."""
+    rotated = exercise_ids[shift:] + exercise_ids[:shift]
+    return [
+        dict(day_name=f"Day {d + 1}", **({"day_id": day_ids[d]} if day_ids and d < len(day_ids) else {}),
+             exercises=[workout_schema.ProgramExerciseCreate(exercise_id=e, sets=3, recommended_reps=8)
+                        for e in rotated[d::days]])
+        for d in range(days)
+    ]
+
+
+def run(args):
+    Base.metadata.create_all(bind=engine)
+    user_id, exercise_ids = _seed(args.exercises)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(1))
+    if args.db_latency_ms:
+        delay = args.db_latency_ms / 1000
+        event.listen(engine, "before_cursor_execute", lambda *a: time.sleep(delay))
+
+    timings = {}
+
+    def timed(name, fn):
+        db = SessionLocal()
+        try:
+            statements.clear()
+            start = time.perf_counter()
+            result = fn(db)
+            timings.setdefault(name, []).append((time.perf_counter() - start, len(statements)))
+            return result
+        finally:
+            db.close()
+
+    for r in range(args.rounds):
+        program_id = timed("create", lambda db: workout_crud.create_workout_program(
+            db, user_id, workout_schema.WorkoutProgramCreate(
+                name=f"Program {r}",
+                workout_days=[workout_schema.WorkoutDayCreate(**d) for d in _days(exercise_ids, args.days)],
+            )).program_id)
+        day_ids = timed("read days", lambda db: [d.day_id for d in workout_crud.get_workout_program_by_id(
+            db, program_id).workout_days])
+        # Typical edit: keep every day but the last, reshuffle every day's exercises, add a new day.
+        edited = _days(exercise_ids, args.days, shift=1, day_ids=day_ids[:-1])
+        timed("update", lambda db: workout_crud.update_workout_program(
+            db, program_id, workout_schema.WorkoutProgramUpdate(
+                workout_days=[workout_schema.WorkoutDayUpdate(**d) for d in edited])).program_id)
+        timed("delete", lambda db: workout_crud.delete_workout_program(db, program_id))
+    timings.pop("read days")
+
+    print(f"{args.days} days x {args.exercises} exercises, {args.rounds} rounds, "
+          f"{args.db_latency_ms}ms/statement")
+    for name, samples in timings.items():
+        times = [t for t, _ in samples]
+        print(f"  {name:<7} statements={samples[-1][1]:<4} p50={statistics.median(times) * 1000:7.1f}ms "
+              f"max={max(times) * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7, help="days in the program")
+    parser.add_argument("--exercises", type=int, default=50, help="exercises across all days")
+    parser.add_argument("--rounds", type=int, default=10, help="create/edit/delete cycles")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="simulated round trip per SQL statement")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the habit read/write loop: concurrent users polling /today
+while logging and un-logging habits. Reports per-endpoint p50/p99 latency and
+the worst event-loop stall seen by a 10ms ticker running alongside, which is
+what a sync DB call inside an async handler shows up as.
+
+Runs the real habit_router in-process (httpx ASGI transport) against a
+throwaway SQLite file; --db-latency-ms adds a sleep per statement to stand in
+for the network round trip to Postgres. SQLite allows one writer, so GETs read
+concurrently under WAL and write requests queue on an asyncio lock at the app
+edge (queueing inside SQLite would park worker threads on the file lock).
+
+    python scripts/bench_request_latency.py
+    python scripts/bench_request_latency.py --users 32 --rounds 20 --db-latency-ms 5
+    python scripts/bench_request_latency.py --no-response-cache
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from anyio import to_thread
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.auth.auth_utils import generate_tokens
+from app.config import Config
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.models.habit_model import Bucket, Habit
+from app.models.user_model import User
+from app.response_cache import responses
+from app.routers import habit_router
+
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _):
+    dbapi_conn.execute("PRAGMA journal_mode=WAL")
+    dbapi_conn.execute("PRAGMA busy_timeout=30000")
+
+
+def _seed(users: int, habits_per_user: int):
+    db = SessionLocal()
+    try:
+        bucket = Bucket(key="mindfulness", name="Mindfulness", attribute="Mindfulness",
+                        detail_kind="none", base_xp=10, icon="🧘", is_active=True)
+        db.add(bucket)
+        db.flush()
+        seeded = []
+        for n in range(users):
+            user = User(username=f"bench{n}", email=f"bench{n}@example.com", timezone="UTC", player_xp=0)
+            db.add(user)
+            db.flush()
+            habits = [Habit(user_id=user.id, bucket_id=bucket.id, name=f"Habit {h}", icon="🧘",
+                            habit_type="standard", cadence_type="daily", status="active")
+                      for h in range(habits_per_user)]
+            db.add_all(habits)
+            db.flush()
+            token, _ = generate_tokens(user)
+            seeded.append(({"Authorization": f"Bearer {token}"}, [h.id for h in habits]))
+        db.commit()
+        return seeded
+    finally:
+        db.close()
+
+
+async def _user_loop(client, headers, habit_ids, rounds, latencies):
+    async def timed(name, call):
+        start = time.perf_counter()
+        response = await call
+        latencies.setdefault(name, []).append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response
+
+    today = (await timed("GET /today", client.get("/today", headers=headers))).json()["date"]
+    for r in range(rounds):
+        habit_id = habit_ids[r % len(habit_ids)]
+        if (r // len(habit_ids)) % 2 == 0:
+            await timed("POST /habits/{id}/logs", client.post(f"/habits/{habit_id}/logs", headers=headers, json={}))
+        else:
+            await timed("DELETE /habits/{id}/logs/{date}",
+                        client.delete(f"/habits/{habit_id}/logs/{today}", headers=headers))
+        for _ in range(3):
+            await timed("GET /today", client.get("/today", headers=headers))
+
+
+async def _ticker(stop, stalls):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append(time.perf_counter() - start - 0.01)
+
+
+def _pct(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def run(args):
+    Base.metadata.create_all(bind=engine)
+    seeded = _seed(args.users, args.habits)
+    if args.db_latency_ms:
+        delay = args.db_latency_ms / 1000
+        event.listen(engine, "before_cursor_execute", lambda *a: time.sleep(delay))
+    if args.no_response_cache:
+        responses.max_entries = 0
+    to_thread.current_default_thread_limiter().total_tokens = Config.REQUEST_THREADS
+
+    app = FastAPI()
+    app.include_router(habit_router.router)
+    one_writer = asyncio.Lock()
+
+    @app.middleware("http")
+    async def serialize_writes(request, call_next):
+        if request.method == "GET":
+            return await call_next(request)
+        async with one_writer:
+            return await call_next(request)
+
+    latencies, stalls, stop = {}, [], asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ticker = asyncio.create_task(_ticker(stop, stalls))
+        started = time.perf_counter()
+        await asyncio.gather(*(_user_loop(client, headers, habit_ids, args.rounds, latencies)
+                               for headers, habit_ids in seeded))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{args.users} users x {args.rounds} rounds, {args.db_latency_ms}ms/statement, "
+          f"{Config.REQUEST_THREADS} threads: {total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    for name, values in sorted(latencies.items()):
+        print(f"  {name:<34} n={len(values):<5} p50={statistics.median(values) * 1000:7.1f}ms "
+              f"p99={_pct(values, 99) * 1000:7.1f}ms")
+    print(f"  event-loop stall: p99={_pct(stalls, 99) * 1000:.1f}ms max={max(stalls) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=16, help="concurrent users (one request loop each)")
+    parser.add_argument("--habits", type=int, default=6, help="habits per user")
+    parser.add_argument("--rounds", type=int, default=8, help="log/unlog writes per user, each followed by 3 /today reads")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0, help="simulated round trip per SQL statement")
+    parser.add_argument("--no-response-cache", action="store_true", help="recompute every /today")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the strength analytics on a synthetic multi-year training log: the
+vectorized passes in app.strength_analytics against the per-set Python replay
+they replaced (workout_crud's _strength_point / _merge_points / _with_priors
+per entry and day, plus a dict-of-weeks tonnage loop). Checks that both
+produce the same progression rows before timing them.
+
+    python scripts/bench_strength_analytics.py
+    python scripts/bench_strength_analytics.py --years 10 --sessions-per-week 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")   # imported, never connected
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import strength_analytics
+from app.crud import workout_crud
+
+
+def _synthetic_log(years, sessions_per_week, exercises_per_session, sets_per_exercise, seed=7):
+    """(exercise_id, entry_id, session_date, weight, reps, muscle_group_id) rows, with slow progress."""
+    rng = random.Random(seed)
+    rows, entry = [], 0
+    start = datetime(2021, 1, 4, 7)
+    for week in range(years * 52):
+        for session in range(sessions_per_week):
+            when = start + timedelta(weeks=week, days=session * 7 // sessions_per_week)
+            for slot in range(exercises_per_session):
+                exercise = (session * exercises_per_session + slot) % 24 + 1
+                entry += 1
+                base = 40 + exercise * 4 + week * 0.15
+                for _ in range(sets_per_exercise):
+                    rows.append((exercise, entry, when, round(base + rng.choice((-5, -2.5, 0, 2.5)), 1),
+                                 rng.randrange(3, 13), exercise % 6 + 1))
+    return rows
+
+
+def _python_progression(rows):
+    entries = {}
+    for exercise, entry, when, weight, reps, _ in rows:
+        entries.setdefault((exercise, when.date(), entry), []).append((weight, reps))
+    days = {}
+    for (exercise, day, _), rep_sets in entries.items():
+        point = workout_crud._strength_point(rep_sets)
+        days[(exercise, day)] = workout_crud._merge_points(days[(exercise, day)], point) \
+            if (exercise, day) in days else point
+    out, bests = [], {}
+    for (exercise, day), point in sorted(days.items()):
+        prior_weight, prior_e1rm = bests.get(exercise, (None, None))
+        out.append({"exercise_id": exercise, "session_date": day,
+                    **workout_crud._with_priors(point, prior_weight, prior_e1rm)})
+        bests[exercise] = (workout_crud._running_best(prior_weight, point["top_weight"]),
+                           workout_crud._running_best(prior_e1rm, point["e1rm"]))
+    return out
+
+
+def _python_weekly(rows, first_week, last_week):
+    first_monday = first_week - timedelta(days=first_week.weekday())
+    weeks, groups = {}, {}
+    for _, _, when, weight, reps, group in rows:
+        monday = when.date() - timedelta(days=when.weekday())
+        weeks[monday] = weeks.get(monday, 0) + weight * reps
+        if monday >= first_monday:
+            groups.setdefault(group, {})[monday] = groups.get(group, {}).get(monday, 0) + weight * reps
+    mondays = [first_monday + timedelta(weeks=n)
+               for n in range((last_week - first_monday).days // 7 + 1)]
+    rolling = [sum(weeks.get(m - timedelta(weeks=k), 0) for k in range(strength_analytics.ROLLING_WEEKS))
+               for m in mondays]
+    return [weeks.get(m, 0) for m in mondays], rolling, {g: [v.get(m, 0) for m in mondays] for g, v in groups.items()}
+
+
+def _vectorized_progression(rows):
+    return strength_analytics.progression_rows(0, strength_analytics.daily_points(
+        strength_analytics.columns_from_rows(rows)))
+
+
+def _vectorized_weekly(rows, first_week, last_week):
+    return strength_analytics.weekly_trends(strength_analytics.columns_from_rows(rows), first_week, last_week)
+
+
+def _best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--sessions-per-week", type=int, default=4)
+    parser.add_argument("--exercises", type=int, default=6, help="exercises per session")
+    parser.add_argument("--sets", type=int, default=4, help="sets per exercise")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = _synthetic_log(args.years, args.sessions_per_week, args.exercises, args.sets)
+    last_week = rows[-1][2].date()
+    first_week = last_week - timedelta(weeks=51)
+
+    fields = ("exercise_id", "session_date", "top_weight", "top_reps", "e1rm", "volume",
+              "prior_best_weight", "prior_best_e1rm", "pr_weight", "pr_e1rm")
+    expected = [{f: r[f] for f in fields} for r in _python_progression(rows)]
+    actual = [{f: r[f] for f in fields} for r in _vectorized_progression(rows)]
+    assert actual == expected, "vectorized progression differs from the Python replay"
+
+    print(f"{len(rows)} sets, {len(expected)} exercise-days over {args.years} years")
+    for name, python_fn, numpy_fn in (
+        ("progression (e1RM, top set, volume, PRs)",
+         lambda: _python_progression(rows), lambda: _vectorized_progression(rows)),
+        ("weekly tonnage, rolling 4wk, muscle groups",
+         lambda: _python_weekly(rows, first_week, last_week), lambda: _vectorized_weekly(rows, first_week, last_week)),
+    ):
+        py_best, py_median = _best_of(python_fn, args.repeats)
+        np_best, np_median = _best_of(numpy_fn, args.repeats)
+        print(f"  {name:<44} python {py_median * 1000:8.1f}ms  numpy {np_median * 1000:7.1f}ms  "
+              f"x{py_best / np_best:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Rebuild the strength_progression table from logged workout sets. Safe to
+re-run. Run it once after migration c8d9e0f1a2b3: reads don't fill the table
+in, so until then users with older history have their progression recomputed
+from the sets on every read.
+
+    python scripts/rebuild_strength_progression.py            # every user with sessions
+    python scripts/rebuild_strength_progression.py --user 42  # one user
+"""
+import argparse
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.crud import workout_crud
+from app.models import workout_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", type=int, default=None, help="only rebuild this user id")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.user is not None:
+            user_ids = [args.user]
+        else:
+            user_ids = [row.user_id for row in db.query(workout_model.WorkoutSession.user_id).distinct()]
+        total = 0
+        for user_id in user_ids:
+            total += workout_crud.rebuild_strength_progression(db, user_id)
+            db.commit()   # one transaction per user keeps locks short
+    finally:
+        db.close()
+
+    print(f"{total} progression row(s) for {len(user_ids)} user(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Periodically sync every connected Strava athlete whose last sync is stale
+(see app/strava_sync.py). Run one of these alongside the API; each run pages
+through the connections, syncs the due ones concurrently within Strava's
+rate limits, and records each outcome on the connection.
+
+    python scripts/strava_sync.py --once
+    python scripts/strava_sync.py --interval 900 --concurrency 8
+    python scripts/strava_sync.py --once --stale-hours 0       # everyone, now
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import strava_client, strava_sync
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="one run, then exit")
+    parser.add_argument("--interval", type=float, default=900,
+                        help="seconds between runs (default: one Strava rate-limit window)")
+    parser.add_argument("--concurrency", type=int, default=strava_sync.CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=strava_sync.BATCH_SIZE)
+    parser.add_argument("--stale-hours", type=float, default=strava_sync.STALE_AFTER_SECONDS / 3600,
+                        help="sync connections whose last sync is older than this")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    runner = strava_sync.SyncRunner(concurrency=args.concurrency, batch_size=args.batch_size,
+                                    stale_after=int(args.stale_hours * 3600))
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+    try:
+        while not stopping.is_set():
+            totals = runner.run_once()
+            print(f"synced {totals['ok']} of {totals['connections']} connection(s): "
+                  f"{totals['imported']} activities imported, {totals['error']} failed, "
+                  f"{totals['deferred'] + totals['rate_limited']} deferred by the rate limit "
+                  f"({totals['seconds']}s)", flush=True)
+            if args.once:
+                break
+            stopping.wait(args.interval)
+    finally:
+        strava_client.api.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Run Strava webhook import workers outside the API process (set STRAVA_WORKERS=0
+on the API so it only queues), or inspect and requeue the dead-letter list.
+Any number of these can run side by side; jobs are leased, never shared.
+
+    python scripts/strava_worker.py --workers 4
+    python scripts/strava_worker.py --list-dead
+    python scripts/strava_worker.py --requeue-dead            # all of them
+    python scripts/strava_worker.py --requeue-dead 12 15
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app import strava_jobs
+
+
+def _list_dead(limit):
+    db = SessionLocal()
+    try:
+        jobs = strava_jobs.dead_jobs(db, limit=limit)
+    finally:
+        db.close()
+    for job in jobs:
+        print(f"  job {job.id}: athlete {job.athlete_id}, activity {job.activity_id}, "
+              f"{job.attempts} attempt(s), {job.finished_at:%Y-%m-%d %H:%M} — {job.last_error}")
+    print(f"{len(jobs)} dead job(s)")
+
+
+def _requeue(job_ids):
+    db = SessionLocal()
+    try:
+        count = strava_jobs.requeue(db, job_ids or None)
+    finally:
+        db.close()
+    print(f"requeued {count} job(s)")
+
+
+def _serve(workers, poll_seconds):
+    pool = strava_jobs.WorkerPool(workers, poll_seconds=poll_seconds)
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+    pool.start()
+    print(f"{workers} Strava worker(s) running; Ctrl-C to stop", flush=True)
+    stopping.wait()
+    pool.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(1, strava_jobs.Config.STRAVA_WORKERS))
+    parser.add_argument("--poll-seconds", type=float, default=strava_jobs.POLL_SECONDS)
+    parser.add_argument("--list-dead", action="store_true", help="show jobs that ran out of retries")
+    parser.add_argument("--limit", type=int, default=100, help="with --list-dead")
+    parser.add_argument("--requeue-dead", type=int, nargs="*", metavar="JOB_ID",
+                        help="retry dead jobs (all if no ids given)")
+    args = parser.parse_args()
+
+    if args.list_dead:
+        _list_dead(args.limit)
+    elif args.requeue_dead is not None:
+        _requeue(args.requeue_dead)
+    else:
+        _serve(args.workers, args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Diff the habit_streaks cache against a full recompute from habit_logs.
+Run it once with --fix after migrating to b7c8d9e0f1a2 to build the rows for
+existing habits (until then their streaks are recomputed on every read).
+
+    python scripts/verify_streak_cache.py            # report only
+    python scripts/verify_streak_cache.py --fix      # rewrite drifted rows, create missing ones
+    python scripts/verify_streak_cache.py --user 42  # one user
+"""
+import argparse
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.crud import habit_crud
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", type=int, default=None, help="only check this user id")
+    parser.add_argument("--fix", action="store_true", help="rewrite mismatching rows, create missing ones")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mismatches = habit_crud.verify_streak_cache(db, user_id=args.user, fix=args.fix)
+    finally:
+        db.close()
+
+    for m in mismatches:
+        if m["cached"] is None:
+            print(f"habit {m['habit_id']} (user {m['user_id']}): no cache row")
+            continue
+        diff = {k: (m["cached"][k], m["expected"][k]) for k in m["expected"] if m["cached"][k] != m["expected"][k]}
+        print(f"habit {m['habit_id']} (user {m['user_id']}): {diff}")
+    print(f"{len(mismatches)} mismatching habit(s){' fixed' if args.fix and mismatches else ''}")
+    sys.exit(1 if mismatches and not args.fix else 0)
+
+
+if __name__ == "__main__":
+    main()
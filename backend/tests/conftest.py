@@ -1,6 +1,6 @@
 import pytest
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.database import Base
@@ -32,6 +32,84 @@ def db():
         session.close()
         Base.metadata.drop_all(bind=engine)
 
+
+@pytest.fixture
+def file_sessions(tmp_path):
+    """A sessionmaker on a fresh SQLite file database, for code that opens a
+    session per thread or worker (an in-memory one can't be shared that way)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def count_queries():
+    """count_queries(db, fn) -> (fn(), [SQL of every statement fn sent]).
+
+    For asserting on round trips: how many, and which. With parameters=True each
+    entry is (statement, parameters) instead, e.g. to EXPLAIN them afterwards.
+    """
+    def count(db, fn, parameters=False):
+        statements = []
+
+        def listener(conn, cursor, statement, params, *_):
+            statements.append((statement, params) if parameters else statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            result = fn()
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        return result, statements
+    return count
+
+
+@pytest.fixture(autouse=True)
+def _clear_read_caches():
+    """Per-process caches are keyed by user (or connection) id, which every
+    test reuses, and the exercise catalog would outlive the per-test database."""
+    from app.response_cache import responses
+    from app.utils import time as time_utils
+    from app.auth import user_cache
+    from app.crud import workout_crud
+    from app.exercise_catalog import catalog
+    from app import strava_tokens
+    responses.clear()
+    time_utils._user_timezones.clear()
+    user_cache.clear()
+    workout_crud.invalidate_last_performance()
+    catalog.clear()
+    strava_tokens.clear()
+    yield
+    responses.clear()
+    time_utils._user_timezones.clear()
+    user_cache.clear()
+    workout_crud.invalidate_last_performance()
+    catalog.clear()
+    strava_tokens.clear()
+
+
+@pytest.fixture
+def fake_strava(monkeypatch):
+    """A local Strava API (tests/fake_strava.py) with strava_client pointed at it,
+    through a fresh pooled client and rate budget."""
+    from app import strava_client
+    from tests.fake_strava import FakeStrava
+    server = FakeStrava().start()
+    client = strava_client.StravaAPI()
+    monkeypatch.setattr(strava_client, "api", client)
+    monkeypatch.setattr(strava_client, "STRAVA_OAUTH_URL", f"{server.url}/oauth/token")
+    monkeypatch.setattr(strava_client, "STRAVA_API_BASE", f"{server.url}/api/v3")
+    try:
+        yield server
+    finally:
+        client.close()
+        server.stop()
+
+
 @pytest.fixture(scope="module")
 def mock_user():
     return User(
@@ -0,0 +1,165 @@
+"""
+A local stand-in for the Strava API, served over real HTTP on 127.0.0.1 so the
+client code under test goes through httpx exactly as it does in production.
+
+Serves the endpoints the app uses:
+
+    POST /oauth/token                 refresh_token grant -> new tokens
+    GET  /api/v3/activities/{id}      one activity
+    GET  /api/v3/athlete/activities   newest first, `after` / `page` / `per_page`
+
+Activities are per access token's athlete (tokens look like "access-<athlete>-<n>").
+Failures are scripted with fail(), every request is recorded in .requests (and
+its TCP connection in .connections), and
+each response carries Strava's rate-limit headers from .limits / .usage.
+"""
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_ACTIVITY = re.compile(r"^/api/v3/activities/(\d+)$")
+
+
+def activity(activity_id, day, meters=5000.0, seconds=1800, sport="Run"):
+    """A Strava activity summary on `day` (a date) at 07:00 local."""
+    return {"id": activity_id, "sport_type": sport, "distance": meters, "moving_time": seconds,
+            "start_date_local": f"{day.isoformat()}T07:00:00Z", "start_date": f"{day.isoformat()}T07:00:00Z"}
+
+
+class FakeStrava:
+    def __init__(self):
+        self.activities = defaultdict(dict)          # athlete_id -> {activity_id: activity}
+        self.requests = []                           # (method, path, params)
+        self.connections = set()                     # client (host, port)s seen: one per TCP connection
+        self.refreshes = 0
+        self.limits = (600, 6000)                    # 15-minute, daily
+        self.usage = [0, 0]
+        self.latency = 0.0
+        self._failures = defaultdict(deque)          # path prefix -> statuses to return next
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    # --- test-facing -----------------------------------------------------------
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add(self, athlete_id, *activities):
+        for a in activities:
+            self.activities[athlete_id][a["id"]] = a
+
+    def fail(self, path_prefix, status, times=1):
+        """The next `times` requests whose path starts with path_prefix get `status`."""
+        self._failures[path_prefix].extend([status] * times)
+
+    def count(self, path_prefix, method=None):
+        return sum(1 for m, path, _ in self.requests
+                   if path.startswith(path_prefix) and (method is None or m == method))
+
+    @staticmethod
+    def token_for(athlete_id, generation=0):
+        return f"access-{athlete_id}-{generation}"
+
+    # --- serving ---------------------------------------------------------------
+
+    def _scripted_failure(self, path):
+        with self._lock:
+            for prefix, statuses in self._failures.items():
+                if path.startswith(prefix) and statuses:
+                    return statuses.popleft()
+        return None
+
+    def _athlete(self, headers):
+        match = re.match(r"Bearer access-(\d+)-\d+$", headers.get("Authorization", ""))
+        return int(match.group(1)) if match else None
+
+    def _respond(self, peer, method, path, params, headers, form):
+        with self._lock:
+            self.requests.append((method, path, params))
+            self.connections.add(peer)
+            self.usage[0] += 1
+            self.usage[1] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        status = self._scripted_failure(path)
+        if status is not None:
+            return status, {"message": "scripted failure"}
+
+        if method == "POST" and path == "/oauth/token":
+            if form.get("grant_type") != "refresh_token":
+                return 400, {"message": "unsupported grant"}
+            match = re.match(r"refresh-(\d+)-(\d+)$", form.get("refresh_token", ""))
+            if not match:
+                return 401, {"message": "bad refresh token"}
+            with self._lock:
+                self.refreshes += 1
+            athlete_id, generation = int(match.group(1)), int(match.group(2)) + 1
+            return 200, {"access_token": self.token_for(athlete_id, generation),
+                         "refresh_token": f"refresh-{athlete_id}-{generation}",
+                         "expires_at": int(time.time()) + 6 * 3600}
+
+        athlete_id = self._athlete(headers)
+        if athlete_id is None:
+            return 401, {"message": "Authorization Error"}
+        match = _ACTIVITY.match(path)
+        if method == "GET" and match:
+            found = self.activities[athlete_id].get(int(match.group(1)))
+            return (200, found) if found else (404, {"message": "Record Not Found"})
+        if method == "GET" and path == "/api/v3/athlete/activities":
+            after = int(params.get("after", 0))
+            page, per_page = int(params.get("page", 1)), int(params.get("per_page", 30))
+            matching = sorted(
+                (a for a in self.activities[athlete_id].values()
+                 if datetime.fromisoformat(a["start_date"].replace("Z", "+00:00"))
+                 .replace(tzinfo=timezone.utc).timestamp() > after),
+                key=lambda a: a["start_date"], reverse=True)
+            return 200, matching[(page - 1) * per_page:page * per_page]
+        return 404, {"message": "Not Found"}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self, method):
+                parsed = urlparse(self.path)
+                params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode() if length else ""
+                form = {k: v[-1] for k, v in parse_qs(body).items()}
+                status, payload = fake._respond(self.client_address, method, parsed.path, params, self.headers, form)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-RateLimit-Limit", ",".join(map(str, fake.limits)))
+                self.send_header("X-RateLimit-Usage", ",".join(map(str, fake.usage)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,65 @@
+"""
+Rows the Strava tests start from: a user, the Cardio bucket, a Run habit in it,
+and a StravaConnection whose tokens the fake API (tests/fake_strava.py) accepts.
+seed_athlete() is the usual all-in-one; the pieces are for tests that need less.
+Each helper flushes; seed_athlete() commits.
+"""
+from app.models.habit_model import Bucket, Habit
+from app.models.skill_model import Skill
+from app.models.strava_model import StravaConnection
+from app.models.user_model import User
+from tests.fake_strava import FakeStrava
+
+ATHLETE = 999
+NEVER_EXPIRES = 9999999999
+
+
+def seed_user(db, username="tino"):
+    """A UTC user with the Endurance skill imported runs pay into."""
+    user = User(username=username, email=f"{username}@example.com", timezone="UTC", player_xp=0)
+    db.add(user)
+    db.flush()
+    db.add(Skill(user_id=user.id, name="Endurance", xp=0, level=1))
+    db.flush()
+    return user
+
+
+def cardio_bucket(db):
+    """The Cardio bucket, created on first use."""
+    bucket = db.query(Bucket).filter(Bucket.key == "cardio").first()
+    if bucket is None:
+        bucket = Bucket(key="cardio", name="Cardio", attribute="Endurance",
+                        detail_kind="distance_duration", base_xp=10, icon="🏃", is_active=True)
+        db.add(bucket)
+        db.flush()
+    return bucket
+
+
+def seed_run_habit(db, user, **cadence):
+    """A Run habit in the Cardio bucket; weekly, four times, unless `cadence` says otherwise."""
+    cadence = cadence or dict(cadence_type="weekly", times_per_week=4)
+    habit = Habit(user_id=user.id, bucket_id=cardio_bucket(db).id, name="Run", icon="🏃",
+                  habit_type="standard", status="active", **cadence)
+    db.add(habit)
+    db.flush()
+    return habit
+
+
+def seed_connection(db, user, athlete=ATHLETE, habit=None, expires_at=NEVER_EXPIRES):
+    """`user` connected as `athlete`, on the fake API's first-generation tokens,
+    importing into `habit` (None: no import target)."""
+    conn = StravaConnection(user_id=user.id, athlete_id=athlete, access_token=FakeStrava.token_for(athlete),
+                            refresh_token=f"refresh-{athlete}-0", expires_at=expires_at,
+                            target_habit_id=habit.id if habit else None, import_rides=False)
+    db.add(conn)
+    db.flush()
+    return conn
+
+
+def seed_athlete(db, athlete=ATHLETE, username="tino", expires_at=NEVER_EXPIRES, habit=True):
+    """A user whose runs import into a new Run habit (or nowhere, habit=False)
+    through a connection for `athlete`. Returns the connection."""
+    user = seed_user(db, username)
+    conn = seed_connection(db, user, athlete, seed_run_habit(db, user) if habit else None, expires_at)
+    db.commit()
+    return conn
@@ -3,7 +3,7 @@ day-completion re-settle that a cadence change triggers."""
 import pytest
 
 from app.crud import habit_crud
-from app.models.habit_model import Bucket, Habit, DayCompletion
+from app.models.habit_model import Bucket, Habit, DayCompletion, HabitLog
 from app.models.user_model import User
 from app.schemas import habit_schema
 from app.utils.time import get_user_today
@@ -150,3 +150,184 @@ def test_editing_only_the_name_leaves_the_day_untouched(db, user, bucket):
                                          DayCompletion.date == today).one()
     assert (day.status, day.scheduled_count) == ("complete", 1)
     assert user.player_xp == xp_before
+
+
+def test_today_view_query_count_does_not_grow_with_habits(db, user, bucket, count_queries):
+    """The Today loader is set-based: adding slots adds no round trips."""
+    make_habit(db, user, bucket, name="Meditate")
+    habit_crud.log_habit(db, user, make_habit(db, user, bucket, name="Read").id,
+                         habit_schema.HabitLogCreate())
+    db.refresh(user)
+    _, few = count_queries(db, lambda: habit_crud.get_today(db, user))
+
+    for n in range(3):
+        habit_crud.log_habit(db, user, make_habit(db, user, bucket, name=f"Extra {n}").id,
+                             habit_schema.HabitLogCreate())
+    make_habit(db, user, bucket, name="Weigh-in", habit_type="measurement",
+               measurement_kind="weight", measurement_unit="lbs")
+    db.refresh(user)
+    payload, many = count_queries(db, lambda: habit_crud.get_today(db, user))
+
+    assert len(payload["habits_today"]) == 6
+    assert sum(h["completed_today"] for h in payload["habits_today"]) == 4
+    assert len(many) <= len(few) + 1   # +1: the measurement last-value lookup, once for all of them
+
+
+def test_streak_cache_follows_logs_backfills_and_undo(db, user, bucket):
+    from datetime import timedelta
+    habit = make_habit(db, user, bucket)
+    today = get_user_today(db, user.id)
+
+    for days_ago in (2, 0):
+        habit_crud.log_habit(db, user, habit.id, habit_schema.HabitLogCreate(date=today - timedelta(days=days_ago)))
+    assert habit_crud.get_streak_summaries(db, [habit])[habit.id]["run_length"] == 1
+
+    # Backfilling the gap joins the two runs (the rebuild path).
+    result = habit_crud.log_habit(db, user, habit.id,
+                                  habit_schema.HabitLogCreate(date=today - timedelta(days=1)))
+    assert result["streak"]["current"] == 3
+    assert habit_crud.verify_streak_cache(db, user.id) == []
+
+    habit_crud.delete_log(db, user, habit.id, today)
+    summary = habit_crud.get_streak_summaries(db, [habit])[habit.id]
+    assert (summary["run_length"], summary["best"], summary["total"]) == (2, 2, 2)
+    assert habit_crud.verify_streak_cache(db, user.id) == []
+
+
+def test_verify_streak_cache_reports_and_fixes_drift(db, user, bucket):
+    from app.models.habit_model import HabitStreak
+    habit = make_habit(db, user, bucket)
+    habit_crud.log_habit(db, user, habit.id, habit_schema.HabitLogCreate())
+    row = db.query(HabitStreak).filter(HabitStreak.habit_id == habit.id).one()
+    row.run_length = 40
+    db.commit()
+
+    mismatches = habit_crud.verify_streak_cache(db, user.id, fix=True)
+
+    assert [m["habit_id"] for m in mismatches] == [habit.id]
+    assert mismatches[0]["expected"]["run_length"] == 1
+    assert habit_crud.verify_streak_cache(db, user.id) == []
+
+
+def test_streak_read_computes_missing_rows_without_writing(db, user, bucket):
+    from app.models.habit_model import HabitLog, HabitStreak
+    habit = make_habit(db, user, bucket)
+    db.add(HabitLog(habit_id=habit.id, user_id=user.id, date=get_user_today(db, user.id)))
+    db.commit()
+
+    assert habit_crud.get_streak_summaries(db, [habit])[habit.id]["run_length"] == 1
+    assert db.query(HabitStreak).count() == 0 and not db.new and not db.dirty
+
+
+def test_first_streak_writes_racing_both_land(db, user, bucket):
+    from app.models.habit_model import HabitStreak
+    habit = make_habit(db, user, bucket)
+    summary = habit_crud._full_streak_summary(db, habit)
+
+    for total in (1, 2):   # both saw no row, as two overlapping first logs would
+        habit_crud._store_streak_summary(db, habit, {**summary, "total": total})
+    db.commit()
+
+    assert db.query(HabitStreak.total).filter(HabitStreak.habit_id == habit.id).all() == [(2,)]
+
+
+def test_verify_streak_cache_builds_missing_rows(db, user, bucket):
+    from app.models.habit_model import HabitLog, HabitStreak
+    habit = make_habit(db, user, bucket)
+    db.add(HabitLog(habit_id=habit.id, user_id=user.id, date=get_user_today(db, user.id)))
+    db.commit()
+
+    mismatches = habit_crud.verify_streak_cache(db, user.id, fix=True)
+
+    assert [(m["habit_id"], m["cached"]) for m in mismatches] == [(habit.id, None)]
+    assert db.query(HabitStreak).filter(HabitStreak.habit_id == habit.id).one().total == 1
+    assert habit_crud.verify_streak_cache(db, user.id) == []
+
+
+def test_range_recompute_matches_per_day_recompute(db, user, bucket, count_queries):
+    from datetime import timedelta
+    from app.models.habit_model import PlayerXPEvent
+    daily = make_habit(db, user, bucket, name="Meditate")
+    weekdays = make_habit(db, user, bucket, name="Lift", cadence_type="weekdays", weekdays=[0, 2, 4])
+    today = get_user_today(db, user.id)
+    window = [today - timedelta(days=n) for n in range(10)]
+    for n, d in enumerate(window):
+        db.add(HabitLog(habit_id=daily.id, user_id=user.id, date=d))
+        if n % 3:
+            db.add(HabitLog(habit_id=weekdays.id, user_id=user.id, date=d))
+    db.commit()
+
+    results, queries = count_queries(db, lambda: habit_crud.recompute_day_completions(db, user, window))
+    db.commit()
+    assert len(queries) <= 4   # habits, logs, day rows, flush of the batch
+    xp_batched = user.player_xp
+    days = {d.date: (d.status, d.scheduled_count, d.completed_count, d.player_xp)
+            for d in db.query(DayCompletion).all()}
+
+    # Undo and replay one date at a time: same states, same XP.
+    db.query(DayCompletion).delete()
+    db.query(PlayerXPEvent).delete()
+    user.player_xp = 0
+    db.commit()
+    for d in window:
+        assert habit_crud.recompute_day_completion(db, user, d) == results[d]
+    db.commit()
+    assert user.player_xp == xp_batched
+    assert days == {d.date: (d.status, d.scheduled_count, d.completed_count, d.player_xp)
+                    for d in db.query(DayCompletion).all()}
+
+
+def test_stats_overview_query_count_does_not_grow_with_habits(db, user, bucket, count_queries):
+    habit_crud.log_habit(db, user, make_habit(db, user, bucket).id, habit_schema.HabitLogCreate())
+    db.refresh(user)
+    _, few = count_queries(db, lambda: habit_crud.get_stats_overview(db, user))
+
+    for n in range(3):
+        habit_crud.log_habit(db, user, make_habit(db, user, bucket, name=f"Extra {n}").id,
+                             habit_schema.HabitLogCreate())
+    db.refresh(user)
+    payload, many = count_queries(db, lambda: habit_crud.get_stats_overview(db, user))
+
+    assert len(many) == len(few)
+    assert [h["total_completions"] for h in payload["habits"]] == [1, 1, 1, 1]
+    assert payload["player"]["total_xp"] == user.player_xp
+
+
+def test_heatmap_by_habit_reads_a_fixed_number_of_queries(db, user, bucket, count_queries):
+    from datetime import timedelta
+    today = get_user_today(db, user.id)
+    habits = [make_habit(db, user, bucket, name=f"Habit {n}") for n in range(4)]
+    for n, habit in enumerate(habits):
+        db.add_all([HabitLog(habit_id=habit.id, user_id=user.id, date=today - timedelta(days=days_ago))
+                    for days_ago in range(0, 6, n + 1)])
+    db.commit()
+    habit_crud.verify_streak_cache(db, user.id, fix=True)   # build the streak cache rows
+    db.refresh(user)
+
+    payload, queries = count_queries(db, lambda: habit_crud.get_heatmap_by_habit(db, user, days=14))
+
+    assert len(queries) <= 3   # habits, window logs, streak rows
+    by_name = {h["name"]: h for h in payload["habits"]}
+    assert by_name["Habit 0"]["current_streak"] == 6
+    assert by_name["Habit 1"]["current_streak"] == 1
+    assert all(h["completed_today"] for h in payload["habits"])
+    assert sum(d["count"] for d in by_name["Habit 2"]["days"]) == 2
+
+
+def test_heatmap_by_habit_compact_encodings_match_the_day_list(db, user, bucket):
+    from datetime import timedelta
+    today = get_user_today(db, user.id)
+    habit = make_habit(db, user, bucket)
+    db.add_all([HabitLog(habit_id=habit.id, user_id=user.id, date=today - timedelta(days=days_ago))
+                for days_ago in (0, 1, 4)])
+    db.commit()
+
+    days = habit_crud.get_heatmap_by_habit(db, user, days=7)["habits"][0]["days"]
+    bits = habit_crud.get_heatmap_by_habit(db, user, days=7, encoding="bits")
+    rle = habit_crud.get_heatmap_by_habit(db, user, days=7, encoding="rle")
+
+    assert bits["habits"][0]["grid"] == "".join("1" if d["count"] else "0" for d in days) == "0010011"
+    assert rle["habits"][0]["grid"] == "2,1,2,2"
+    assert "days" not in rle["habits"][0] and rle["encoding"] == "rle"
+    with pytest.raises(ValueError):
+        habit_crud.get_heatmap_by_habit(db, user, encoding="png")
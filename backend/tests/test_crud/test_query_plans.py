@@ -0,0 +1,151 @@
+"""
+Query-plan regression suite for the workout and habit hot paths.
+
+Seeds a year of training and habit history for a few dozen users, runs
+ANALYZE so the planner works from real statistics, then captures the SQL each
+CRUD entry point actually emits and checks its EXPLAIN QUERY PLAN: the large
+tables must be reached through an index (SEARCH ... USING INDEX), never a
+full SCAN. A query rewrite that stops matching an index, or a dropped index,
+fails here rather than in production latency.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud import habit_crud, workout_crud
+from app.database import Base
+from app.models import User, habit_model, workout_model
+
+USERS = 30
+SESSIONS_PER_USER = 150          # ~3 a week for a year
+EXERCISES_PER_SESSION = 5
+SETS_PER_EXERCISE = 3
+HABITS_PER_USER = 4
+LOG_DAYS = 365
+EXERCISES = 60
+
+HOT_TABLES = ("workout_sessions", "session_exercises", "workout_sets", "habit_logs", "player_xp_events")
+START = datetime(2025, 10, 1)
+
+
+def _seed(db):
+    db.execute(insert(User), [
+        {"id": u, "username": f"user{u}", "email": f"user{u}@example.com"} for u in range(1, USERS + 1)])
+    db.execute(insert(workout_model.Exercise), [
+        {"exercise_id": e, "name": f"Lift {e}", "is_global": True, "category_id": 1, "muscle_group_id": 1,
+         "equipment_id": 1, "difficulty_level_id": 1, "exercise_type_id": 1} for e in range(1, EXERCISES + 1)])
+    db.execute(insert(workout_model.WorkoutProgram), [
+        {"program_id": u, "user_id": u, "name": "PPL"} for u in range(1, USERS + 1)])
+    db.execute(insert(workout_model.WorkoutDay), [
+        {"day_id": u * 3 + d, "program_id": u, "day_name": f"Day {d}"}
+        for u in range(1, USERS + 1) for d in range(3)])
+    db.execute(insert(workout_model.ProgramExercise), [
+        {"day_id": u * 3 + d, "exercise_id": (d * EXERCISES_PER_SESSION + n) % EXERCISES + 1, "sets": 3}
+        for u in range(1, USERS + 1) for d in range(3) for n in range(EXERCISES_PER_SESSION)])
+
+    sessions, session_exercises, sets = [], [], []
+    for u in range(1, USERS + 1):
+        for s in range(SESSIONS_PER_USER):
+            session_id = len(sessions) + 1
+            day = s % 3
+            sessions.append({"session_id": session_id, "user_id": u, "program_id": u, "day_id": u * 3 + day,
+                             "session_date": START + timedelta(days=s * 7 // 3, hours=u % 12)})
+            for n in range(EXERCISES_PER_SESSION):
+                se_id = len(session_exercises) + 1
+                session_exercises.append({"session_exercise_id": se_id, "session_id": session_id,
+                                          "exercise_id": (day * EXERCISES_PER_SESSION + n) % EXERCISES + 1,
+                                          "total_volume": 0, "total_intensity_score": 0})
+                sets.extend({"session_exercise_id": se_id, "set_number": k + 1,
+                             "performed_weight": 60 + s % 20, "performed_reps": 5}
+                            for k in range(SETS_PER_EXERCISE))
+    db.execute(insert(workout_model.WorkoutSession), sessions)
+    db.execute(insert(workout_model.SessionExercise), session_exercises)
+    db.execute(insert(workout_model.WorkoutSet), sets)
+
+    db.execute(insert(habit_model.Bucket), [
+        {"id": b, "key": f"bucket{b}", "name": f"Bucket {b}", "attribute": attribute}
+        for b, attribute in enumerate(("Strength", "Endurance", "Mindfulness", "Intelligence"), start=1)])
+    db.execute(insert(habit_model.Habit), [
+        {"id": u * HABITS_PER_USER + h, "user_id": u, "bucket_id": h + 1, "name": f"Habit {h}"}
+        for u in range(1, USERS + 1) for h in range(HABITS_PER_USER)])
+    db.execute(insert(habit_model.HabitLog), [
+        {"habit_id": u * HABITS_PER_USER + h, "user_id": u, "date": START.date() + timedelta(days=d),
+         "attribute": ("Strength", "Endurance", "Mindfulness", "Intelligence")[h], "attribute_xp": 10}
+        for u in range(1, USERS + 1) for h in range(HABITS_PER_USER) for d in range(LOG_DAYS)
+        if (d + h) % 4])
+    db.execute(insert(habit_model.PlayerXPEvent), [
+        {"user_id": u, "amount": 5, "source": source, "source_key": f"{source}:{d}"}
+        for u in range(1, USERS + 1) for d in range(LOG_DAYS) for source in ("day_complete", "streak_milestone")
+        if source == "day_complete" or d % 30 == 0])
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE")
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    _seed(session)
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def explain(count_queries):
+    """explain(db, fn): run fn, then EXPLAIN QUERY PLAN every SELECT it issued:
+    [(sql, [plan detail, ...])]."""
+    def plans(db, fn):
+        _, captured = count_queries(db, fn, parameters=True)
+        connection = db.connection()
+        return [
+            (statement, [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+            for statement, parameters in captured if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        ]
+    return plans
+
+
+def _assert_indexed(plans, *expected_indexes):
+    assert plans, "no SELECT was issued"
+    details = [detail for _, plan in plans for detail in plan]
+    full_scans = [d for d in details if re.match(rf"SCAN ({'|'.join(HOT_TABLES)})\b", d) and "INDEX" not in d]
+    assert not full_scans, f"full table scan in plan: {full_scans}\n{plans}"
+    for index in expected_indexes:
+        assert any(index in d for d in details), f"{index} not used:\n{plans}"
+
+
+def test_session_context_uses_user_program_index(seeded, explain):
+    plans = explain(seeded, lambda: workout_crud.get_session_context(seeded, 7, 7))
+    _assert_indexed(plans, "ix_workout_sessions_user_program_date", "ix_session_exercises_session_id",
+                    "ix_workout_sets_session_exercise_set")
+
+
+def test_last_performance_uses_exercise_index(seeded, explain):
+    plans = explain(seeded, lambda: workout_crud.get_last_performance(seeded, 7, 7))
+    _assert_indexed(plans, "ix_session_exercises_exercise_session", "ix_workout_sets_session_exercise_set")
+
+
+def test_session_history_page_uses_user_date_index(seeded, explain):
+    first = workout_crud.get_session_history(seeded, 7, limit=20)
+    plans = explain(seeded, lambda: workout_crud.get_session_history(seeded, 7, cursor=first["next_cursor"]))
+    _assert_indexed(plans, "ix_workout_sessions_user_date")
+
+
+def test_attribute_xp_cap_uses_user_date_attribute_index(seeded, explain):
+    plans = explain(seeded, lambda: habit_crud._attribute_xp_earned_on(
+        seeded, 7, "Strength", START.date() + timedelta(days=100)))
+    _assert_indexed(plans, "ix_habit_logs_user_date_attribute")
+
+
+def test_player_xp_event_check_uses_source_key_index(seeded, explain):
+    plans = explain(seeded, lambda: habit_crud._player_xp_event_exists(seeded, 7, "streak_milestone",
+                                                                      "streak_milestone:30"))
+    _assert_indexed(plans, "ix_player_xp_events_user_source_key")
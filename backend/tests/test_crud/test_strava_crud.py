@@ -3,53 +3,46 @@ beyond the manual window, and state signing."""
 from datetime import date, timedelta
 
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.crud import strava_crud, habit_crud
-from app.models.habit_model import Bucket, Habit, HabitLog, DayCompletion
+from app.database import Base
+from app.models.habit_model import Bucket, Habit, HabitLog, HabitStreak, DayCompletion, PlayerXPEvent
 from app.models.strava_model import StravaConnection, StravaActivityImport
 from app.models.skill_model import Skill
 from app.models.user_model import User
 from app.utils.time import get_user_today
+from tests.fake_strava import activity
+from tests.strava_seed import ATHLETE, cardio_bucket, seed_connection, seed_run_habit, seed_user
 
 
 @pytest.fixture
 def user(db):
-    row = User(username="tino", email="tino@example.com", timezone="UTC", player_xp=0)
-    db.add(row)
-    db.add(Skill(user_id=1, name="Endurance", xp=0, level=1))
+    row = seed_user(db)
     db.commit()
-    db.refresh(row)
     return row
 
 
 @pytest.fixture
 def cardio(db):
-    row = Bucket(key="cardio", name="Cardio", attribute="Endurance",
-                 detail_kind="distance_duration", base_xp=10, icon="🏃", is_active=True)
-    db.add(row)
+    row = cardio_bucket(db)
     db.commit()
-    db.refresh(row)
     return row
 
 
 @pytest.fixture
 def habit(db, user, cardio):
-    row = Habit(user_id=user.id, bucket_id=cardio.id, name="Run", icon="🏃",
-                habit_type="standard", cadence_type="weekly", times_per_week=4, status="active")
-    db.add(row)
+    row = seed_run_habit(db, user)
     db.commit()
-    db.refresh(row)
     return row
 
 
 @pytest.fixture
 def connection(db, user, habit):
-    row = StravaConnection(user_id=user.id, athlete_id=999, access_token="a",
-                           refresh_token="r", expires_at=9999999999,
-                           target_habit_id=habit.id, import_rides=False)
-    db.add(row)
+    row = seed_connection(db, user, habit=habit)
     db.commit()
-    db.refresh(row)
     return row
 
 
@@ -181,3 +174,178 @@ def test_status_lists_cardio_habits_and_connection(db, user, habit, connection):
     assert st["connected"] is True
     assert st["target_habit_id"] == habit.id
     assert [h["id"] for h in st["cardio_habits"]] == [habit.id]
+
+
+def test_multi_day_import_settles_every_day_once(db, user, habit, connection):
+    habit.cadence_type = "daily"
+    habit.times_per_week = None
+    db.commit()
+    today = get_user_today(db, user.id)
+    days = [today - timedelta(days=n) for n in range(5)]
+
+    strava_crud.import_activities(db, user, [run(n + 1, d) for n, d in enumerate(days)])
+
+    rows = db.query(DayCompletion).filter(DayCompletion.user_id == user.id).all()
+    assert sorted(r.date for r in rows) == sorted(days)
+    assert all(r.status == "complete" for r in rows)
+
+
+def test_sync_imports_every_page_of_the_window(db, user, habit, connection, fake_strava):
+    today = get_user_today(db, user.id)
+    fake_strava.add(ATHLETE, *(activity(n, today - timedelta(days=n % 20)) for n in range(1, 451)))
+
+    result = strava_crud.sync_now(db, user)
+
+    assert result["imported"] == 450          # was silently capped at one page of 100
+    assert result["days_logged"] == 20
+    assert db.query(StravaActivityImport).count() == 450
+    assert db.query(HabitLog).filter(HabitLog.habit_id == habit.id).count() == 20
+    assert db.get(StravaConnection, connection.id).last_synced_at is not None
+
+
+def test_sync_cut_short_keeps_what_landed_but_not_the_cursor(db, user, habit, connection, fake_strava):
+    today = get_user_today(db, user.id)
+    fake_strava.add(ATHLETE, *(activity(n, today - timedelta(days=n % 20)) for n in range(1, 1001)))
+    fake_strava.limits = (40, 1000)
+    fake_strava.usage = [30, 0]               # one wave (4 pages) fits, then the budget is spent
+
+    with pytest.raises(strava_crud.strava_client.StravaError):
+        strava_crud.sync_now(db, user)
+
+    assert db.query(StravaActivityImport).count() == 800
+    assert db.get(StravaConnection, connection.id).last_synced_at is None
+
+
+def test_webhook_import_during_a_sync_is_not_imported_twice(db, user, habit, connection, fake_strava, monkeypatch):
+    today = get_user_today(db, user.id)
+    fake_strava.add(ATHLETE, *(activity(n, today - timedelta(days=n % 20)) for n in range(1, 301)))
+    import_chunk = strava_crud._import_chunk
+    webhook = {}
+
+    def chunk_after_a_webhook(*args):
+        # The sync already loaded its dedup set; activity 1 lands through the
+        # webhook path before the sync's first chunk is written.
+        if "result" not in webhook:
+            webhook["result"] = None
+            monkeypatch.setattr(strava_crud, "_import_chunk", import_chunk)
+            webhook["result"] = strava_crud.import_one_activity(db, connection, 1)
+        return import_chunk(*args)
+
+    monkeypatch.setattr(strava_crud, "_import_chunk", chunk_after_a_webhook)
+    result = strava_crud.sync_now(db, user)
+
+    assert webhook["result"]["imported"] == 1
+    assert (result["imported"], result["skipped_duplicate"]) == (299, 1)
+    assert db.query(StravaActivityImport).count() == 300
+
+
+def _sequential_import(db, user, activities):
+    """The per-activity importer the batch pipeline replaced: log_habit per new
+    day, oldest first, detail accumulated onto the day's log. The XP reference."""
+    conn = strava_crud.get_connection(db, user.id)
+    habit = db.get(Habit, conn.target_habit_id)
+    today = get_user_today(db, user)
+    days = set()
+    for a in sorted(activities, key=lambda a: a["start_date_local"]):
+        log_date = date.fromisoformat(a["start_date_local"][:10])
+        if log_date > today or (a["sport_type"] not in ("Run", "TrailRun", "VirtualRun")):
+            continue
+        miles, minutes = round(a["distance"] / strava_crud.METERS_PER_MILE, 2), round(a["moving_time"] / 60, 1)
+        existing = db.query(HabitLog).filter(HabitLog.habit_id == habit.id, HabitLog.date == log_date).first()
+        if existing:
+            existing.distance = round((existing.distance or 0) + miles, 2)
+            existing.duration_minutes = round((existing.duration_minutes or 0) + minutes, 1)
+            db.flush()
+        else:
+            habit_crud.log_habit(db, user, habit.id,
+                                 habit_crud.habit_schema.HabitLogCreate(date=log_date, distance=miles,
+                                                                        duration_minutes=minutes),
+                                 enforce_window=False, source="strava", external_ref=f"strava:{a['id']}",
+                                 settle_day=False)
+        days.add(log_date)
+    habit_crud.recompute_day_completions(db, user, days)
+    db.commit()
+
+
+def _world(cadence):
+    """A fresh database: a Cardio habit on `cadence` with a month of prior logs
+    (a live streak to cross milestones from), and a second Endurance habit whose
+    logs eat into the daily attribute cap on some of the imported days."""
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = seed_user(db)
+    kinds = {"daily": dict(cadence_type="daily"), "weekly": dict(cadence_type="weekly", times_per_week=3),
+             "weekdays": dict(cadence_type="weekdays", weekdays=[0, 2, 4])}
+    habit = seed_run_habit(db, user, **kinds[cadence])
+    seed_connection(db, user, habit=habit)
+    swim = Bucket(key="swim", name="Swim", attribute="Endurance", detail_kind="duration", base_xp=25, is_active=True)
+    db.add(swim)
+    db.flush()
+    other = Habit(user_id=user.id, bucket_id=swim.id, name="Swim", habit_type="standard", status="active",
+                  cadence_type="daily")
+    db.add(other)
+    db.flush()
+    today = get_user_today(db, user)
+    for n in range(40, 60):                      # an old run of logs, then a gap
+        db.add(HabitLog(habit_id=habit.id, user_id=user.id, date=today - timedelta(days=n),
+                        attribute="Endurance", attribute_xp=10, source="manual"))
+    for n in range(0, 30, 3):
+        db.add(HabitLog(habit_id=other.id, user_id=user.id, date=today - timedelta(days=n),
+                        attribute="Endurance", attribute_xp=40 + n % 25, source="manual"))
+    db.commit()
+    return db, user
+
+
+def _snapshot(db, user):
+    db.expire_all()
+    skill = db.query(Skill).one()
+    return {
+        "skill": (skill.xp, skill.level, skill.daily_xp_earned),
+        "player_xp": db.get(User, user.id).player_xp,
+        "events": sorted((e.source, e.source_key, e.amount) for e in db.query(PlayerXPEvent)),
+        "logs": sorted((l.habit_id, l.date, l.attribute_xp, l.distance, l.duration_minutes, l.is_backfill,
+                        l.external_ref) for l in db.query(HabitLog)),
+        "days": sorted((d.date, d.status, d.player_xp, d.scheduled_count, d.completed_count)
+                       for d in db.query(DayCompletion)),
+        "streaks": sorted((s.habit_id, s.last_date, s.total, s.run_end, s.run_length, s.best)
+                          for s in db.query(HabitStreak)),
+    }
+
+
+@pytest.mark.parametrize("cadence", ["daily", "weekly", "weekdays"])
+def test_batch_import_pays_exactly_what_sequential_logging_did(cadence):
+    batch_db, batch_user = _world(cadence)
+    reference_db, reference_user = _world(cadence)
+    today = get_user_today(batch_db, batch_user)
+    # Every day of the last 45 but one: the week before the gap becomes a live
+    # 7-day run only as its last day lands, which is where a milestone pays.
+    activities = [run(n, today - timedelta(days=(n * 7) % 45), meters=3000 + n * 37, seconds=900 + n * 11)
+                  for n in range(1, 121) if (n * 7) % 45 != 7]
+    activities += [run(500, today - timedelta(days=40)), run(501, today + timedelta(days=1)),
+                   run(502, today, sport="Ride")]
+
+    strava_crud.import_activities(batch_db, batch_user, activities)
+    _sequential_import(reference_db, reference_user, activities)
+
+    batch, reference = _snapshot(batch_db, batch_user), _snapshot(reference_db, reference_user)
+    assert cadence != "daily" or ("streak_milestone", "habit:1:milestone:7", 25) in reference["events"]
+    assert batch == reference
+    batch_db.close()
+    reference_db.close()
+
+
+def test_batch_import_statement_count_is_flat(db, user, habit, connection, count_queries):
+    today = get_user_today(db, user.id)
+    activities = [run(n, today - timedelta(days=n % 180)) for n in range(150)]
+    user_id = user.id
+    result, statements = count_queries(db, lambda: strava_crud.import_activities(db, db.get(User, user_id), activities))
+
+    assert result["imported"] == 150
+    assert db.query(HabitLog).count() == 150
+    # Reads and updates are per batch, not per activity. New logs and days are
+    # one batched INSERT each on Postgres; SQLite's ORM flush sends them row by row.
+    others = [s for s in statements if not s.startswith(("INSERT INTO habit_logs", "INSERT INTO day_completions"))]
+    assert len(others) <= 25, others
+    assert sum(s.startswith("INSERT INTO strava_activity_imports") for s in statements) == 1
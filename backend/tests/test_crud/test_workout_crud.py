@@ -4,7 +4,7 @@
 # here is query-heavy (joins, ordering, day-cycle inference), so a mocked Session
 # can't meaningfully exercise it - we run against actual tables instead.
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.models import workout_model, user_model
 from app.crud import workout_crud
@@ -123,6 +123,55 @@ def test_get_user_workout_programs_filters_archived(db):
     assert has_archived is True
 
 
+
+def _week_program(db, user, days=7, exercises=50):
+    ids = [_make_exercise(db, f"Lift {n}").exercise_id for n in range(exercises)]
+    return ids, workout_crud.create_workout_program(db, user.id, workout_schema.WorkoutProgramCreate(
+        name="Week", workout_days=[workout_schema.WorkoutDayCreate(
+            day_name=f"Day {d}",
+            exercises=[workout_schema.ProgramExerciseCreate(exercise_id=e, sets=3) for e in ids[d::days]],
+        ) for d in range(days)]))
+
+
+def test_program_edit_is_set_based(db, count_queries):
+    user = _make_user(db)
+    ids, program = _week_program(db, user)
+    assert sum(len(d.exercises) for d in program.workout_days) == 50
+    day_ids = [d.day_id for d in program.workout_days]
+    program_id = program.program_id
+    # Keep six days with reshuffled exercises, drop the last, add two.
+    edit = workout_schema.WorkoutProgramUpdate(workout_days=[
+        workout_schema.WorkoutDayUpdate(
+            day_id=day_ids[d] if d < 6 else None, day_name=f"New {d}",
+            exercises=[workout_schema.ProgramExerciseCreate(exercise_id=e, sets=4) for e in ids[d + 1::8]],
+        ) for d in range(8)])
+
+    updated, statements = count_queries(db, lambda: workout_crud.update_workout_program(db, program_id, edit))
+
+    assert sum(s.startswith("INSERT INTO program_exercises") for s in statements) == 1
+    assert sum(s.startswith("DELETE FROM program_exercises") for s in statements) == 1
+    # program, day ids, detach, 2 deletes, 2 new days (one batch on Postgres),
+    # day-name update, exercises, updated_at, reload
+    assert len(statements) <= 11
+    assert [d.day_id for d in updated.workout_days][:6] == day_ids[:6]
+    assert [d.day_name for d in updated.workout_days] == [f"New {d}" for d in range(8)]
+    assert sum(len(d.exercises) for d in updated.workout_days) == len(ids[1:])
+
+
+def test_delete_program_removes_its_sessions_with_their_sets(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    _insert_session(db, user.id, program.program_id, datetime(2026, 6, 20), push)
+
+    workout_crud.delete_workout_program(db, program.program_id)
+
+    for model in (workout_model.WorkoutProgram, workout_model.WorkoutDay, workout_model.ProgramExercise,
+                  workout_model.WorkoutSession, workout_model.SessionExercise, workout_model.WorkoutSet,
+                  workout_model.StrengthProgression):
+        assert db.query(model).count() == 0
+
+
 # --- logging a session -----------------------------------------------------
 
 def test_log_workout_session_persists_day_and_sets(db):
@@ -154,6 +203,112 @@ def test_log_workout_session_persists_day_and_sets(db):
     assert sets[0].performed_reps == 5
 
 
+def _big_session(db, user, exercises=8, sets_per_exercise=4):
+    day = workout_schema.WorkoutDayCreate(day_name="Full", exercises=[
+        workout_schema.ProgramExerciseCreate(exercise_id=_make_exercise(db, f"Lift {n}").exercise_id, sets=4)
+        for n in range(exercises)])
+    program = workout_crud.create_workout_program(
+        db, user.id, workout_schema.WorkoutProgramCreate(name="Big", workout_days=[day]))
+    full = _ordered_days(db, program.program_id)[0]
+    return program, full, workout_schema.WorkoutSessionCreate(
+        program_id=program.program_id, day_id=full.day_id, session_date=datetime(2026, 6, 20, 10, 0, 0),
+        exercises=[workout_schema.SessionExerciseCreate(
+            program_exercise_id=pe.program_exercise_id,
+            sets=[workout_schema.WorkoutSetCreate(set_number=i + 1, weight=50 + i, reps=8)
+                  for i in range(sets_per_exercise)],
+        ) for pe in full.exercises],
+        habit_id=None,
+    )
+
+
+def test_log_workout_session_is_batched(db, count_queries):
+    user = _make_user(db)
+    _, _, data = _big_session(db, user)
+    user_id = user.id
+    db.expunge_all()
+
+    result, statements = count_queries(db, lambda: workout_crud.log_workout_session(db, data, user_id))
+
+    # One lookup for all program exercises and one INSERT for all 32 sets.
+    # (Session exercises batch on Postgres; SQLite can't order RETURNING rows,
+    # so SQLAlchemy sends those 8 one at a time here.)
+    assert sum("FROM program_exercises" in s for s in statements) == 1
+    assert sum(s.startswith("INSERT INTO workout_sets") for s in statements) == 1
+    # program, exercises, rows, progression fold (a first-ever build for this
+    # user: latest rows, existence check, delete/select/insert), habit lookup + savepoint
+    assert len(statements) <= 1 + 1 + 1 + 8 + 1 + 5 + 4
+    assert [len(ex["sets"]) for ex in result["exercises"]] == [4] * 8
+    assert result["exercises"][0]["name"] == "Lift 0"
+    assert result["exercises"][0]["total_volume"] == (50 + 51 + 52 + 53) * 8
+    assert db.query(workout_model.WorkoutSet).count() == 32
+
+
+def test_log_workout_session_rejects_an_unknown_program_exercise(db):
+    user = _make_user(db)
+    _, _, data = _big_session(db, user, exercises=1)
+    data.exercises[0].program_exercise_id = 9999
+
+    with pytest.raises(ValueError):
+        workout_crud.log_workout_session(db, data, user.id)
+    db.rollback()
+    assert db.query(workout_model.WorkoutSession).count() == 0
+
+
+def test_strength_habit_payout_commits_with_the_session(db):
+    from app.models.habit_model import Bucket, Habit, HabitLog
+    user = _make_user(db)
+    db.add(Bucket(id=1, key="strength_training", name="Strength Training", attribute="Strength",
+                  detail_kind="volume", base_xp=12, icon="🏋️", is_active=True))
+    db.add(Habit(id=1, user_id=user.id, bucket_id=1, name="Lift", habit_type="standard",
+                 cadence_type="daily", status="active"))
+    db.commit()
+    _, _, data = _big_session(db, user, exercises=2)
+    data.session_date = None
+
+    result = workout_crud.log_workout_session(db, data, user.id)
+
+    assert result["habit_payout"]["log"]["habit_id"] == 1
+    db.rollback()   # nothing left pending: both landed in one commit
+    assert db.query(HabitLog).count() == 1
+    assert db.query(workout_model.WorkoutSession).count() == 1
+
+
+
+def _strength_habits(db, user, logged_today):
+    """One strength habit per logged_today flag, each with a month of history;
+    the flag says whether today is already logged."""
+    from datetime import timedelta
+    from app.models.habit_model import Bucket, Habit, HabitLog
+    from app.utils.time import utc_today
+    if db.get(Bucket, 1) is None:
+        db.add(Bucket(id=1, key="strength_training", name="Strength Training", attribute="Strength",
+                      detail_kind="volume", base_xp=12, icon="🏋️", is_active=True))
+    habits = [Habit(user_id=user.id, bucket_id=1, name=f"Lift {n}", habit_type="standard",
+                    cadence_type="daily", status="active") for n in range(len(logged_today))]
+    db.add_all(habits)
+    db.flush()
+    for habit, logged in zip(habits, logged_today):
+        db.add_all(HabitLog(habit_id=habit.id, user_id=user.id, date=utc_today() - timedelta(days=d))
+                   for d in range(0 if logged else 1, 30))
+    db.commit()
+    return [habit.id for habit in habits]
+
+
+def test_strength_habit_resolution_cost_does_not_grow_with_habits(db, count_queries):
+    counts = []
+    for uid, habits in ((1, 1), (2, 4)):
+        user = _make_user(db, uid)
+        habit_ids = _strength_habits(db, user, logged_today=[True] * (habits - 1) + [False])
+
+        payout, statements = count_queries(
+            db, lambda: workout_crud._complete_strength_habit(db, uid, None, total_volume=1000))
+
+        assert payout["habit_id"] == habit_ids[-1]   # the only one not yet logged today
+        assert sum("FROM habits" in s and "habit_logs" in s for s in statements) == 1
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
+
+
 # --- session context (next-day suggestion) ---------------------------------
 
 def test_session_context_no_sessions_suggests_first_day(db):
@@ -200,19 +355,112 @@ def test_session_context_uses_most_recent_session(db):
     assert ctx["suggested_day_id"] == legs.day_id
 
 
-def test_session_context_infers_day_for_legacy_session(db):
-    """Sessions logged before day_id existed (NULL) are inferred from exercises."""
+def test_session_context_without_stored_day_suggests_first_day(db):
+    """A legacy session (NULL day_id) is not guessed at on read; the backfill fills it in."""
     user = _make_user(db)
     program = _make_ppl_program(db, user.id)
     push, pull, _ = _ordered_days(db, program.program_id)
+    _insert_session(db, user.id, program.program_id, datetime(2026, 6, 20), pull, day_id=None)
+
+    ctx = workout_crud.get_session_context(db, user.id, program.program_id)
+    assert ctx["last_session"]["day_id"] is None
+    assert ctx["last_session"]["exercises"][0]["name"] == "Pull Press"
+    assert ctx["suggested_day_id"] == push.day_id
+
+
+def test_backfill_session_days_infers_legacy_days(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push, pull, legs = _ordered_days(db, program.program_id)
+    _insert_session(db, user.id, program.program_id, datetime(2026, 6, 18), legs, day_id=None)
     _insert_session(db, user.id, program.program_id, datetime(2026, 6, 20), push, day_id=None)
 
+    totals = workout_crud.backfill_session_days(db)
+    assert (totals["scanned"], totals["updated"]) == (2, 2)
+
     ctx = workout_crud.get_session_context(db, user.id, program.program_id)
     assert ctx["last_session"]["day_id"] == push.day_id
     assert ctx["last_session"]["day_name"] == "Push"
     assert ctx["suggested_day_id"] == pull.day_id
 
 
+def test_backfill_session_days_breaks_ties_by_earliest_day_and_skips_unmatched(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push, pull, _ = _ordered_days(db, program.program_id)
+    both = workout_model.WorkoutSession(user_id=user.id, program_id=program.program_id,
+                                        session_date=datetime(2026, 6, 20))
+    empty = workout_model.WorkoutSession(user_id=user.id, program_id=program.program_id,
+                                         session_date=datetime(2026, 6, 21))
+    db.add_all([both, empty])
+    db.flush()
+    db.add_all([workout_model.SessionExercise(session_id=both.session_id, exercise_id=pe.exercise_id)
+                for pe in pull.exercises + push.exercises])
+    db.commit()
+
+    totals = workout_crud.backfill_session_days(db)
+    assert (totals["scanned"], totals["updated"]) == (2, 1)
+    db.refresh(both)
+    db.refresh(empty)
+    assert both.day_id == push.day_id
+    assert empty.day_id is None
+
+
+def test_session_day_migration_runs_the_backfill(db):
+    import importlib.util
+    from pathlib import Path
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+    path = next(Path(__file__).resolve().parents[2].glob("alembic/versions/d9e0f1a2b3c4_*.py"))
+    spec = importlib.util.spec_from_file_location("session_day_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push, pull, _ = _ordered_days(db, program.program_id)
+    _insert_session(db, user.id, program.program_id, datetime(2026, 6, 20), push, day_id=None)
+
+    with db.get_bind().connect() as connection, connection.begin():
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+
+    assert workout_crud.get_session_context(db, user.id, program.program_id)["suggested_day_id"] == pull.day_id
+
+
+def test_backfill_session_days_batches_and_resumes(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    days = _ordered_days(db, program.program_id)
+    sessions = [_insert_session(db, user.id, program.program_id, datetime(2026, 6, 1 + n), days[n % 3], day_id=None)
+                for n in range(5)]
+
+    reports = []
+    first = workout_crud.backfill_session_days(db, batch_size=2, progress=reports.append)
+    assert [r["scanned"] for r in reports] == [2, 4, 5]
+    assert first["last_session_id"] == sessions[-1].session_id
+
+    # A run interrupted after the first batch picks up where it left off.
+    db.query(workout_model.WorkoutSession).update({"day_id": None})
+    db.commit()
+    resumed = workout_crud.backfill_session_days(db, after_session_id=reports[0]["last_session_id"])
+    assert resumed["scanned"] == 3
+    assert [s.day_id for s in db.query(workout_model.WorkoutSession).order_by(
+        workout_model.WorkoutSession.session_id)] == [None, None] + [days[n % 3].day_id for n in range(2, 5)]
+
+
+def test_session_context_query_count_is_fixed(db, count_queries):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    _insert_session(db, user.id, program.program_id, datetime(2026, 6, 20), push)
+    user_id, program_id = user.id, program.program_id
+
+    ctx, statements = count_queries(db, lambda: workout_crud.get_session_context(db, user_id, program_id))
+    assert ctx["last_session"]["day_name"] == "Push"
+    assert len(statements) == 3
+
+
 def test_session_context_summary_includes_sets(db):
     user = _make_user(db)
     program = _make_ppl_program(db, user.id)
@@ -373,3 +621,185 @@ def test_last_performance_returns_latest_sets(db):
     assert pe_id in perf
     assert perf[pe_id][0]["weight"] == 100
     assert perf[pe_id][0]["reps"] == 5
+
+
+def test_last_performance_is_one_query_and_picks_the_newest_session(db, count_queries):
+    user = _make_user(db)
+    program, full, data = _big_session(db, user, exercises=6, sets_per_exercise=3)
+    user_id, program_id = user.id, program.program_id
+    workout_crud.log_workout_session(db, data, user_id)
+    newer = data.model_copy(update={"session_date": datetime(2026, 6, 22, 10, 0, 0)})
+    for exercise in newer.exercises:
+        exercise.sets = exercise.sets[:2]
+    workout_crud.log_workout_session(db, newer, user_id)
+
+    perf, statements = count_queries(db, lambda: workout_crud.get_last_performance(db, user_id, program_id))
+
+    assert len(statements) == 1
+    assert len(perf) == 6
+    assert all([s["set_number"] for s in sets] == [1, 2] for sets in perf.values())
+
+
+def test_last_performance_is_cached_until_the_next_logged_session(db, count_queries):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    pe_id = push.exercises[0].program_exercise_id
+    assert workout_crud.get_last_performance(db, user.id, program.program_id) == {}
+
+    _, statements = count_queries(db, lambda: workout_crud.get_last_performance(db, user.id, program.program_id))
+    assert statements == []
+
+    workout_crud.log_workout_session(db, workout_schema.WorkoutSessionCreate(
+        program_id=program.program_id, day_id=push.day_id, session_date=datetime(2026, 6, 20, 10, 0, 0),
+        exercises=[workout_schema.SessionExerciseCreate(
+            program_exercise_id=pe_id, sets=[workout_schema.WorkoutSetCreate(set_number=1, weight=80, reps=6)])],
+        habit_id=None,
+    ), user.id)
+
+    perf = workout_crud.get_last_performance(db, user.id, program.program_id)
+    assert perf[pe_id] == [{"set_number": 1, "weight": 80, "reps": 6, "duration_seconds": None}]
+
+
+# --- strength progression --------------------------------------------------
+
+def _log(db, user_id, program, day, when, weights, reps=5):
+    return workout_crud.log_workout_session(db, workout_schema.WorkoutSessionCreate(
+        program_id=program.program_id, day_id=day.day_id, session_date=when,
+        exercises=[workout_schema.SessionExerciseCreate(
+            program_exercise_id=pe.program_exercise_id,
+            sets=[workout_schema.WorkoutSetCreate(set_number=i + 1, weight=w, reps=reps)
+                  for i, w in enumerate(weights)],
+        ) for pe in day.exercises],
+        habit_id=None,
+    ), user_id)
+
+
+def _progression_rows(db):
+    fields = ("user_id", "exercise_id", "session_date", "top_weight", "top_reps", "e1rm", "volume",
+              "prior_best_weight", "prior_best_e1rm", "pr_weight", "pr_e1rm")
+    rows = db.query(workout_model.StrengthProgression).order_by(
+        workout_model.StrengthProgression.exercise_id, workout_model.StrengthProgression.session_date)
+    return [tuple(getattr(row, f) for f in fields) for row in rows]
+
+
+def test_strength_progression_flags_prs_per_day(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    _log(db, user.id, program, push, datetime(2026, 6, 1, 9), [100, 90])
+    _log(db, user.id, program, push, datetime(2026, 6, 3, 9), [95])
+    _log(db, user.id, program, push, datetime(2026, 6, 5, 9), [105])
+    _log(db, user.id, program, push, datetime(2026, 6, 5, 18), [60])   # same day: volume adds, top set stays
+
+    progression = workout_crud.get_strength_progression(db, user.id)
+
+    (bench,) = progression["exercises"]
+    assert [p["top_weight"] for p in bench["sessions"]] == [100, 95, 105]
+    assert [p["pr_weight"] for p in bench["sessions"]] == [False, False, True]
+    assert bench["latest"]["volume"] == (105 + 60) * 5
+    assert bench["latest"]["top_set"] == "105x5"
+    assert bench["delta_weight"] == 10
+    assert progression["summary"]["total_sessions"] == 4
+    assert "session_history" not in progression
+
+
+def test_incremental_progression_matches_a_rebuild(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push, pull, _ = _ordered_days(db, program.program_id)
+    _log(db, user.id, program, push, datetime(2026, 6, 10, 9), [100, 100])
+    _log(db, user.id, program, pull, datetime(2026, 6, 11, 9), [80])
+    _log(db, user.id, program, push, datetime(2026, 6, 12, 9), [110], reps=3)
+    _log(db, user.id, program, push, datetime(2026, 6, 12, 19), [100], reps=8)   # better e1RM, same day
+    _log(db, user.id, program, push, datetime(2026, 6, 8, 9), [120])             # backfilled before the rest
+    _log(db, user.id, program, pull, datetime(2026, 6, 14, 9), [85])
+
+    incremental = _progression_rows(db)
+    workout_crud.rebuild_strength_progression(db, user.id)
+    db.commit()
+
+    assert _progression_rows(db) == incremental
+    assert len(incremental) == 5
+
+
+def test_strength_progression_reads_history_logged_before_the_table(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    _insert_session(db, user.id, program.program_id, datetime(2026, 6, 20), push)
+
+    progression = workout_crud.get_strength_progression(db, user.id)
+
+    assert progression["exercises"][0]["best_weight"] == 100
+    assert db.query(workout_model.StrengthProgression).count() == 0   # computed, not stored
+    assert not db.new and not db.dirty
+
+    workout_crud.rebuild_strength_progression(db, user.id)
+    db.commit()
+    assert workout_crud.get_strength_progression(db, user.id) == progression
+
+
+def test_strength_trends_weekly_tonnage_by_muscle_group(db):
+    from app.utils.time import utc_today
+    db.add(workout_model.ExerciseMuscleGroup(id=1, name="Chest"))
+    db.commit()
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    this_monday = utc_today() - timedelta(days=utc_today().weekday())
+    _log(db, user.id, program, push, datetime.combine(this_monday, datetime.min.time()), [100, 100])
+    _log(db, user.id, program, push, datetime.combine(this_monday - timedelta(weeks=2), datetime.min.time()), [80])
+
+    trends = workout_crud.get_strength_trends(db, user.id, weeks=3)
+
+    assert [w["week_start"] for w in trends["weeks"]][-1] == this_monday.isoformat()
+    assert [w["volume"] for w in trends["weeks"]] == [400, 0, 1000]
+    assert [w["rolling_volume"] for w in trends["weeks"]] == [400, 400, 1400]
+    assert trends["muscle_groups"] == [{"id": 1, "name": "Chest", "tonnage": [400, 0, 1000], "total": 1400}]
+    with pytest.raises(ValueError):
+        workout_crud.get_strength_trends(db, user.id, weeks=0)
+
+
+# --- session history pages -------------------------------------------------
+
+def test_session_history_pages_newest_first_with_an_opaque_cursor(db):
+    user = _make_user(db)
+    program = _make_ppl_program(db, user.id)
+    push = _ordered_days(db, program.program_id)[0]
+    for day in (1, 2, 3, 4, 5):
+        _log(db, user.id, program, push, datetime(2026, 6, day, 9), [100] * day)
+    _log(db, user.id, program, push, datetime(2026, 6, 5, 9), [50])   # same timestamp: id breaks the tie
+
+    first = workout_crud.get_session_history(db, user.id, limit=4)
+    newest = first["sessions"][0]
+    # A session logged mid-scroll lands ahead of the cursor, not on the next page.
+    _log(db, user.id, program, push, datetime(2026, 6, 6, 9), [100])
+    second = workout_crud.get_session_history(db, user.id, cursor=first["next_cursor"], limit=4)
+
+    assert [s["date"] for s in first["sessions"]] == ["2026-06-05", "2026-06-05", "2026-06-04", "2026-06-03"]
+    assert newest["exercises"][0]["sets"] == [{"weight": 50, "reps": 5, "duration_seconds": None}]
+    assert len(first["sessions"][1]["exercises"][0]["sets"]) == 5
+    assert [s["date"] for s in second["sessions"]] == ["2026-06-02", "2026-06-01"]
+    assert second["next_cursor"] is None
+
+
+def test_session_history_rejects_a_tampered_cursor(db):
+    user = _make_user(db)
+    with pytest.raises(ValueError):
+        workout_crud.get_session_history(db, user.id, cursor="not-a-cursor")
+
+
+def test_workout_progress_pages_session_detail_in_two_queries(db, count_queries):
+    user = _make_user(db)
+    program, full, data = _big_session(db, user, exercises=3, sets_per_exercise=2)
+    workout_crud.log_workout_session(db, data, user.id)
+    user_id = user.id
+
+    page, statements = count_queries(db, lambda: workout_crud.get_workout_progress(db, user_id, limit=10))
+
+    assert len(statements) == 2
+    (session,) = page["sessions"]
+    assert session["program_name"] == "Big"
+    assert [len(ex["sets"]) for ex in session["exercises"]] == [2, 2, 2]
+    assert page["next_cursor"] is None
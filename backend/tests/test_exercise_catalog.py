@@ -0,0 +1,87 @@
+"""
+Tests for app.exercise_catalog: search ranking, visibility, facets and paging
+over the in-memory index, and that CRUD writes land in it without a reload.
+"""
+
+from app.crud import workout_crud
+from app.exercise_catalog import catalog
+from app.models import workout_model, user_model
+from app.schemas import workout_schema
+
+CHEST, LEGS = 1, 2
+BARBELL, DUMBBELL = 1, 2
+
+
+def _seed(db):
+    db.add_all([workout_model.ExerciseMuscleGroup(id=CHEST, name="Chest"),
+                workout_model.ExerciseMuscleGroup(id=LEGS, name="Legs"),
+                workout_model.ExerciseEquipment(id=BARBELL, name="Barbell"),
+                workout_model.ExerciseEquipment(id=DUMBBELL, name="Dumbbell")])
+    db.add_all([user_model.User(id=1, username="a", email="a@example.com"),
+                user_model.User(id=2, username="b", email="b@example.com")])
+    for name, muscle, equipment, owner in [
+        ("Bench Press", CHEST, BARBELL, None),
+        ("Incline Dumbbell Bench Press", CHEST, DUMBBELL, None),
+        ("Dumbbell Fly", CHEST, DUMBBELL, None),
+        ("Back Squat", LEGS, BARBELL, None),
+        ("Bulgarian Split Squat", LEGS, DUMBBELL, None),
+        ("My Press", CHEST, BARBELL, 1),
+        ("Their Press", CHEST, BARBELL, 2),
+    ]:
+        db.add(workout_model.Exercise(
+            name=name, category_id=1, muscle_group_id=muscle, equipment_id=equipment,
+            difficulty_level_id=1, exercise_type_id=1, is_global=owner is None, user_id=owner))
+    db.commit()
+
+
+def _names(page):
+    return [e["name"] for e in page["items"]]
+
+
+def test_search_ranks_prefix_then_word_prefix_then_fuzzy(db):
+    _seed(db)
+    assert _names(catalog.search(db, q="bench"))[:2] == ["Bench Press", "Incline Dumbbell Bench Press"]
+    assert _names(catalog.search(db, q="dumb ben")) == ["Incline Dumbbell Bench Press"]
+    assert _names(catalog.search(db, q="sqaut"))[:2] == ["Back Squat", "Bulgarian Split Squat"]
+
+
+def test_search_sees_the_global_library_and_only_the_callers_own_exercises(db):
+    _seed(db)
+    assert "My Press" in _names(catalog.search(db, user_id=1, q="press"))
+    assert "Their Press" not in _names(catalog.search(db, user_id=1, q="press"))
+    assert "My Press" not in _names(catalog.search(db, q="press"))
+
+
+def test_facets_count_against_the_other_filters_and_pages_slice_the_result(db):
+    _seed(db)
+    page = catalog.search(db, muscle_group_id=CHEST, limit=2)
+
+    assert page["total"] == 3
+    assert _names(page) == ["Bench Press", "Dumbbell Fly"]
+    assert {f["name"]: f["count"] for f in page["facets"]["muscle_group"]} == {"Chest": 3, "Legs": 2}
+    assert {f["name"]: f["count"] for f in page["facets"]["equipment"]} == {"Barbell": 1, "Dumbbell": 2}
+    assert _names(catalog.search(db, muscle_group_id=CHEST, limit=2, offset=2)) == ["Incline Dumbbell Bench Press"]
+
+
+def test_crud_writes_update_the_index_without_reloading_it(db, count_queries):
+    _seed(db)
+    catalog.search(db)
+    created = workout_crud.create_user_exercise(db, 1, workout_schema.ExerciseCreate(
+        name="Cable Crossover", category_id=1, muscle_group_id=CHEST, equipment_id=BARBELL,
+        difficulty_level_id=1, exercise_type_id=1, is_global=False))
+    workout_crud.edit_exercise(db, created.exercise_id, 1, workout_schema.ExerciseUpdate.model_construct(
+        name="Cable Fly"))
+
+    def reads():
+        return (_names(catalog.search(db, user_id=1, q="cable")),
+                [e["name"] for e in workout_crud.get_exercises(db, 1)],
+                [m["name"] for m in catalog.lookup_data(db)["muscleGroups"]])
+
+    (found, listed, groups), statements = count_queries(db, reads)
+    assert found == ["Cable Fly"]
+    assert "Cable Fly" in listed
+    assert groups == ["Chest", "Legs"]
+    assert statements == []
+
+    workout_crud.delete_exercise(db, created.exercise_id, 1)
+    assert _names(catalog.search(db, user_id=1, q="cable")) == []
@@ -0,0 +1,72 @@
+"""
+Tests for app.habit_logic's streak summary: the O(1) incremental updates must
+always agree with a full recompute, and the summary's answers must match the
+from-dates streak functions the rest of the app is built on.
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app import habit_logic
+
+CADENCES = [
+    ("daily", None, None),
+    ("weekdays", [0, 2, 4], None),
+    ("weekdays", [5], None),
+    ("weekly", None, 1),
+    ("weekly", None, 3),
+]
+
+
+def _apply(summary, dates, cadence, op, d):
+    """One edit through the incremental path, falling back to a rebuild like the CRUD does."""
+    if op == "log":
+        dates.add(d)
+        updated = habit_logic.summary_after_log(summary, *cadence, d)
+    else:
+        dates.discard(d)
+        updated = habit_logic.summary_after_unlog(summary, *cadence, d, max(dates) if dates else None)
+    return updated if updated is not None else habit_logic.streak_summary(*cadence, dates)
+
+
+@pytest.mark.parametrize("cadence", CADENCES)
+def test_incremental_summary_matches_full_recompute(cadence):
+    rnd = random.Random(str(cadence))
+    start = date(2025, 1, 6)
+    for _ in range(15):
+        dates, summary = set(), habit_logic.empty_summary()
+        today = start
+        for _ in range(80):
+            today += timedelta(days=rnd.choice([0, 1, 1, 1, 2, 3]))
+            if rnd.random() < 0.7 and today not in dates:
+                summary = _apply(summary, dates, cadence, "log", today)
+            elif rnd.random() < 0.3:
+                backfill = today - timedelta(days=rnd.randint(1, 2))
+                if backfill not in dates:
+                    summary = _apply(summary, dates, cadence, "log", backfill)
+            elif dates and rnd.random() < 0.5:
+                summary = _apply(summary, dates, cadence, "unlog", rnd.choice(
+                    [max(dates)] * 3 + sorted(dates)[-3:]))
+
+            assert summary == habit_logic.streak_summary(*cadence, dates)
+            assert summary["best"] == habit_logic.best_streak(*cadence, dates)
+            assert habit_logic.summary_current_streak(summary, cadence[0], cadence[1], today) == \
+                habit_logic.current_streak(*cadence, dates, today)
+            assert habit_logic.summary_week_count(summary, today) == habit_logic.week_count(dates, today)
+
+
+def test_appending_today_is_incremental():
+    summary = habit_logic.streak_summary("daily", None, None, {date(2025, 3, 1), date(2025, 3, 2)})
+    updated = habit_logic.summary_after_log(summary, "daily", None, None, date(2025, 3, 3))
+    assert (updated["run_length"], updated["best"], updated["total"]) == (3, 3, 3)
+
+
+def test_backfill_into_the_run_needs_a_rebuild():
+    summary = habit_logic.streak_summary("daily", None, None, {date(2025, 3, 1), date(2025, 3, 3)})
+    assert habit_logic.summary_after_log(summary, "daily", None, None, date(2025, 3, 2)) is None
+
+
+def test_cadence_key_tracks_the_cadence_shape():
+    assert habit_logic.cadence_key("weekdays", [4, 0], None) == habit_logic.cadence_key("weekdays", [0, 4], None)
+    assert habit_logic.cadence_key("weekly", None, 3) != habit_logic.cadence_key("weekly", None, 4)
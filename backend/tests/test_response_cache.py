@@ -0,0 +1,84 @@
+"""Tests for app.response_cache: LRU bounds, TTL, per-user invalidation, ETags."""
+from datetime import date
+
+from app.response_cache import ResponseCache, etag_for, etag_matches
+
+DAY = date(2025, 3, 3)
+
+
+def test_hit_returns_the_stored_body_and_etag():
+    cache = ResponseCache()
+    stored = cache.put(1, "today", (), DAY, body=b'{"a":1}')
+    assert cache.get(1, "today", (), DAY) == stored
+    assert stored.etag == etag_for(b'{"a":1}')
+    assert cache.get(1, "today", (), date(2025, 3, 4)) is None   # day rollover misses
+
+
+def test_invalidate_user_drops_only_that_user():
+    cache = ResponseCache()
+    cache.put(1, "today", (), DAY, body=b"1")
+    cache.put(1, "heatmap", (182, None), DAY, body=b"2")
+    cache.put(2, "today", (), DAY, body=b"3")
+
+    cache.invalidate_user(1)
+
+    assert cache.get(1, "today", (), DAY) is None
+    assert cache.get(1, "heatmap", (182, None), DAY) is None
+    assert cache.get(2, "today", (), DAY).body == b"3"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put(1, "today", (), DAY, body=b"1")
+    cache.put(2, "today", (), DAY, body=b"2")
+    cache.get(1, "today", (), DAY)
+    cache.put(3, "today", (), DAY, body=b"3")
+
+    assert len(cache) == 2
+    assert cache.get(2, "today", (), DAY) is None
+    assert cache.get(1, "today", (), DAY) is not None
+    cache.invalidate_user(2)   # its index entry went with the eviction
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache(ttl_seconds=0)
+    cache.put(1, "today", (), DAY, body=b"1")
+    assert cache.get(1, "today", (), DAY) is None
+    assert len(cache) == 0
+
+
+def test_etag_matching_is_weak_and_accepts_lists():
+    etag = etag_for(b"x")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_a_write_during_compute_keeps_the_stale_body_out():
+    cache = ResponseCache()
+    generation = cache.generation(1)          # a GET starts computing
+    cache.invalidate_user(1)                  # a write commits meanwhile
+    cache.put(1, "today", (), DAY, body=b"before the write", generation=generation)
+
+    assert cache.get(1, "today", (), DAY) is None
+    cache.put(1, "today", (), DAY, body=b"after", generation=cache.generation(1))
+    assert cache.get(1, "today", (), DAY).body == b"after"
+
+
+def test_other_users_writes_dont_block_the_put():
+    cache = ResponseCache()
+    generation = cache.generation(1)
+    cache.invalidate_user(2)
+    cache.put(1, "today", (), DAY, body=b"1", generation=generation)
+    assert cache.get(1, "today", (), DAY).body == b"1"
+
+
+def test_forgotten_invalidations_err_on_not_storing():
+    cache = ResponseCache(max_entries=1)
+    generation = cache.generation(1)
+    cache.invalidate_user(1)
+    cache.invalidate_user(2)                  # evicts user 1's stamp
+    cache.put(1, "today", (), DAY, body=b"stale", generation=generation)
+    assert cache.get(1, "today", (), DAY) is None
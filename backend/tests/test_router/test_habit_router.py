@@ -111,3 +111,57 @@ def test_patch_rejects_another_users_habit(client, db, auth):
 def test_patch_requires_authentication(client, db, auth):
     habit = _habit(db)
     assert client.patch(f"/habits/{habit.id}", json={"name": "x"}).status_code == 401
+
+
+def test_heatmap_by_habit_revalidates_with_etag(client, db, auth):
+    _habit(db)
+
+    first = client.get("/habits/heatmap-by-habit?encoding=rle", headers=auth)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get("/habits/heatmap-by-habit?encoding=rle", headers={**auth, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+    assert client.get("/habits/heatmap-by-habit?encoding=png", headers=auth).status_code == 400
+
+
+def test_read_endpoints_are_cached_until_a_habit_write(client, db, auth):
+    habit = _habit(db, cadence_type="daily", times_per_week=None)
+
+    first = client.get("/habits/stats-overview", headers=auth)
+    assert first.json()["habits"][0]["total_completions"] == 0
+    assert client.get("/habits/stats-overview", headers=auth).headers["ETag"] == first.headers["ETag"]
+    today = client.get("/today", headers=auth)
+    assert not today.json()["habits_today"][0]["completed_today"]
+
+    assert client.post(f"/habits/{habit.id}/logs", headers=auth, json={}).status_code == 200
+
+    after = client.get("/habits/stats-overview", headers={**auth, "If-None-Match": first.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()["habits"][0]["total_completions"] == 1
+    assert client.get("/today", headers=auth).json()["habits_today"][0]["completed_today"]
+
+
+def test_write_landing_during_a_read_is_not_hidden_by_the_cache(client, db, auth, monkeypatch):
+    from app.crud import habit_crud
+    _habit(db)
+    user_id = db.query(user_model.User.id).scalar()
+    get_today, computed = habit_crud.get_today, []
+
+    def today_then_a_write(*args, **kwargs):
+        body = get_today(*args, **kwargs)
+        computed.append(body)
+        if len(computed) == 1:
+            habit_crud.invalidate_user_cache(user_id)   # a log commits while this GET computes
+        return body
+
+    monkeypatch.setattr(habit_crud, "get_today", today_then_a_write)
+    first = client.get("/today", headers=auth)
+    second = client.get("/today", headers={**auth, "If-None-Match": first.headers["ETag"]})
+
+    assert len(computed) == 2              # the pre-write body was never cached
+    assert second.status_code == 304       # (same body here; a real write would change it)
+    client.get("/today", headers=auth)
+    assert len(computed) == 2              # and the post-write one was
@@ -9,6 +9,7 @@ from app.dependencies import get_db
 from app.auth.auth_utils import generate_tokens
 from app.config import Config
 from app.models import user_model
+from app.models.strava_model import StravaImportJob
 
 
 @pytest.fixture
@@ -92,3 +93,13 @@ def test_webhook_event_always_acks(client, db):
         "owner_id": 999, "object_id": 1})
     assert response.status_code == 200
     assert response.json() == {"ok": True}
+    assert db.query(StravaImportJob).filter(StravaImportJob.activity_id == 1).count() == 1
+
+
+def test_webhook_event_only_queues_activity_creates(client, db):
+    for event in ({"object_type": "activity", "aspect_type": "update", "owner_id": 999, "object_id": 2},
+                  {"object_type": "athlete", "aspect_type": "update", "owner_id": 999, "object_id": 999},
+                  {"object_type": "activity", "aspect_type": "create", "owner_id": "x", "object_id": 3}):
+        assert client.post("/strava/webhook", json=event).json() == {"ok": True}
+    assert client.post("/strava/webhook", content=b"not json").status_code == 200
+    assert db.query(StravaImportJob).count() == 0
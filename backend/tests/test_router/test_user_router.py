@@ -58,3 +58,16 @@ def test_users_me_requires_authentication(client):
 def test_users_me_rejects_invalid_token(client):
     response = client.get("/users/me", headers={"Authorization": "Bearer not-a-real-token"})
     assert response.status_code == 401
+
+
+def test_timezone_update_refreshes_the_cached_zone(client, db):
+    from app.utils.time import get_user_timezone
+    user = _make_user(db)
+    access_token, _ = generate_tokens(user)
+    assert get_user_timezone(db, 1) == "UTC"
+
+    response = client.put("/users/me/timezone", json={"timezone": "Asia/Tokyo"},
+                          headers={"Authorization": f"Bearer {access_token}"})
+
+    assert response.status_code == 200
+    assert get_user_timezone(db, 1) == "Asia/Tokyo"
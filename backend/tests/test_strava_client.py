@@ -0,0 +1,93 @@
+"""Strava client against the fake API: the pooled connection, concurrent page
+walks, and the rate budget read from Strava's headers."""
+import calendar
+from datetime import date, timedelta
+
+import pytest
+
+from app import strava_client
+from app.strava_client import RateBudget, StravaError
+from tests.fake_strava import FakeStrava, activity
+
+ATHLETE = 999
+TOKEN = FakeStrava.token_for(ATHLETE)
+
+
+def _history(fake, count):
+    today = date.today()
+    fake.add(ATHLETE, *(activity(n, today - timedelta(days=n % 300)) for n in range(1, count + 1)))
+
+
+def test_iter_activities_walks_every_page(fake_strava):
+    _history(fake_strava, 450)
+
+    chunks = list(strava_client.iter_activities(TOKEN, per_page=100, concurrency=2))
+
+    ids = [a["id"] for chunk in chunks for a in chunk]
+    assert sorted(ids) == list(range(1, 451))
+    assert [len(c) for c in chunks] == [200, 200, 50]
+    assert fake_strava.count("/api/v3/athlete/activities") == 6   # 5 pages + one past the end
+
+
+def test_iter_activities_stops_at_a_short_first_page(fake_strava):
+    _history(fake_strava, 3)
+    assert [len(c) for c in strava_client.iter_activities(TOKEN, per_page=100, concurrency=4)] == [3]
+    assert fake_strava.count("/api/v3/athlete/activities") == 4
+
+
+def test_iter_activities_passes_the_after_cursor(fake_strava):
+    _history(fake_strava, 40)
+    after = calendar.timegm((date.today() - timedelta(days=10)).timetuple())   # activities are at 07:00Z
+    ids = [a["id"] for chunk in strava_client.iter_activities(TOKEN, after_epoch=after) for a in chunk]
+    assert sorted(ids) == list(range(1, 11))
+    assert all(params["after"] == str(after) for _, _, params in fake_strava.requests)
+
+
+def test_calls_share_pooled_connections(fake_strava):
+    fake_strava.add(ATHLETE, activity(1, date.today()))
+    for _ in range(10):
+        strava_client.get_activity(TOKEN, 1)
+    assert len(fake_strava.connections) == 1
+
+
+def test_walk_is_capped_by_the_rate_budget(fake_strava):
+    _history(fake_strava, 300)
+    fake_strava.limits = (100, 1000)
+    fake_strava.usage = [86, 0]       # 14 left this window; the walk keeps RATE_LIMIT_RESERVE of them
+
+    walk = strava_client.iter_activities(TOKEN, per_page=50, concurrency=4)
+    assert len(next(walk)) == 200     # first wave sized from the default limits
+    with pytest.raises(StravaError) as excinfo:
+        list(walk)
+    assert excinfo.value.status_code == 429
+    assert fake_strava.count("/api/v3/athlete/activities") == 4
+
+
+def test_429_from_strava_spends_the_window(fake_strava):
+    fake_strava.fail("/api/v3/activities", 429)
+    with pytest.raises(StravaError) as excinfo:
+        strava_client.get_activity(TOKEN, 1)
+    assert excinfo.value.retryable
+    assert strava_client.api.budget.headroom() == 0
+
+
+def test_budget_windows_reset_on_strava_boundaries():
+    now = [1_700_000_000 - 1_700_000_000 % 900 + 890]   # 10s before a quarter hour
+    budget = RateBudget(limits=(20, 100), reserve=5, clock=lambda: now[0])
+    budget.observe({"X-RateLimit-Limit": "20,100", "X-RateLimit-Usage": "20,40"}, 200)
+    assert budget.headroom() == 0
+    with pytest.raises(StravaError):
+        budget.take()
+    assert budget.seconds_until_reset() == 10
+
+    now[0] += 10
+    assert budget.headroom() == 15            # 15-minute window rolled; 60 left today
+    budget.observe({"X-RateLimit-Limit": "20,100", "X-RateLimit-Usage": "3,99"}, 200)
+    assert budget.headroom() == 0             # daily limit is now the binding one
+
+
+def test_read_limits_win_when_present():
+    budget = RateBudget(reserve=0)
+    budget.observe({"X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "10,10",
+                    "X-ReadRateLimit-Limit": "100,1000", "X-ReadRateLimit-Usage": "10,10"}, 200)
+    assert budget.headroom() == 90
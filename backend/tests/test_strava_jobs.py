@@ -0,0 +1,170 @@
+"""Webhook import queue: enqueue dedup, claim/lease, retry with backoff, the
+dead-letter list, and a worker pool draining real jobs against the fake Strava
+API (tests/fake_strava.py)."""
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app import strava_jobs
+from app.models.habit_model import HabitLog
+from app.models.strava_model import StravaConnection, StravaImportJob
+from app.utils.time import utc_now
+from tests.fake_strava import FakeStrava, activity
+from tests.strava_seed import ATHLETE, seed_athlete
+
+
+@pytest.fixture
+def habit_id(db):
+    return seed_athlete(db).target_habit_id
+
+
+def _job(db, activity_id):
+    return db.query(StravaImportJob).filter(StravaImportJob.activity_id == activity_id).one()
+
+
+def _make_due(db, activity_id):
+    job = _job(db, activity_id)
+    job.next_attempt_at = utc_now() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_enqueue_collapses_redelivered_events(db):
+    assert strava_jobs.enqueue(db, ATHLETE, 1) is True
+    assert strava_jobs.enqueue(db, ATHLETE, 1) is False
+    assert db.query(StravaImportJob).count() == 1
+    assert _job(db, 1).status == strava_jobs.PENDING
+
+
+def test_work_once_imports_through_the_api(db, habit_id, fake_strava):
+    fake_strava.add(ATHLETE, activity(1, date.today()))
+    strava_jobs.enqueue(db, ATHLETE, 1)
+
+    assert strava_jobs.work_once(db) == strava_jobs.DONE
+    assert strava_jobs.work_once(db) is None
+
+    job = _job(db, 1)
+    assert (job.status, job.attempts, job.locked_until) == (strava_jobs.DONE, 1, None)
+    assert db.query(HabitLog).filter(HabitLog.habit_id == habit_id).count() == 1
+    assert fake_strava.count("/api/v3/activities/1") == 1
+
+
+def test_expired_token_is_refreshed_before_fetching(db, fake_strava):
+    habit_id = seed_athlete(db, expires_at=0).target_habit_id
+    fake_strava.add(ATHLETE, activity(1, date.today()))
+    strava_jobs.enqueue(db, ATHLETE, 1)
+
+    assert strava_jobs.work_once(db) == strava_jobs.DONE
+    assert fake_strava.refreshes == 1
+    assert db.query(StravaConnection).one().access_token == FakeStrava.token_for(ATHLETE, 1)
+    assert db.query(HabitLog).filter(HabitLog.habit_id == habit_id).count() == 1
+
+
+def test_server_errors_retry_with_backoff(db, habit_id, fake_strava):
+    fake_strava.add(ATHLETE, activity(1, date.today()))
+    fake_strava.fail("/api/v3/activities", 503)
+    strava_jobs.enqueue(db, ATHLETE, 1)
+
+    assert strava_jobs.work_once(db) == strava_jobs.PENDING
+    job = _job(db, 1)
+    assert job.attempts == 1
+    assert "503" in job.last_error
+    assert strava_jobs.work_once(db) is None          # backing off, not due yet
+
+    _make_due(db, 1)
+    assert strava_jobs.work_once(db) == strava_jobs.DONE
+    assert _job(db, 1).attempts == 2
+    assert db.query(HabitLog).filter(HabitLog.habit_id == habit_id).count() == 1
+
+
+def test_backoff_grows_and_is_capped():
+    delays = [strava_jobs.backoff_seconds(n) for n in range(1, 12)]
+    assert delays[0] <= strava_jobs.BACKOFF_BASE_SECONDS
+    assert delays[3] > delays[0]
+    assert max(delays) <= strava_jobs.BACKOFF_MAX_SECONDS
+
+
+def test_not_found_goes_straight_to_dead_letter_and_requeues(db, habit_id, fake_strava):
+    strava_jobs.enqueue(db, ATHLETE, 404)
+
+    assert strava_jobs.work_once(db) == strava_jobs.DEAD
+    dead = strava_jobs.dead_jobs(db)
+    assert [j.activity_id for j in dead] == [404]
+    assert "404" in dead[0].last_error
+
+    fake_strava.add(ATHLETE, activity(404, date.today()))
+    assert strava_jobs.requeue(db) == 1
+    assert strava_jobs.work_once(db) == strava_jobs.DONE
+    assert strava_jobs.dead_jobs(db) == []
+
+
+def test_gives_up_after_max_attempts(db, habit_id, fake_strava, monkeypatch):
+    monkeypatch.setattr(strava_jobs, "MAX_ATTEMPTS", 2)
+    fake_strava.fail("/api/v3/activities", 500, times=5)
+    strava_jobs.enqueue(db, ATHLETE, 1)
+
+    assert strava_jobs.work_once(db) == strava_jobs.PENDING
+    _make_due(db, 1)
+    assert strava_jobs.work_once(db) == strava_jobs.DEAD
+    assert _job(db, 1).attempts == 2
+
+
+def test_athlete_without_connection_is_dropped(db, fake_strava):
+    strava_jobs.enqueue(db, 12345, 1)
+    assert strava_jobs.work_once(db) == strava_jobs.DONE
+    assert fake_strava.requests == []
+
+
+def test_expired_lease_is_reclaimed(db, habit_id, fake_strava):
+    fake_strava.add(ATHLETE, activity(1, date.today()))
+    strava_jobs.enqueue(db, ATHLETE, 1)
+    assert strava_jobs.claim_next(db) is not None      # this worker "dies" holding the lease
+    assert strava_jobs.claim_next(db) is None
+
+    job = _job(db, 1)
+    job.locked_until = utc_now() - timedelta(seconds=1)
+    db.commit()
+    assert strava_jobs.work_once(db) == strava_jobs.DONE
+    assert _job(db, 1).attempts == 2
+
+
+def test_expired_lease_at_max_attempts_goes_dead(db, habit_id, fake_strava):
+    fake_strava.add(ATHLETE, activity(1, date.today()), activity(2, date.today()))
+    strava_jobs.enqueue(db, ATHLETE, 1)
+    job = _job(db, 1)
+    job.status, job.attempts = strava_jobs.RUNNING, strava_jobs.MAX_ATTEMPTS   # its workers keep dying
+    job.locked_until = utc_now() - timedelta(seconds=1)
+    db.commit()
+    strava_jobs.enqueue(db, ATHLETE, 2)
+
+    assert strava_jobs.work_once(db) == strava_jobs.DONE      # job 2; job 1 isn't re-leased
+    job = _job(db, 1)
+    assert (job.status, job.attempts, job.locked_until) == (strava_jobs.DEAD, strava_jobs.MAX_ATTEMPTS, None)
+    assert "lease expired" in job.last_error and job.finished_at is not None
+    assert strava_jobs.dead_jobs(db) == [job]
+
+
+def test_worker_pool_drains_the_queue(file_sessions, fake_strava):
+    with file_sessions() as db:
+        habit_id = seed_athlete(db).target_habit_id
+        today = date.today()
+        fake_strava.add(ATHLETE, *(activity(n, today - timedelta(days=n)) for n in range(1, 7)))
+        for n in range(1, 7):
+            strava_jobs.enqueue(db, ATHLETE, n)
+
+    pool = strava_jobs.WorkerPool(2, poll_seconds=0.05, session_factory=file_sessions)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with file_sessions() as db:
+                if db.query(StravaImportJob).filter(StravaImportJob.status != strava_jobs.DONE).count() == 0:
+                    break
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    with file_sessions() as db:
+        assert {j.status for j in db.query(StravaImportJob)} == {strava_jobs.DONE}
+        assert db.query(HabitLog).filter(HabitLog.habit_id == habit_id).count() == 6
+    assert fake_strava.count("/api/v3/activities/") == 6
@@ -0,0 +1,121 @@
+"""Scheduled Strava sync runner, against the fake Strava API on a file database
+(the runner's threads each open their own session)."""
+import calendar
+from datetime import date, timedelta
+
+from app import strava_sync
+from app.crud import strava_crud
+from app.models.strava_model import StravaActivityImport, StravaConnection
+from app.strava_sync import SyncRunner
+from app.utils.time import utc_now
+from tests.fake_strava import activity
+from tests.strava_seed import seed_athlete
+
+
+def _athletes(file_sessions, fake, count, runs=3):
+    """`count` users, each with a Run habit and a Strava connection (athlete
+    1000 + n) and `runs` activities on the fake API. Returns connection ids."""
+    today = date.today()
+    ids = []
+    with file_sessions() as db:
+        for n in range(count):
+            athlete = 1000 + n
+            ids.append(seed_athlete(db, athlete, username=f"runner{n}").id)
+            fake.add(athlete, *(activity(athlete * 100 + d, today - timedelta(days=d)) for d in range(1, runs + 1)))
+    return ids
+
+
+def _connections(file_sessions):
+    with file_sessions() as db:
+        return {c.id: c for c in db.query(StravaConnection).order_by(StravaConnection.id)}
+
+
+def test_run_syncs_every_stale_connection_in_batches(file_sessions, fake_strava):
+    ids = _athletes(file_sessions, fake_strava, 7)
+
+    totals = SyncRunner(concurrency=3, batch_size=2, session_factory=file_sessions).run_once()
+
+    assert (totals["connections"], totals["ok"], totals["imported"]) == (7, 7, 21)
+    assert not totals["budget_spent"]
+    conns = _connections(file_sessions)
+    for conn_id in ids:
+        conn = conns[conn_id]
+        assert conn.last_sync_status == "ok" and conn.last_sync_imported == 3
+        assert conn.last_synced_at is not None and conn.last_sync_duration_ms is not None
+        newest = calendar.timegm((date.today() - timedelta(days=1)).timetuple()) + 7 * 3600
+        assert conn.sync_cursor == newest
+    with file_sessions() as db:
+        assert db.query(StravaActivityImport).count() == 21
+
+
+def test_fresh_and_targetless_connections_are_left_alone(file_sessions, fake_strava):
+    fresh, targetless, stale = _athletes(file_sessions, fake_strava, 3)
+    with file_sessions() as db:
+        db.get(StravaConnection, fresh).last_synced_at = utc_now()
+        db.get(StravaConnection, targetless).target_habit_id = None
+        db.get(StravaConnection, stale).last_synced_at = utc_now() - timedelta(hours=7)
+        db.commit()
+
+    totals = SyncRunner(session_factory=file_sessions).run_once()
+
+    assert (totals["connections"], totals["ok"]) == (1, 1)
+    assert _connections(file_sessions)[stale].last_sync_status == "ok"
+    assert SyncRunner(session_factory=file_sessions).run_once()["connections"] == 0
+
+
+def test_next_sync_asks_only_for_activities_after_the_cursor(file_sessions, fake_strava):
+    (conn_id,) = _athletes(file_sessions, fake_strava, 1)
+    SyncRunner(session_factory=file_sessions).run_once()
+    cursor = _connections(file_sessions)[conn_id].sync_cursor
+    fake_strava.requests.clear()
+
+    fake_strava.add(1000, activity(1, date.today()))
+    totals = SyncRunner(stale_after=0, session_factory=file_sessions).run_once()
+
+    assert totals["imported"] == 1
+    afters = {params["after"] for _, path, params in fake_strava.requests if path.endswith("/athlete/activities")}
+    assert afters == {str(cursor - strava_crud.CURSOR_OVERLAP_SECONDS)}
+    assert _connections(file_sessions)[conn_id].sync_cursor > cursor
+
+
+def test_failing_connection_records_the_error_and_backs_off(file_sessions, fake_strava):
+    broken, healthy = _athletes(file_sessions, fake_strava, 2)
+    with file_sessions() as db:
+        conn = db.get(StravaConnection, broken)
+        conn.expires_at, conn.refresh_token = 0, "revoked"     # the refresh is rejected
+        db.commit()
+
+    totals = SyncRunner(session_factory=file_sessions).run_once()
+
+    assert (totals["ok"], totals["error"]) == (1, 1)
+    conn = _connections(file_sessions)[broken]
+    assert conn.last_sync_status == "error" and "401" in conn.last_sync_error
+    assert conn.sync_failures == 1 and conn.next_sync_at is not None
+    assert conn.last_synced_at is None
+    assert SyncRunner(stale_after=0, session_factory=file_sessions).run_once()["connections"] == 1   # healthy only
+
+
+def test_run_stops_when_the_rate_budget_is_spent(file_sessions, fake_strava):
+    _athletes(file_sessions, fake_strava, 12)
+    fake_strava.limits = (40, 1000)
+    fake_strava.usage = [10, 0]
+
+    totals = SyncRunner(concurrency=1, batch_size=4, session_factory=file_sessions).run_once()
+
+    assert totals["budget_spent"]
+    assert 0 < totals["ok"] < 12
+    assert fake_strava.usage[0] <= 40
+    unsynced = [c for c in _connections(file_sessions).values() if c.last_synced_at is None]
+    assert len(unsynced) == 12 - totals["ok"]       # still stale: the next run picks them up
+    assert all(c.sync_failures == 0 for c in unsynced)
+
+
+def test_webhook_import_leaves_the_sync_schedule_alone(file_sessions, fake_strava):
+    (conn_id,) = _athletes(file_sessions, fake_strava, 1)
+    with file_sessions() as db:
+        strava_crud.import_one_activity(db, db.get(StravaConnection, conn_id), 100001)
+
+    conn = _connections(file_sessions)[conn_id]
+    assert conn.last_synced_at is None and conn.sync_cursor is None
+    with file_sessions() as db:
+        assert strava_sync.stale_connection_ids(db, utc_now()) == [conn_id]
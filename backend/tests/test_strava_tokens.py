@@ -0,0 +1,105 @@
+"""Strava token cache and refresh coordination, against the fake Strava API."""
+import threading
+import time
+
+import pytest
+
+from app import strava_client, strava_tokens
+from app.crud import strava_crud
+from app.models.strava_model import StravaConnection
+from tests.fake_strava import FakeStrava
+from tests.strava_seed import ATHLETE, seed_athlete
+
+
+def test_valid_token_is_cached_after_the_first_read(db, fake_strava):
+    conn = seed_athlete(db, expires_at=int(time.time()) + 3600)
+
+    assert strava_crud.ensure_fresh_token(db, conn) == FakeStrava.token_for(ATHLETE)
+    assert strava_crud.ensure_fresh_token(db, conn) == FakeStrava.token_for(ATHLETE)
+
+    assert fake_strava.refreshes == 0
+    assert strava_tokens.stats()["hits"] == 1
+
+
+def test_expired_token_refreshes_once_then_serves_from_cache(db, fake_strava):
+    conn = seed_athlete(db, expires_at=0)
+
+    tokens = {strava_crud.ensure_fresh_token(db, conn) for _ in range(3)}
+
+    assert tokens == {FakeStrava.token_for(ATHLETE, 1)}
+    assert fake_strava.refreshes == 1
+    stored = db.get(StravaConnection, conn.id)
+    assert (stored.access_token, stored.refresh_token) == (FakeStrava.token_for(ATHLETE, 1), f"refresh-{ATHLETE}-1")
+
+
+def test_cache_expires_with_the_refresh_buffer(db, fake_strava):
+    conn = seed_athlete(db, expires_at=0)
+    strava_tokens.store(conn.id, "old", int(time.time()) + strava_client.TOKEN_EXPIRY_BUFFER_SECONDS - 1)
+
+    assert strava_crud.ensure_fresh_token(db, conn) == FakeStrava.token_for(ATHLETE, 1)
+
+
+def test_concurrent_callers_share_one_refresh(file_sessions, fake_strava):
+    with file_sessions() as db:
+        conn_id = seed_athlete(db, expires_at=0).id
+    fake_strava.latency = 0.2
+    results, errors = [], []
+
+    def worker():
+        with file_sessions() as db:
+            try:
+                results.append(strava_crud.ensure_fresh_token(db, db.get(StravaConnection, conn_id)))
+            except Exception as exc:  # surfaced below
+                errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == [FakeStrava.token_for(ATHLETE, 1)] * 8
+    assert fake_strava.refreshes == 1
+
+
+def test_refresh_committed_by_another_process_is_reused(file_sessions, fake_strava):
+    with file_sessions() as mine, file_sessions() as theirs:
+        conn = seed_athlete(mine, expires_at=0)
+        stale = mine.get(StravaConnection, conn.id)
+        assert stale.expires_at == 0               # loaded before the other worker refreshed
+
+        row = theirs.get(StravaConnection, conn.id)
+        row.access_token, row.expires_at = "refreshed-elsewhere", int(time.time()) + 6 * 3600
+        theirs.commit()
+
+        assert strava_crud.ensure_fresh_token(mine, stale) == "refreshed-elsewhere"
+    assert fake_strava.refreshes == 0
+
+
+def test_failed_refresh_is_not_cached(db, fake_strava):
+    conn = seed_athlete(db, expires_at=0)
+    fake_strava.fail("/oauth/token", 503)
+
+    with pytest.raises(strava_client.StravaError):
+        strava_crud.ensure_fresh_token(db, conn)
+    assert strava_tokens.stats()["entries"] == 0
+    assert strava_crud.ensure_fresh_token(db, conn) == FakeStrava.token_for(ATHLETE, 1)
+
+
+def test_rejected_token_is_forgotten(db, fake_strava):
+    conn = seed_athlete(db, expires_at=int(time.time()) + 3600)
+    strava_tokens.store(conn.id, "revoked", int(time.time()) + 3600)
+
+    with pytest.raises(strava_client.StravaError):
+        strava_crud.import_one_activity(db, conn, 1)
+    assert strava_tokens.cached(conn.id) is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(strava_tokens, "TOKEN_CACHE_MAX_ENTRIES", 3)
+    for connection_id in range(5):
+        strava_tokens.store(connection_id, f"t{connection_id}", int(time.time()) + 3600)
+    assert strava_tokens.cached(0) is None
+    assert strava_tokens.cached(4) == "t4"
+    assert strava_tokens.stats()["evictions"] == 2
@@ -0,0 +1,107 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import strength_analytics as sa
+from app.crud import workout_crud
+
+
+def _sets(*rows):
+    """(exercise_id, entry_id, 'YYYY-MM-DD', weight, reps[, muscle_group_id]) -> SetColumns."""
+    return sa.columns_from_rows([
+        (ex, entry, datetime.fromisoformat(day), weight, reps, rest[0] if rest else 1)
+        for ex, entry, day, weight, reps, *rest in rows
+    ])
+
+
+def test_daily_points_top_set_e1rm_and_volume():
+    points = sa.daily_points(_sets(
+        (1, 10, "2026-06-01", 100, 5),
+        (1, 10, "2026-06-01", 100, 3),
+        (1, 10, "2026-06-01", 90, 8),
+    ))
+    assert points.top_weight.tolist() == [100]
+    assert points.top_reps.tolist() == [5]
+    assert points.e1rm.tolist() == [116.7]      # 100 x 5 beats 90 x 8 (114.0)
+    assert points.volume.tolist() == [1520]
+
+
+def test_daily_points_two_entries_on_one_day_keep_best_and_add_volume():
+    points = sa.daily_points(_sets(
+        (1, 10, "2026-06-01", 100, 5),
+        (1, 11, "2026-06-01", 105, 3),
+    ))
+    assert len(points.day) == 1
+    assert (points.top_weight[0], points.top_reps[0]) == (100, 5)   # 116.7 > 115.5
+    assert points.volume[0] == 500 + 315
+
+
+def test_daily_points_pr_flags_beat_every_earlier_day():
+    points = sa.daily_points(_sets(
+        (1, 10, "2026-06-01", 100, 5),
+        (1, 11, "2026-06-03", 100, 5),      # tie: not a PR
+        (1, 12, "2026-06-05", 95, 10),      # e1RM PR only
+        (1, 13, "2026-06-07", 105, 1),      # weight PR only
+        (2, 14, "2026-06-07", 40, 10),      # other exercise: its own baseline
+    ))
+    assert points.exercise_id.tolist() == [1, 1, 1, 1, 2]
+    assert points.pr_weight.tolist() == [False, False, False, True, False]
+    assert points.pr_e1rm.tolist() == [False, False, True, False, False]
+    rows = sa.progression_rows(7, points)
+    assert rows[0]["prior_best_weight"] is None
+    assert rows[3]["prior_best_weight"] == 100
+    assert rows[3]["session_date"] == date(2026, 6, 7)
+
+
+def test_daily_points_match_incremental_helpers():
+    rng = random.Random(4)
+    raw = []
+    for entry in range(400):
+        day = (date(2026, 1, 1) + timedelta(days=rng.randrange(120))).isoformat()
+        exercise = rng.randrange(1, 6)
+        raw.extend((exercise, entry, day, rng.choice([60, 62.5, 94.5, 100, 102.5, 120]), rng.randrange(1, 15))
+                   for _ in range(rng.randrange(1, 5)))
+
+    days = {}
+    for exercise, entry, day in {(r[0], r[1], r[2]) for r in raw}:
+        point = workout_crud._strength_point([(w, r) for ex, en, _, w, r in raw if en == entry])
+        key = (exercise, day)
+        days[key] = workout_crud._merge_points(days[key], point) if key in days else point
+    expected, bests = [], {}
+    for (exercise, day), point in sorted(days.items()):
+        prior_weight, prior_e1rm = bests.get(exercise, (None, None))
+        expected.append(workout_crud._with_priors(point, prior_weight, prior_e1rm))
+        bests[exercise] = (workout_crud._running_best(prior_weight, point["top_weight"]),
+                           workout_crud._running_best(prior_e1rm, point["e1rm"]))
+
+    rows = sa.progression_rows(1, sa.daily_points(_sets(*raw)))
+    assert [{k: row[k] for k in expected[0]} for row in rows] == expected
+
+
+def test_weekly_trends_rolling_volume_and_muscle_groups():
+    sets = _sets(
+        (1, 1, "2026-05-25", 100, 10, 3),   # Monday, the week before the window
+        (1, 2, "2026-06-03", 100, 10, 3),   # Wednesday of week 1
+        (2, 3, "2026-06-07", 50, 10, 4),    # Sunday of week 1
+        (1, 4, "2026-06-15", 100, 5, 3),    # week 3
+    )
+    trends = sa.weekly_trends(sets, date(2026, 6, 1), date(2026, 6, 17))
+    assert trends["week_starts"] == [date(2026, 6, 1), date(2026, 6, 8), date(2026, 6, 15)]
+    assert trends["volume"] == [1500, 0, 500]
+    assert trends["rolling_volume"] == [2500, 2500, 3000]
+    assert trends["muscle_groups"] == {3: [1000, 0, 500], 4: [500, 0, 0]}
+    assert sa.trends_since(date(2026, 6, 3)) == date(2026, 5, 11)
+
+
+def test_weekly_trends_rejects_inverted_window():
+    with pytest.raises(ValueError):
+        sa.weekly_trends(_sets(), date(2026, 6, 8), date(2026, 6, 1))
+
+
+def test_empty_history():
+    points = sa.daily_points(_sets())
+    assert sa.progression_rows(1, points) == []
+    trends = sa.weekly_trends(_sets(), date(2026, 6, 1), date(2026, 6, 8))
+    assert trends["volume"] == [0, 0]
+    assert trends["muscle_groups"] == {}
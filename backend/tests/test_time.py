@@ -0,0 +1,44 @@
+"""Tests for app.utils.time's timezone resolution: loaded users and the
+user_id cache must answer without touching the database."""
+from datetime import datetime
+
+import pytz
+
+from app.models.user_model import User
+from app.utils import time as time_utils
+
+
+def _user(db, tz="Pacific/Kiritimati"):
+    user = User(username="tino", email="tino@example.com", timezone=tz, player_xp=0)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def test_loaded_user_resolves_without_a_query(db, count_queries):
+    user = _user(db)
+    today, statements = count_queries(db, lambda: time_utils.get_user_today(db, user))
+    assert today == datetime.now(pytz.timezone("Pacific/Kiritimati")).date()
+    assert statements == []
+
+
+def test_user_id_is_cached_until_forgotten(db, count_queries):
+    user = _user(db)
+    user_id = user.id
+    tz, statements = count_queries(db, lambda: time_utils.get_user_timezone(db, user_id))
+    assert (tz, len(statements)) == ("Pacific/Kiritimati", 1)
+    tz, statements = count_queries(db, lambda: time_utils.get_user_timezone(db, user_id))
+    assert (tz, statements) == ("Pacific/Kiritimati", [])
+
+    user.timezone = "America/New_York"
+    db.commit()
+    assert time_utils.get_user_timezone(db, user_id) == "Pacific/Kiritimati"   # stale until told
+    time_utils.forget_user_timezone(user_id)
+    assert time_utils.get_user_timezone(db, user_id) == "America/New_York"
+
+
+def test_tzinfo_is_memoized_and_falls_back_to_utc():
+    assert time_utils.get_tzinfo("Europe/Paris") is time_utils.get_tzinfo("Europe/Paris")
+    assert time_utils.get_tzinfo("Not/AZone") is pytz.UTC
+    assert time_utils.get_tzinfo(None) is pytz.UTC
@@ -0,0 +1,76 @@
+"""Tests for app.auth.user_cache behind get_current_user: hits skip the users
+query, rebuild a session-attached user, and respect invalidation."""
+import pytest
+from fastapi import HTTPException
+
+from app.auth import user_cache
+from app.auth.auth_utils import generate_tokens, get_current_user
+from app.models.user_model import User, UserRole
+
+
+@pytest.fixture
+def user(db):
+    row = User(username="tino", email="tino@example.com", timezone="Asia/Tokyo", player_xp=40,
+               feature_flags={"click_tracking": True})
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    return row
+
+
+def test_second_request_skips_the_users_query(db, user, count_queries):
+    token, _ = generate_tokens(user)
+    get_current_user(db, token)
+    db.expunge_all()   # a new request gets a fresh session
+
+    cached, statements = count_queries(db, lambda: get_current_user(db, token))
+
+    assert statements == []
+    assert (cached.id, cached.timezone, cached.feature_flags) == (user.id, "Asia/Tokyo", {"click_tracking": True})
+    assert cached in db
+    assert user_cache.stats()["hits"] == 1 and user_cache.stats()["hit_rate"] == 0.5
+
+
+def test_player_xp_is_always_read_fresh(db, user):
+    token, _ = generate_tokens(user)
+    get_current_user(db, token)
+    db.query(User).filter(User.id == user.id).update({"player_xp": 90})
+    db.commit()
+    db.expunge_all()
+
+    assert get_current_user(db, token).player_xp == 90
+
+
+def test_writes_through_a_cached_user_persist(db, user):
+    token, _ = generate_tokens(user)
+    get_current_user(db, token)
+    db.expunge_all()
+
+    cached = get_current_user(db, token)
+    cached.city = "Lisbon"
+    db.commit()
+    db.expunge_all()
+
+    assert db.query(User).filter(User.id == user.id).one().city == "Lisbon"
+
+
+def test_invalidate_user_forces_a_reload(db, user):
+    token, _ = generate_tokens(user)
+    get_current_user(db, token)
+    db.query(User).filter(User.id == user.id).update({"role": UserRole.ADMIN})
+    db.commit()
+    user_cache.invalidate_user(user.id)
+    db.expunge_all()
+
+    assert get_current_user(db, token).role == UserRole.ADMIN
+    assert user_cache.stats()["invalidations"] == 1
+
+
+def test_a_tampered_token_with_a_cached_signature_is_rejected(db, user):
+    token, _ = generate_tokens(user)
+    get_current_user(db, token)
+    header, payload, signature = token.split(".")
+
+    with pytest.raises(HTTPException) as excinfo:
+        get_current_user(db, f"{header}.{payload}x.{signature}")
+    assert excinfo.value.status_code == 401
@@ -6,8 +6,8 @@ pass and the engine can't silently drift apart.
 from app.xp_engine import (
     streak_multiplier, detail_bonus, attribute_xp,
     day_complete_bonus, day_status, day_target_player_xp, streak_milestone_bonus,
-    xp_required_for_level, player_level_from_xp, slots_for_level,
-    ATTRIBUTE_DAILY_CAP, DETAIL_BONUS_CAP, PARTIAL_DAY_BONUS,
+    xp_required_for_level, player_level_from_xp, player_levels_from_xp, slots_for_level,
+    ATTRIBUTE_DAILY_CAP, DETAIL_BONUS_CAP, PARTIAL_DAY_BONUS, PLAYER_LEVEL_MAX,
 )
 
 
@@ -160,3 +160,53 @@ def test_slots_never_shrink_as_level_rises():
         slots = slots_for_level(level)
         assert slots >= previous
         previous = slots
+
+
+# --- tabulated level lookup vs the original level-by-level walk ---
+def _walk_levels(total_xp):
+    """The pre-table implementation, kept verbatim as the reference."""
+    total_xp = max(0, int(total_xp or 0))
+    level = 1
+    remaining = total_xp
+    while level < PLAYER_LEVEL_MAX and remaining >= xp_required_for_level(level):
+        remaining -= xp_required_for_level(level)
+        level += 1
+    required = xp_required_for_level(level)
+    return {
+        "level": level,
+        "total_xp": total_xp,
+        "xp_into_level": remaining,
+        "xp_to_next": max(1, required - remaining),
+        "level_progress": min(1.0, remaining / required) if required else 1.0,
+    }
+
+
+def test_player_level_matches_the_walk_for_every_xp_to_the_ceiling():
+    """Exhaustive: every total from 0 past the level-99 floor. Within a level the
+    walk's answer only shifts xp_into_level by one per XP, so it is advanced in
+    step rather than re-walked from level 1 for each of the ~2M totals."""
+    ceiling = sum(xp_required_for_level(n) for n in range(1, PLAYER_LEVEL_MAX))
+    level, floor = 1, 0
+    for xp in range(0, ceiling + xp_required_for_level(PLAYER_LEVEL_MAX) + 50):
+        if level < PLAYER_LEVEL_MAX and xp - floor >= xp_required_for_level(level):
+            floor += xp_required_for_level(level)
+            level += 1
+            assert player_level_from_xp(xp) == _walk_levels(xp)   # every level boundary, verbatim
+        got = player_level_from_xp(xp)
+        assert got["level"] == level and got["xp_into_level"] == xp - floor
+    assert player_level_from_xp(ceiling)["level"] == PLAYER_LEVEL_MAX
+
+
+def test_player_level_matches_the_walk_on_edges_and_samples():
+    import random
+    rnd = random.Random(135)
+    for xp in [None, -5, 0, 1, 99, 100, 101, 10**9] + [rnd.randrange(0, 3_000_000) for _ in range(5000)]:
+        assert player_level_from_xp(xp) == _walk_levels(xp)
+
+
+def test_player_levels_from_xp_resolves_many_in_order():
+    import random
+    rnd = random.Random(187)
+    totals = [5000, 0, 100, 5000, None, -5, 10**9] + [rnd.randrange(0, 3_000_000) for _ in range(5000)]
+    assert player_levels_from_xp(totals) == [player_level_from_xp(t) for t in totals]
+    assert player_levels_from_xp([]) == []
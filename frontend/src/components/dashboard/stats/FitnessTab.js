@@ -38,7 +38,7 @@ const FitnessTab = () => {
 
   return (
     <>
-      <StrengthProgression data={strength} />
+      <StrengthProgression data={strength} userId={user.id} />
       {weight && <WeightProgress data={weight} />}
     </>
   );
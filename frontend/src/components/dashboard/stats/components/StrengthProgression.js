@@ -1,7 +1,10 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useCallback, useEffect, useMemo, useState } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
+import axiosInstance from '../../../../axios';
 import './StrengthProgression.css';
 
+const HISTORY_PAGE_SIZE = 20;
+
 const shortDate = (iso) => new Date(`${iso}T12:00:00`).toLocaleDateString(undefined, {
     month: 'short', day: 'numeric'
 });
@@ -54,15 +57,45 @@ const prDot = (prKey) => (props) => {
 /**
  * The strength dashboard, modeled on how Strong/Hevy read progression:
  * per-exercise Records (tiles) + Charts (metric/time-range controlled trend
- * with PR markers) + History (full session log in a sheet).
- * Data comes from the parent (`/users/{id}/strength-progression` shape).
+ * with PR markers) + History (session log in a sheet, paged in as it scrolls).
+ * Data comes from the parent (`/users/{id}/strength-progression` shape); the
+ * log pages come from `/users/{id}/session-history`.
  */
-const StrengthProgression = ({ data }) => {
+const StrengthProgression = ({ data, userId }) => {
     const [selected, setSelected] = useState(null);
     const [metricKey, setMetricKey] = useState('e1rm');
     const [rangeKey, setRangeKey] = useState('all');
     const [historyOpen, setHistoryOpen] = useState(false);
     const [expandedSession, setExpandedSession] = useState(null);
+    const [history, setHistory] = useState({ sessions: [], cursor: null, done: false, loading: false });
+
+    const loadHistory = useCallback(async (cursor) => {
+        setHistory((h) => ({ ...h, loading: true }));
+        try {
+            const res = await axiosInstance.get(`/users/${userId}/session-history`, {
+                params: { limit: HISTORY_PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+            });
+            setHistory((h) => ({
+                sessions: cursor ? [...h.sessions, ...res.data.sessions] : res.data.sessions,
+                cursor: res.data.next_cursor,
+                done: !res.data.next_cursor,
+                loading: false,
+            }));
+        } catch (err) {
+            console.error('Error fetching session history:', err);
+            setHistory((h) => ({ ...h, done: true, loading: false }));
+        }
+    }, [userId]);
+
+    useEffect(() => {
+        if (historyOpen && userId) loadHistory(null);
+    }, [historyOpen, userId, loadHistory]);
+
+    const onHistoryScroll = (e) => {
+        const el = e.currentTarget;
+        if (history.loading || history.done) return;
+        if (el.scrollHeight - el.scrollTop - el.clientHeight < 200) loadHistory(history.cursor);
+    };
 
     useEffect(() => {
         setSelected(data?.exercises?.[0]?.name || null);
@@ -207,16 +240,16 @@ const StrengthProgression = ({ data }) => {
 
             {historyOpen && (
                 <div className="sp-log-overlay" onClick={() => setHistoryOpen(false)}>
-                    <div className="sp-log-sheet" onClick={(e) => e.stopPropagation()}>
+                    <div className="sp-log-sheet" onClick={(e) => e.stopPropagation()} onScroll={onHistoryScroll}>
                         <div className="sp-log-head">
                             <h2>Session log</h2>
                             <button className="sp-log-close" onClick={() => setHistoryOpen(false)}>×</button>
                         </div>
-                        {(data.session_history || []).map((session, i) => {
+                        {history.sessions.map((session, i) => {
                             const open = expandedSession === i;
                             const meta = [session.day, session.program].filter(Boolean).join(' · ');
                             return (
-                                <div className={`sp-session ${open ? 'open' : ''}`} key={`${session.date}-${i}`}>
+                                <div className={`sp-session ${open ? 'open' : ''}`} key={session.session_id}>
                                     <button className="sp-session-head" onClick={() => setExpandedSession(open ? null : i)}>
                                         <span className="sp-session-date">{shortDate(session.date)}</span>
                                         <span className="sp-session-day">{meta}</span>
@@ -235,7 +268,8 @@ const StrengthProgression = ({ data }) => {
                                 </div>
                             );
                         })}
-                        {(data.session_history || []).length === 0 && (
+                        {history.loading && <p className="sp-hint">Loading…</p>}
+                        {history.done && history.sessions.length === 0 && (
                             <p className="sp-hint">No sessions logged yet.</p>
                         )}
                     </div>